@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import speech_recognition as sr
 import google.generativeai as genai
@@ -9,8 +9,15 @@ from pydub.playback import play
 from dotenv import load_dotenv
 import base64
 import io
+import json
 import logging
+import re
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sentences import stream_sentences
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -41,7 +48,118 @@ api_key = os.getenv('GOOGLE_API_KEY')
 if not api_key:
     raise ValueError("GOOGLE_API_KEY not found in environment variables")
 genai.configure(api_key=api_key)
-model = genai.GenerativeModel('gemini-1.5-flash')
+MODEL_NAME = 'gemini-1.5-flash'
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Bump PROMPT_VERSION whenever PROMPT_TEMPLATE changes so cached replies are not reused
+PROMPT_VERSION = 1
+PROMPT_TEMPLATE = """You are a witty, humorous AI assistant who loves clever wordplay and fun responses. Keep your responses natural and conversational, like a funny friend chatting. Respond to this in exactly 2-3 short sentences, using only plain text without any quotes, asterisks, or special characters: {transcript}"""
+
+# One recognizer is shared by all requests, so that speech recognition reuses
+# the keep-alive connections of its HTTP transport instead of opening a new
+# TLS connection to Google for every request
+recognizer = sr.Recognizer()
+
+# Text-to-speech runs one request per sentence on a bounded worker pool
+TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', 4))
+tts_executor = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix='tts')
+
+# MPEG audio bitrates (kbps) by (MPEG-1, layer) and bitrate index
+MP3_BITRATES = {
+    (True, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# MPEG audio sample rates (Hz) by version bits and sample rate index
+MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),  # MPEG-2.5
+    2: (22050, 24000, 16000),  # MPEG-2
+    3: (44100, 48000, 32000),  # MPEG-1
+}
+
+class ResponseCache:
+    """Thread-safe LRU cache of AI replies with a TTL.
+
+    Each key keeps a pool of up to `variety` different replies. Lookups miss
+    until `variety` replies have been put, then cycle through the pool so
+    repeated questions don't always get the very same joke. A reply that is
+    already in the pool counts towards `variety` without being added again,
+    so the pool also fills when the model keeps giving the same reply.
+    """
+
+    def __init__(self, max_size, ttl, variety=1):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.variety = max(1, variety)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(transcript):
+        """Case-fold, strip punctuation and collapse whitespace"""
+        text = re.sub(r'[^\w\s]', '', transcript.casefold())
+        return ' '.join(text.split())
+
+    def key(self, transcript):
+        return (MODEL_NAME, PROMPT_VERSION, self.normalize(transcript))
+
+    def get(self, transcript):
+        """Return a cached reply for transcript, or None on a miss"""
+        key = self.key(transcript)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires'] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None or entry['puts'] < self.variety:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry['responses'][entry['next']]
+            entry['next'] = (entry['next'] + 1) % len(entry['responses'])
+            return response
+
+    def put(self, transcript, response):
+        """Add a reply to transcript's pool"""
+        key = self.key(transcript)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires'] <= time.monotonic():
+                entry = {'responses': [], 'puts': 0, 'next': 0, 'expires': time.monotonic() + self.ttl}
+                self._entries[key] = entry
+            if entry['puts'] < self.variety:
+                entry['puts'] += 1
+                if response not in entry['responses']:
+                    entry['responses'].append(response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+# Optional reply cache, disabled unless RESPONSE_CACHE_SIZE is set
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 0))
+response_cache = None
+if RESPONSE_CACHE_SIZE > 0:
+    response_cache = ResponseCache(
+        max_size=RESPONSE_CACHE_SIZE,
+        ttl=float(os.getenv('RESPONSE_CACHE_TTL', 3600)),
+        variety=int(os.getenv('RESPONSE_CACHE_VARIETY', 3))
+    )
 
 @app.after_request
 def after_request(response):
@@ -50,7 +168,98 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-def process_audio(audio_data, mime_type=None):
+def generate_reply(prompt):
+    """Stream the model's reply as sanitized text chunks"""
+    for chunk in model.generate_content(prompt, stream=True):
+        yield chunk.text.replace('"', '').replace('*', '')
+
+def mp3_frame_length(header):
+    """Length in bytes of the MPEG audio frame starting with header, or None"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03  # 1: Layer III, 2: Layer II, 3: Layer I
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = MP3_BITRATES[(version == 3, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    if layer == 3:
+        return (12 * bitrate // sample_rate + padding) * 4
+    if layer == 1 and version != 3:
+        return 72 * bitrate // sample_rate + padding
+    return 144 * bitrate // sample_rate + padding
+
+def mp3_frames(data):
+    """Keep only the complete MPEG audio frames of an MP3 stream.
+
+    ID3 tags, junk and truncated frames are dropped so that the result of
+    several calls can be concatenated without re-encoding.
+    """
+    frames = []
+    pos = 0
+    while pos + 4 <= len(data):
+        if data[pos:pos + 3] == b'ID3' and pos + 10 <= len(data):
+            size = 0
+            for byte in data[pos + 6:pos + 10]:
+                size = (size << 7) | (byte & 0x7F)
+            footer = 10 if data[pos + 5] & 0x10 else 0
+            pos += 10 + size + footer
+            continue
+        if data[pos:pos + 3] == b'TAG':
+            pos += 128
+            continue
+        length = mp3_frame_length(data[pos:pos + 4])
+        if length is None:
+            # Resynchronise on the next byte
+            pos += 1
+            continue
+        if pos + length > len(data):
+            break
+        frames.append(data[pos:pos + length])
+        pos += length
+    return b''.join(frames)
+
+def synthesize_sentence(sentence):
+    """Convert one sentence to speech, returning its MP3 frames"""
+    mp3 = io.BytesIO()
+    gtts.gTTS(sentence).write_to_fp(mp3)
+    return mp3_frames(mp3.getvalue())
+
+def synthesize_sentences(sentences):
+    """Convert sentences to speech concurrently.
+
+    sentences can be produced lazily (see stream_sentences): each one is
+    sent to TTS as soon as it is available, while the next is generated.
+    Yields (sentence, mp3 bytes) pairs in order, each as soon as it and the
+    sentences before it are ready, so they can be delivered one by one.
+    """
+    futures = []
+    done = 0
+    try:
+        for sentence in sentences:
+            futures.append((sentence, tts_executor.submit(synthesize_sentence, sentence)))
+            while done < len(futures) and futures[done][1].done():
+                yield futures[done][0], futures[done][1].result()
+                done += 1
+        for sentence, future in futures[done:]:
+            yield sentence, future.result()
+    finally:
+        for _, future in futures:
+            future.cancel()
+
+def process_audio_events(audio_data, mime_type=None):
+    """Process a recording, yielding each result as soon as it is ready.
+
+    Yields {"transcript": ...} once the speech is recognized, then
+    {"text": sentence, "audio": base64 MP3} for each sentence of the reply
+    as soon as it and the sentences before it are synthesized, and finally
+    {"response": full reply}. A failure is yielded as {"error": message}
+    and ends the events.
+    """
     try:
         logger.debug(f"Starting audio processing with MIME type: {mime_type}")
         # Convert base64 audio to binary
@@ -77,7 +286,6 @@ def process_audio(audio_data, mime_type=None):
             input_format = 'wav'
             
         wav_path = os.path.join(temp_dir, 'output.wav')
-        response_path = os.path.join(temp_dir, 'response.mp3')
         
         logger.debug(f"Input format: {input_format}")
         logger.debug(f"Input path: {input_path}")
@@ -143,9 +351,6 @@ def process_audio(audio_data, mime_type=None):
                 if not os.path.exists(wav_path) or os.path.getsize(wav_path) == 0:
                     raise ValueError("FFmpeg produced empty or missing output file")
                 
-                # Initialize recognizer
-                recognizer = sr.Recognizer()
-                
                 # Process the WAV file
                 with sr.AudioFile(wav_path) as source:
                     logger.debug("Recording audio from source")
@@ -156,48 +361,60 @@ def process_audio(audio_data, mime_type=None):
                         logger.debug("Attempting to recognize speech")
                         transcript = recognizer.recognize_google(audio)
                         logger.debug(f"Transcribed text: {transcript}")
+                        yield {"transcript": transcript}
                         
-                        # Generate AI response with length limit
-                        prompt = f"""You are a witty, humorous AI assistant who loves clever wordplay and fun responses. Keep your responses natural and conversational, like a funny friend chatting. Respond to this in exactly 2-3 short sentences, using only plain text without any quotes, asterisks, or special characters: {transcript}"""
-                        logger.debug("Generating AI response")
-                        response = model.generate_content(prompt)
-                        ai_response = response.text.replace('"', '').replace('*', '').strip()
-                        logger.debug(f"AI response: {ai_response}")
+                        # Reuse a cached reply to the same utterance when possible
+                        cached_response = response_cache.get(transcript) if response_cache else None
+                        if cached_response:
+                            logger.debug("Using cached AI response")
+                            reply = iter([cached_response])
+                        else:
+                            # Generate AI response with length limit
+                            prompt = PROMPT_TEMPLATE.format(transcript=transcript)
+                            logger.debug("Generating AI response")
+                            reply = generate_reply(prompt)
                         
-                        # Convert response to speech
+                        # Convert response to speech while it is generated, one sentence per TTS request,
+                        # and deliver each sentence as soon as it is ready
                         logger.debug("Converting response to speech")
-                        tts = gtts.gTTS(ai_response)
-                        tts.save(response_path)
+                        sentences = []
+                        for sentence, mp3 in synthesize_sentences(stream_sentences(reply)):
+                            sentences.append(sentence)
+                            yield {"text": sentence, "audio": base64.b64encode(mp3).decode('utf-8')}
+                        if not sentences:
+                            raise ValueError("No text to speak")
+                        ai_response = ' '.join(sentences)
+                        logger.debug(f"AI response: {ai_response}")
+                        logger.debug(f"Synthesized {len(sentences)} sentence(s)")
                         
-                        # Read the response audio and convert to base64
-                        with open(response_path, 'rb') as audio_file:
-                            audio_base64 = base64.b64encode(audio_file.read()).decode('utf-8')
+                        if response_cache and not cached_response:
+                            response_cache.put(transcript, ai_response)
                         
                         logger.debug("Audio processing completed successfully")
-                        
-                        return {
-                            "transcript": transcript,
-                            "response": ai_response,
-                            "audio": audio_base64
-                        }
+                        yield {"response": ai_response}
                         
                     except sr.UnknownValueError:
                         logger.error("Could not understand audio")
-                        return {"error": "Could not understand audio"}
+                        yield {"error": "Could not understand audio"}
+                        return
                     except sr.RequestError as e:
                         logger.error(f"Could not request results: {str(e)}")
-                        return {"error": f"Could not request results: {str(e)}"}
+                        yield {"error": f"Could not request results: {str(e)}"}
+                        return
                     except Exception as e:
                         logger.error(f"Error processing audio: {str(e)}")
-                        return {"error": f"Error processing audio: {str(e)}"}
+                        yield {"error": f"Error processing audio: {str(e)}"}
+                        return
                     
             except subprocess.CalledProcessError as e:
                 logger.error(f"FFmpeg process error: {str(e)}")
                 logger.error(f"FFmpeg stderr: {e.stderr}")
-                return {"error": f"Audio conversion failed: {e.stderr}"}
+                yield {"error": f"Audio conversion failed: {e.stderr}"}
+                return
             except Exception as e:
                 logger.error(f"Unexpected error during conversion: {str(e)}")
-                return {"error": f"Unexpected error during conversion: {str(e)}"}
+                yield {"error": f"Unexpected error during conversion: {str(e)}"}
+                return
                 
         finally:
             # Clean up temporary files
@@ -210,7 +427,23 @@ def process_audio(audio_data, mime_type=None):
                 
     except Exception as e:
         logger.error(f"Error decoding audio: {str(e)}")
-        return {"error": f"Error decoding audio: {str(e)}"}
+        yield {"error": f"Error decoding audio: {str(e)}"}
+
+def process_audio(audio_data, mime_type=None):
+    """Process a recording into a single result, once the whole reply is synthesized"""
+    result = {"segments": []}
+    for event in process_audio_events(audio_data, mime_type):
+        if "error" in event:
+            return event
+        if "text" in event:
+            result["segments"].append(event)
+        else:
+            result.update(event)
+    # Join the sentences' MP3 frames
+    result["audio"] = base64.b64encode(b''.join(
+        base64.b64decode(segment["audio"]) for segment in result["segments"]
+    )).decode('utf-8')
+    return result
 
 @app.route('/api/process-audio', methods=['POST', 'OPTIONS'])
 def process_audio_endpoint():
@@ -225,6 +458,15 @@ def process_audio_endpoint():
             return jsonify({"error": "No audio data provided"}), 400
             
         mime_type = data.get('mimeType')
+        if data.get('stream'):
+            # One JSON event per line, sent as soon as each is ready, so the
+            # client can play the first sentence while the rest is generated
+            def events():
+                for event in process_audio_events(data['audio'], mime_type):
+                    yield json.dumps(event) + '\n'
+                logger.debug("Processing completed")
+            return Response(events(), mimetype='application/x-ndjson',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
         result = process_audio(data['audio'], mime_type)
         logger.debug("Processing completed")
         return jsonify(result)
@@ -232,6 +474,12 @@ def process_audio_endpoint():
         logger.error(f"Error in endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats_endpoint():
+    if not response_cache:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **response_cache.stats()})
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     app.run(host='0.0.0.0', port=port) 
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Times ``AudioSegment.export``, which pipes the samples to ffmpeg and reads the encoded audio back from its stdout, against the previous implementation, which wrote a temporary WAV file for ffmpeg to read and had ffmpeg write another temporary file that was then copied to the output.
+
+Besides the run times, prints the bytes written to temporary files per export (and read back from them, for the encoded output). Formats in ``AudioSegment.SEEKABLE_OUTPUT_FORMATS`` still go through a temporary output file.
+
+Run from the repository root (ffmpeg is required):
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/audio_export.py
+"""
+
+import io
+import math
+import os
+import subprocess
+import tempfile
+import time
+import wave
+
+from pydub import AudioSegment, audio_segment
+
+SAMPLE_RATE = 24000  # gTTS output
+DURATIONS = (2, 10, 60)  # seconds of audio, a short reply to a long one
+FORMATS = ("mp3", "ogg", "mp4")
+REPEATS = 5
+
+
+class CountingTemporaryFiles(object):
+    """Stands in for ``NamedTemporaryFile``, adding up the sizes of the temporary files when they're closed."""
+    def __init__(self):
+        self.bytes = 0
+
+    def __call__(self, *args, **kwargs):
+        counter = self
+        temporary_file = tempfile.NamedTemporaryFile(*args, **kwargs)
+        close = temporary_file.close
+
+        def counting_close():
+            if not temporary_file.closed:
+                counter.bytes += os.path.getsize(temporary_file.name)
+            close()
+        temporary_file.close = counting_close
+        return temporary_file
+
+
+def synthetic_speech(seconds):
+    """Returns 16-bit mono audio of a tone whose loudness changes like syllables."""
+    samples = bytearray()
+    for i in range(int(seconds * SAMPLE_RATE)):
+        t = float(i) / SAMPLE_RATE
+        value = 0.4 * abs(math.sin(2 * math.pi * 3 * t)) * math.sin(2 * math.pi * 180 * t)
+        samples += int(32767 * value).to_bytes(2, "little", signed=True)
+    return AudioSegment(bytes(samples), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def previous_export(seg, format, temporary_files):
+    """The previous implementation of ``AudioSegment.export``, without the tag, cover and bitrate options."""
+    out_f = io.BytesIO()
+    data = temporary_files(mode="wb", delete=False)
+    wave_data = wave.open(data, "wb")
+    wave_data.setnchannels(seg.channels)
+    wave_data.setsampwidth(seg.sample_width)
+    wave_data.setframerate(seg.frame_rate)
+    wave_data.setnframes(int(seg.frame_count()))
+    wave_data.writeframesraw(seg.raw_data)
+    wave_data.close()
+
+    output = temporary_files(mode="w+b", delete=False)
+    conversion_command = [AudioSegment.converter, "-y", "-f", "wav", "-i", data.name]
+    codec = AudioSegment.DEFAULT_CODECS.get(format)
+    if codec is not None:
+        conversion_command.extend(["-acodec", codec])
+    conversion_command.extend(["-f", format, output.name])
+    with open(os.devnull, "rb") as devnull:
+        p = subprocess.Popen(conversion_command, stdin=devnull, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    p.communicate()
+    if p.returncode != 0:
+        raise RuntimeError("ffmpeg failed: {}".format(conversion_command))
+
+    output.seek(0)
+    out_f.write(output.read())
+    data.close()
+    output.close()
+    os.unlink(data.name)
+    os.unlink(output.name)
+    return out_f
+
+
+def timed(func):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("{:>7} {:>8} {:>12} {:>12} {:>8} {:>18} {:>18}".format(
+        "format", "seconds", "previous ms", "export ms", "speedup", "previous tmp bytes", "export tmp bytes"))
+    for seconds in DURATIONS:
+        seg = synthetic_speech(seconds)
+        for format in FORMATS:
+            previous_files = CountingTemporaryFiles()
+            previous_time = timed(lambda: previous_export(seg, format, previous_files))
+
+            export_files = CountingTemporaryFiles()
+            named_temporary_file, audio_segment.NamedTemporaryFile = audio_segment.NamedTemporaryFile, export_files
+            try:
+                export_time = timed(lambda: seg.export(io.BytesIO(), format=format))
+            finally:
+                audio_segment.NamedTemporaryFile = named_temporary_file
+
+            print("{:>7} {:>8} {:>12.1f} {:>12.1f} {:>7.2f}x {:>18} {:>18}".format(
+                format, seconds, 1000 * previous_time, 1000 * export_time, previous_time / export_time,
+                previous_files.bytes // REPEATS, export_files.bytes // REPEATS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Times every function of ``pydub.pyaudioop``, the replacement for the ``audioop`` module removed from the standard library in Python 3.13, with NumPy and with the array module fallback, against the standard library module where it is still available.
+
+The functions are run on 10 seconds of 16-bit stereo audio at 44.1 kHz, and the replacement's results are checked to be identical to the standard library's.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/audioop_replacement.py
+"""
+
+import random
+import sys
+import time
+import warnings
+
+from pydub import pyaudioop
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:  # Python 3.13+
+    audioop = None
+
+SAMPLE_RATE = 44100
+SECONDS = 10
+REPEATS = 3
+
+
+def synthetic_audio():
+    """Returns 16-bit stereo samples of a random walk, so that peaks and zero crossings are spread out like in speech."""
+    rng = random.Random(1)
+    samples, value = [], 0
+    for _ in range(2 * SAMPLE_RATE * SECONDS):
+        value = max(-32768, min(32767, value + rng.randint(-800, 800)))
+        samples.append(value)
+    return b"".join(sample.to_bytes(2, sys.byteorder, signed=True) for sample in samples)
+
+
+def calls(fragment):
+    """Returns (name, function name, arguments) for every function, on typical arguments"""
+    mono = fragment[:len(fragment) // 2]
+    reference = mono[20000:24000]
+    return [
+        ("max", "max", (fragment, 2)),
+        ("minmax", "minmax", (fragment, 2)),
+        ("avg", "avg", (fragment, 2)),
+        ("rms", "rms", (fragment, 2)),
+        ("avgpp", "avgpp", (fragment, 2)),
+        ("maxpp", "maxpp", (fragment, 2)),
+        ("cross", "cross", (fragment, 2)),
+        ("mul", "mul", (fragment, 2, 0.7)),
+        ("tomono", "tomono", (fragment, 2, 0.5, 0.5)),
+        ("tostereo", "tostereo", (mono, 2, 1, 1)),
+        ("add", "add", (fragment, fragment, 2)),
+        ("bias", "bias", (fragment, 2, 1000)),
+        ("reverse", "reverse", (fragment, 2)),
+        ("byteswap", "byteswap", (fragment, 2)),
+        ("lin2lin 2->3", "lin2lin", (fragment, 2, 3)),
+        ("lin2lin 2->1", "lin2lin", (fragment, 2, 1)),
+        ("ratecv 44.1->16k", "ratecv", (fragment, 2, 2, SAMPLE_RATE, 16000, None)),
+        ("findmax", "findmax", (mono, 2000)),
+        ("findfit", "findfit", (mono[:len(mono) // 10], reference)),
+        ("findfactor", "findfactor", (mono, mono)),
+    ]
+
+
+def timed(func, args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    numpy_module = pyaudioop.np
+    fragment = synthetic_audio()
+    print("{} s of 16-bit stereo audio, NumPy available: {}".format(SECONDS, numpy_module is not None))
+    print("{:>18} {:>12} {:>12} {:>12} {:>10}".format("function", "stdlib ms", "numpy ms", "array ms", "identical"))
+    for name, function_name, args in calls(fragment):
+        times, results = [], []
+        if audioop is not None:
+            elapsed, expected = timed(getattr(audioop, function_name), args)
+            times.append(elapsed)
+        else:
+            times.append(None)
+        for backend in (numpy_module, None):
+            if backend is None and numpy_module is None and results:
+                break
+            pyaudioop.np = backend
+            try:
+                elapsed, result = timed(getattr(pyaudioop, function_name), args)
+            finally:
+                pyaudioop.np = numpy_module
+            times.append(elapsed)
+            results.append(result)
+        if numpy_module is None:
+            times.insert(1, None)
+
+        if audioop is None:
+            identical = "n/a"
+        else:
+            identical = "yes" if all(result == expected for result in results) else "NO"
+        print("{:>18} {} {:>10}".format(name, " ".join(
+            "{:>12}".format("n/a") if elapsed is None else "{:>12.2f}".format(1000 * elapsed) for elapsed in times
+        ), identical))
+
+if __name__ == "__main__":
+    main()
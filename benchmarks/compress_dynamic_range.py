@@ -0,0 +1,71 @@
+"""
+Compares the block-based ``pydub.effects.compress_dynamic_range`` (used when NumPy is installed) against the frame by frame loop used without NumPy, on speech-like audio at the 24 kHz sample rate of gTTS output.
+
+Besides the run times, prints how far the block-based output deviates from the frame by frame output: the largest gain difference in dB over samples above -26 dBFS, and the largest sample difference relative to full scale.
+
+Run from the repository root (NumPy is required):
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/compress_dynamic_range.py
+"""
+
+import array
+import math
+import random
+import time
+
+import numpy as np
+
+from pydub import AudioSegment, effects
+
+SAMPLE_RATE = 24000
+DURATIONS = (1, 5, 30)  # seconds of audio
+
+
+def synthetic_speech(seconds):
+    """Returns 16-bit mono audio of harmonics whose loudness jumps every 50 to 300 ms, like syllables."""
+    rng = random.Random(seconds)
+    samples = array.array("h")
+    amplitude, next_change = 0.0, 0
+    for i in range(int(seconds * SAMPLE_RATE)):
+        if i >= next_change:
+            amplitude = rng.choice((0.02, 0.1, 0.3, 0.6, 0.9))
+            next_change = i + int(rng.uniform(0.05, 0.3) * SAMPLE_RATE)
+        t = i / SAMPLE_RATE
+        value = sum(math.sin(2 * math.pi * 150 * k * t) / k for k in range(1, 4)) / 1.84
+        samples.append(int(32767 * amplitude * value))
+    return AudioSegment(samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def frame_by_frame(seg):
+    numpy_module, effects.np = effects.np, None
+    try:
+        return seg.compress_dynamic_range()
+    finally:
+        effects.np = numpy_module
+
+
+def main():
+    print("{:>8} {:>10} {:>14} {:>9} {:>12} {:>12}".format("seconds", "blocks s", "per frame s", "speedup", "max dB diff", "max diff/FS"))
+    for seconds in DURATIONS:
+        seg = synthetic_speech(seconds)
+        block_time, block_output = timed(lambda: seg.compress_dynamic_range())
+        frame_time, frame_output = timed(lambda: frame_by_frame(seg))
+
+        original = np.frombuffer(seg.raw_data, dtype=np.int16).astype(np.float64)
+        blocks = np.frombuffer(block_output.raw_data, dtype=np.int16).astype(np.float64)
+        frames = np.frombuffer(frame_output.raw_data, dtype=np.int16).astype(np.float64)
+        loud = np.abs(original) > 32768 * 0.05
+        gain_difference = np.abs(20 * np.log10(np.abs(blocks[loud]) / np.abs(frames[loud])))
+        print("{:>8} {:>10.3f} {:>14.3f} {:>8.0f}x {:>12.3f} {:>12.4f}".format(
+            seconds, block_time, frame_time, frame_time / block_time,
+            gain_difference.max(), np.abs(blocks - frames).max() / 32768))
+
+
+if __name__ == "__main__":
+    main()
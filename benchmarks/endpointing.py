@@ -0,0 +1,123 @@
+"""
+Measures the end-of-utterance detection latency and false-cut rate of ``Recognizer.listen``, with the default fixed ``pause_threshold`` and with ``AdaptiveEndpointer``.
+
+Each WAV file given on the command line should contain one utterance followed by at least a second of silence. The true end of the utterance is taken to be the end of the last 10 ms window above the energy threshold, looking at the whole file. Without arguments, a synthetic corpus of spoken-like utterances is used instead.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/endpointing.py [WAV_FILE ...]
+"""
+
+import io
+import math
+import random
+import struct
+import sys
+import wave
+
+try:
+    import audioop
+except ImportError:  # removed from the standard library in Python 3.13
+    from pydub import pyaudioop as audioop
+
+import speech_recognition as sr
+from speech_recognition.endpointing import AdaptiveEndpointer
+
+ENERGY_THRESHOLD = 300
+CHUNK = 1024  # same as the ``Microphone`` default
+
+
+class CountingStream(object):
+    """Wraps an audio stream, counting the bytes read from it."""
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        buffer = self.stream.read(size)
+        self.bytes_read += len(buffer)
+        return buffer
+
+
+def synthetic_corpus(count=40, sample_rate=16000):
+    """Returns a list of WAV files as byte strings, each with a few words separated by short gaps, background noise, and trailing silence."""
+    rng = random.Random(1)
+    corpus = []
+    for _ in range(count):
+        samples = [0] * int(0.5 * sample_rate)
+        for word in range(rng.randint(3, 9)):
+            if word:
+                samples += [0] * int(rng.uniform(0.08, 0.3) * sample_rate)  # pause between words
+            pitch = rng.uniform(100, 220)
+            length = int(rng.uniform(0.15, 0.45) * sample_rate)
+            for i in range(length):
+                envelope = math.sin(math.pi * i / length)
+                samples.append(int(7000 * envelope * sum(math.sin(2 * math.pi * pitch * k * i / sample_rate) / k for k in range(1, 4))))
+            if rng.random() < 0.3:  # unvoiced ending, like an "s"
+                samples += [int(rng.gauss(0, 600)) for _ in range(int(0.08 * sample_rate))]
+        samples += [0] * int(1.5 * sample_rate)
+        samples = [max(-32768, min(32767, sample + int(rng.gauss(0, 40)))) for sample in samples]
+
+        wav_file = io.BytesIO()
+        wav_writer = wave.open(wav_file, "wb")
+        wav_writer.setnchannels(1)
+        wav_writer.setsampwidth(2)
+        wav_writer.setframerate(sample_rate)
+        wav_writer.writeframes(struct.pack("<{}h".format(len(samples)), *samples))
+        wav_writer.close()
+        corpus.append(wav_file.getvalue())
+    return corpus
+
+
+def true_end(source):
+    """Returns the end of the last 10 ms window of ``source`` above the energy threshold, in seconds."""
+    audio = source.stream.read()
+    window = int(source.SAMPLE_RATE * 0.01) * source.SAMPLE_WIDTH
+    end = 0
+    for i in range(0, len(audio), window):
+        if audioop.rms(audio[i:i + window], source.SAMPLE_WIDTH) > ENERGY_THRESHOLD:
+            end = min(i + window, len(audio))
+    return float(end) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+
+
+def measure(corpus, endpointer):
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = ENERGY_THRESHOLD
+    recognizer.dynamic_energy_threshold = False
+    recognizer.endpointer = endpointer
+    latencies, false_cuts = [], 0
+    for wav_data in corpus:
+        with sr.AudioFile(io.BytesIO(wav_data)) as source:
+            utterance_end = true_end(source)
+        with sr.AudioFile(io.BytesIO(wav_data)) as source:
+            source.CHUNK = CHUNK
+            source.stream = stream = CountingStream(source.stream)
+            recognizer.listen(source)
+            decision_time = float(stream.bytes_read) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+        if decision_time < utterance_end:  # listening stopped before the speaker finished
+            false_cuts += 1
+        else:
+            latencies.append(decision_time - utterance_end)
+    return latencies, false_cuts
+
+
+def main():
+    if len(sys.argv) > 1:
+        corpus = []
+        for path in sys.argv[1:]:
+            with open(path, "rb") as f:
+                corpus.append(f.read())
+    else:
+        corpus = synthetic_corpus()
+
+    print("{} utterances".format(len(corpus)))
+    print("{:>20} {:>16} {:>16} {:>12}".format("endpointer", "mean latency s", "max latency s", "false cuts"))
+    for name, endpointer in [("pause_threshold", None), ("adaptive", AdaptiveEndpointer())]:
+        latencies, false_cuts = measure(corpus, endpointer)
+        mean_latency = sum(latencies) / len(latencies) if latencies else float("nan")
+        max_latency = max(latencies) if latencies else float("nan")
+        print("{:>20} {:>16.3f} {:>16.3f} {:>8}/{:<3}".format(name, mean_latency, max_latency, false_cuts, len(corpus)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compares the in-process FLAC encoder against the bundled FLAC command line tool used by ``AudioData.get_flac_data``.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/flac_encoder.py
+"""
+
+import math
+import random
+import struct
+import time
+
+from speech_recognition import AudioData
+from speech_recognition import flac
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+DURATIONS = (1, 5, 15)  # seconds of audio
+REPEATS = 5
+
+
+def synthetic_speech(seconds):
+    """Returns 16-bit mono PCM data that roughly resembles voiced speech: a few harmonics with a slow envelope and some noise."""
+    rng = random.Random(0)
+    samples = []
+    for i in range(int(seconds * SAMPLE_RATE)):
+        t = i / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        value = sum(math.sin(2 * math.pi * 180 * k * t) / k for k in range(1, 5))
+        samples.append(int(6000 * envelope * value + rng.gauss(0, 200)))
+    return struct.pack("<{}h".format(len(samples)), *samples)
+
+
+def best_time(func):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    print("NumPy available: {}".format(flac.HAS_NUMPY))
+    print("{:>8} {:>10} {:>12} {:>12} {:>12} {:>12}".format("seconds", "wav bytes", "builtin s", "builtin B", "binary s", "binary B"))
+    for seconds in DURATIONS:
+        audio = AudioData(synthetic_speech(seconds), SAMPLE_RATE, SAMPLE_WIDTH)
+        builtin_time, builtin_data = best_time(lambda: audio.get_flac_data(encoder="builtin"))
+        try:
+            binary_time, binary_data = best_time(lambda: audio.get_flac_data(encoder="binary"))
+            binary_columns = "{:>12.4f} {:>12}".format(binary_time, len(binary_data))
+        except OSError:  # no usable FLAC binary on this system
+            binary_columns = "{:>12} {:>12}".format("n/a", "n/a")
+        print("{:>8} {:>10} {:>12.4f} {:>12} {}".format(seconds, len(audio.get_wav_data()), builtin_time, len(builtin_data), binary_columns))
+
+
+if __name__ == "__main__":
+    main()
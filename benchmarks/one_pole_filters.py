@@ -0,0 +1,108 @@
+"""
+Times ``pydub.effects.low_pass_filter`` and ``high_pass_filter`` by default (the sample by sample recursion) and with ``blocked=True`` (the blocked NumPy recurrence), against the loop they replaced, on a 30 second stereo clip.
+
+Also prints how many samples of the blocked output differ from the loop's output, and by how much at most.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/one_pole_filters.py
+"""
+
+import array
+import math
+import random
+import time
+
+from pydub import AudioSegment, effects
+from pydub.utils import get_min_max_value
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+SECONDS = 30
+CUTOFFS = (300, 3000)  # Hz
+
+
+def previous_low_pass_filter(seg, cutoff):
+    """The loop that ``low_pass_filter`` used before."""
+    RC = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / seg.frame_rate
+    alpha = dt / (RC + dt)
+    original = seg.get_array_of_samples()
+    filteredArray = array.array(seg.array_type, original)
+    last_val = [0] * seg.channels
+    for i in range(seg.channels):
+        last_val[i] = filteredArray[i] = original[i]
+    for i in range(1, int(seg.frame_count())):
+        for j in range(seg.channels):
+            offset = (i * seg.channels) + j
+            last_val[j] = last_val[j] + (alpha * (original[offset] - last_val[j]))
+            filteredArray[offset] = int(last_val[j])
+    return seg._spawn(data=filteredArray)
+
+
+def previous_high_pass_filter(seg, cutoff):
+    """The loop that ``high_pass_filter`` used before."""
+    RC = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / seg.frame_rate
+    alpha = RC / (RC + dt)
+    minval, maxval = get_min_max_value(seg.sample_width * 8)
+    original = seg.get_array_of_samples()
+    filteredArray = array.array(seg.array_type, original)
+    last_val = [0] * seg.channels
+    for i in range(seg.channels):
+        last_val[i] = filteredArray[i] = original[i]
+    for i in range(1, int(seg.frame_count())):
+        for j in range(seg.channels):
+            offset = (i * seg.channels) + j
+            offset_minus_1 = ((i - 1) * seg.channels) + j
+            last_val[j] = alpha * (last_val[j] + original[offset] - original[offset_minus_1])
+            filteredArray[offset] = int(min(max(last_val[j], minval), maxval))
+    return seg._spawn(data=filteredArray)
+
+
+def synthetic_clip():
+    """Returns 16-bit stereo audio: a mix of low and high tones with some noise."""
+    rng = random.Random(0)
+    samples = array.array("h")
+    for i in range(SECONDS * SAMPLE_RATE):
+        t = i / SAMPLE_RATE
+        value = 6000 * math.sin(2 * math.pi * 120 * t) + 3000 * math.sin(2 * math.pi * 5000 * t)
+        samples.extend((int(value + rng.gauss(0, 300)), int(0.5 * value + rng.gauss(0, 300))))
+    return AudioSegment(samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=CHANNELS)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def differences(seg, reference):
+    samples, reference_samples = seg.get_array_of_samples(), reference.get_array_of_samples()
+    deltas = [abs(a - b) for a, b in zip(samples, reference_samples)]
+    return sum(1 for delta in deltas if delta), max(deltas)
+
+
+def main():
+    clip = synthetic_clip()
+    print("NumPy available: {}".format(effects.np is not None))
+    print("{:>12} {:>7} {:>10} {:>10} {:>12} {:>17}".format("filter", "cutoff", "blocked s", "default s", "previous s", "differing (max)"))
+    for name, new_filter, previous_filter in (
+            ("low pass", effects.low_pass_filter, previous_low_pass_filter),
+            ("high pass", effects.high_pass_filter, previous_high_pass_filter)):
+        for cutoff in CUTOFFS:
+            previous_time, reference = timed(lambda: previous_filter(clip, cutoff))
+            default_time, default = timed(lambda: new_filter(clip, cutoff))
+            assert default.raw_data == reference.raw_data
+            if effects.np is not None:
+                numpy_time, output = timed(lambda: new_filter(clip, cutoff, blocked=True))
+                numpy_column = "{:>10.3f}".format(numpy_time)
+                differing, largest = differences(output, reference)
+                differing_column = "{:>12} ({})".format(differing, largest)
+            else:
+                numpy_column, differing_column = "{:>10}".format("n/a"), "{:>17}".format("n/a")
+            print("{:>12} {:>7} {} {:>10.3f} {:>12.3f} {}".format(name, cutoff, numpy_column, default_time, previous_time, differing_column))
+
+
+if __name__ == "__main__":
+    main()
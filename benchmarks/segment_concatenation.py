@@ -0,0 +1,113 @@
+"""
+Times ``pydub.effects.speedup``, ``sum()`` of half-second chunks and a loop of ``out = out + chunk`` over the same chunks on 10, 60 and 600 seconds of audio, against the previous concatenation, where every ``AudioSegment.append`` copied all of the audio gathered so far (through a ``TemporaryFile``) and so took time quadratic in the length of the audio.
+
+The previous implementation takes minutes on the longest audio, so it is only run on audio up to ``REFERENCE_MAX_SECONDS`` long unless ``--reference`` is given. Whenever it is run, the outputs of both implementations are checked to be identical.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/segment_concatenation.py [--reference]
+"""
+
+import array
+import math
+import sys
+import time
+from tempfile import TemporaryFile
+
+from pydub import AudioSegment, effects
+from pydub.utils import make_chunks
+
+SAMPLE_RATE = 24000
+DURATIONS = (10, 60, 600)  # seconds of audio
+REFERENCE_MAX_SECONDS = 60
+PLAYBACK_SPEED = 1.25
+CHUNK_MS = 500
+
+
+def reference_append(seg1, seg2, crossfade):
+    """The previous ``AudioSegment.append``."""
+    seg1, seg2 = AudioSegment._sync(seg1, seg2)
+    if not crossfade:
+        return seg1._spawn([seg1._data, seg2._data])
+
+    xf = seg1[-crossfade:].fade(to_gain=-120, start=0, end=float('inf'))
+    xf *= seg2[:crossfade].fade(from_gain=-120, start=0, end=float('inf'))
+
+    output = TemporaryFile()
+    output.write(seg1[:-crossfade]._data)
+    output.write(xf._data)
+    output.write(seg2[crossfade:]._data)
+    output.seek(0)
+    obj = seg1._spawn(data=output)
+    output.close()
+    return obj
+
+
+def reference_speedup(seg, playback_speed, chunk_size=150, crossfade=25):
+    """The previous ``effects.speedup``, for playback speeds below 2."""
+    atk = 1.0 / playback_speed
+    ms_to_remove_per_chunk = int(chunk_size * (1 - atk) / atk)
+    crossfade = min(crossfade, ms_to_remove_per_chunk - 1)
+    chunks = make_chunks(seg, chunk_size + ms_to_remove_per_chunk)
+    ms_to_remove_per_chunk -= crossfade
+    last_chunk = chunks[-1]
+    chunks = [chunk[:-ms_to_remove_per_chunk] for chunk in chunks[:-1]]
+
+    out = chunks[0]
+    for chunk in chunks[1:]:
+        out = reference_append(out, chunk, crossfade)
+    return reference_append(out, last_chunk, 0)
+
+
+def reference_sum(segments):
+    out = segments[0]
+    for seg in segments[1:]:
+        out = reference_append(out, seg, 0)
+    return out
+
+
+def add_chain(segments):
+    out = segments[0]
+    for seg in segments[1:]:
+        out = out + seg
+    return out
+
+
+def synthetic_speech(seconds):
+    """Returns 16-bit mono audio of a 180 Hz tone whose loudness rises and falls three times a second."""
+    period = array.array("h", (
+        int(8000 * math.sin(2 * math.pi * 3 * i / SAMPLE_RATE) * math.sin(2 * math.pi * 180 * i / SAMPLE_RATE))
+        for i in range(SAMPLE_RATE)
+    )).tobytes()
+    return AudioSegment(period * seconds, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    run_reference = "--reference" in sys.argv[1:]
+    print("{:>8} {:>8} {:>10} {:>12} {:>10}".format("seconds", "function", "builder s", "previous s", "identical"))
+    for seconds in DURATIONS:
+        seg = synthetic_speech(seconds)
+        chunks = make_chunks(seg, CHUNK_MS)
+        operations = [
+            ("speedup", lambda: effects.speedup(seg, PLAYBACK_SPEED), lambda: reference_speedup(seg, PLAYBACK_SPEED)),
+            ("sum", lambda: sum(chunks).raw_data, lambda: reference_sum(chunks).raw_data),
+            ("+ chain", lambda: add_chain(chunks).raw_data, lambda: reference_sum(chunks).raw_data),
+        ]
+        for name, current, reference in operations:
+            current_time, output = timed(current)
+            if run_reference or seconds <= REFERENCE_MAX_SECONDS:
+                reference_time, reference_output = timed(reference)
+                reference_columns = "{:>12.3f} {:>10}".format(reference_time, "yes" if reference_output == output else "NO")
+            else:
+                reference_columns = "{:>12} {:>10}".format("n/a", "n/a")
+            print("{:>8} {:>8} {:>10.3f} {}".format(seconds, name, current_time, reference_columns))
+
+
+if __name__ == "__main__":
+    main()
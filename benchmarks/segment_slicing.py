@@ -0,0 +1,62 @@
+"""
+Times splitting 1, 10 and 60 minutes of audio into half-second chunks with ``pydub.utils.make_chunks``, and taking the middle half of the audio with a single slice, against the previous slicing, which copied the sliced bytes into every new segment.
+
+Slices now share their parent's buffer through a ``memoryview``, so besides the run times the peak memory allocated while slicing (measured with ``tracemalloc``) is printed for both.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/segment_slicing.py
+"""
+
+import time
+import tracemalloc
+
+from pydub import AudioSegment
+from pydub.utils import make_chunks
+
+SAMPLE_RATE = 24000
+DURATIONS = (1, 10, 60)  # minutes of audio
+CHUNK_MS = 500
+
+
+def copying_slice(seg, start, end):
+    """The previous ``AudioSegment.__getitem__`` for slices inside the audio, which copied the sliced bytes."""
+    start = seg._parse_position(start) * seg.frame_width
+    end = seg._parse_position(end) * seg.frame_width
+    return seg._spawn(bytes(seg._data[start:end]))
+
+
+def copying_make_chunks(seg, chunk_length):
+    return [copying_slice(seg, i, min(i + chunk_length, len(seg))) for i in range(0, len(seg), chunk_length)]
+
+
+def measured(func):
+    """Returns the run time and the peak memory allocated in MB by func"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    print("{:>8} {:>12} {:>10} {:>12} {:>10} {:>12}".format("minutes", "operation", "shared s", "shared MB", "copied s", "copied MB"))
+    for minutes in DURATIONS:
+        seg = AudioSegment(b"\x01\x00" * (minutes * 60 * SAMPLE_RATE), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+        quarter = len(seg) // 4
+        operations = [
+            ("make_chunks", lambda: make_chunks(seg, CHUNK_MS), lambda: copying_make_chunks(seg, CHUNK_MS)),
+            ("middle half", lambda: seg[quarter:3 * quarter], lambda: copying_slice(seg, quarter, 3 * quarter)),
+        ]
+        for name, shared, copied in operations:
+            shared_time, shared_peak = measured(shared)
+            copied_time, copied_peak = measured(copied)
+            print("{:>8} {:>12} {:>10.3f} {:>12.1f} {:>10.3f} {:>12.1f}".format(
+                minutes, name, shared_time, shared_peak, copied_time, copied_peak))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Times ``pydub.silence.detect_silence`` on 1, 10 and 60 minutes of audio, and compares it against the previous implementation, which sliced the audio and computed its RMS at every ``seek_step``.
+
+The previous implementation takes minutes on an hour of audio, so it is only run on recordings up to ``REFERENCE_MAX_MINUTES`` long unless ``--reference`` is given. Whenever it is run, the silent ranges of both implementations are checked to be identical.
+
+Run from the repository root:
+
+    PYTHONPATH=myenv/Lib/site-packages python benchmarks/silence_detection.py [--reference]
+"""
+
+import array
+import itertools
+import math
+import random
+import sys
+import time
+
+from pydub import AudioSegment, silence
+from pydub.utils import db_to_float
+
+SAMPLE_RATE = 44100
+DURATIONS = (1, 10, 60)  # minutes of audio
+REFERENCE_MAX_MINUTES = 10
+MIN_SILENCE_LEN = 1000
+SILENCE_THRESH = -40
+SEEK_STEP = 1
+
+
+def reference_detect_silence(audio_segment, min_silence_len, silence_thresh, seek_step):
+    """The previous implementation of ``detect_silence``, up to combining the silent slices into ranges."""
+    seg_len = len(audio_segment)
+    if seg_len < min_silence_len:
+        return []
+    silence_thresh = db_to_float(silence_thresh) * audio_segment.max_possible_amplitude
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = range(0, last_slice_start + 1, seek_step)
+    if last_slice_start % seek_step:
+        slice_starts = itertools.chain(slice_starts, [last_slice_start])
+    silence_starts = [i for i in slice_starts if audio_segment[i:i + min_silence_len].rms <= silence_thresh]
+    if not silence_starts:
+        return []
+
+    silent_ranges = []
+    prev_i = silence_starts.pop(0)
+    current_range_start = prev_i
+    for silence_start_i in silence_starts:
+        continuous = (silence_start_i == prev_i + seek_step)
+        silence_has_gap = silence_start_i > (prev_i + min_silence_len)
+        if not continuous and silence_has_gap:
+            silent_ranges.append([current_range_start, prev_i + min_silence_len])
+            current_range_start = silence_start_i
+        prev_i = silence_start_i
+    silent_ranges.append([current_range_start, prev_i + min_silence_len])
+    return silent_ranges
+
+
+def synthetic_recording(minutes):
+    """Returns 16-bit mono audio alternating between speech-like tones and quiet background noise, in pieces of 0.2 to 3 seconds."""
+    rng = random.Random(minutes)
+    speech = array.array("h", (
+        int(8000 * math.sin(2 * math.pi * 3 * i / SAMPLE_RATE) * math.sin(2 * math.pi * 180 * i / SAMPLE_RATE))
+        for i in range(3 * SAMPLE_RATE)
+    )).tobytes()
+    background = array.array("h", (int(rng.gauss(0, 30)) for _ in range(3 * SAMPLE_RATE))).tobytes()
+
+    pieces, remaining = [], minutes * 60 * SAMPLE_RATE
+    for is_speech in itertools.cycle((False, True)):
+        if remaining <= 0:
+            break
+        frames = min(remaining, int(rng.uniform(0.2, 3) * SAMPLE_RATE))
+        pieces.append((speech if is_speech else background)[:frames * 2])
+        remaining -= frames
+    return AudioSegment(b"".join(pieces), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    run_reference = "--reference" in sys.argv[1:]
+    print("NumPy available: {}".format(silence.np is not None))
+    print("{:>8} {:>8} {:>14} {:>14} {:>10}".format("minutes", "ranges", "linear s", "previous s", "identical"))
+    for minutes in DURATIONS:
+        audio = synthetic_recording(minutes)
+        linear_time, ranges = timed(lambda: silence.detect_silence(audio, MIN_SILENCE_LEN, SILENCE_THRESH, SEEK_STEP))
+        if run_reference or minutes <= REFERENCE_MAX_MINUTES:
+            reference_time, reference_ranges = timed(lambda: reference_detect_silence(audio, MIN_SILENCE_LEN, SILENCE_THRESH, SEEK_STEP))
+            reference_columns = "{:>14.3f} {:>10}".format(reference_time, "yes" if reference_ranges == ranges else "NO")
+        else:
+            reference_columns = "{:>14} {:>10}".format("n/a", "n/a")
+        print("{:>8} {:>8} {:>14.3f} {}".format(minutes, len(ranges), linear_time, reference_columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import React, { useState, useRef } from 'react';
 import styled from 'styled-components';
-import axios from 'axios';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
 
@@ -190,6 +189,7 @@ const VoiceInterface = () => {
   );
   const [transcript, setTranscript] = useState('');
   const [isProcessing, setIsProcessing] = useState(false);
+  const [isPlaying, setIsPlaying] = useState(false);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
   const recordingIntervalRef = useRef(null);
@@ -304,51 +304,107 @@ const VoiceInterface = () => {
     }
   };
 
+  const showInstructions = () => {
+    setStatus(
+      <Instructions>
+        <span>👆 Click the button to start speaking</span>
+        <span>👆 Click again when you are done</span>
+        <span className="highlight">📱 On mobile: Please keep messages under 5 seconds</span>
+        <span className="desktop">💻 Desktop: Works with longer messages</span>
+      </Instructions>
+    );
+  };
+
+  // Plays one sentence of the response, resolving when it has finished
+  const playSegment = (audioBase64) => new Promise((resolve, reject) => {
+    const audio = new Audio(`data:audio/mp3;base64,${audioBase64}`);
+    audio.onended = resolve;
+    audio.onerror = (e) => {
+      console.error('Error playing audio:', e);
+      reject(new Error('could not play the response audio'));
+    };
+    audio.play().catch(reject);
+  });
+
+  // The server sends one JSON event per line as soon as each is ready
+  async function* readEvents(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      for (const line of lines) {
+        if (line.trim()) yield JSON.parse(line);
+      }
+    }
+    if (buffered.trim()) yield JSON.parse(buffered);
+  }
+
   const processAudio = async (audioData, mimeType) => {
     setIsProcessing(true);
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), 60000); // Increased timeout for longer messages
+    // Each sentence is queued for playback as soon as it arrives, while
+    // the server is still generating and synthesizing the next ones
+    let playback = null;
     try {
       console.log('Sending audio to server with MIME type:', mimeType);
-      const response = await axios.post(`${API_URL}/api/process-audio`, {
-        audio: audioData,
-        mimeType: mimeType
-      }, {
+      const response = await fetch(`${API_URL}/api/process-audio`, {
+        method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        timeout: 60000 // Increased timeout for longer messages
+        body: JSON.stringify({ audio: audioData, mimeType: mimeType, stream: true }),
+        signal: controller.signal
       });
+      if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.error || `Server responded with status ${response.status}`);
+      }
 
       console.log('Server response received');
 
-      if (response.data.error) {
-        console.error('Server returned error:', response.data.error);
-        setStatus(response.data.error);
-        return;
+      for await (const event of readEvents(response)) {
+        if (event.error) {
+          console.error('Server returned error:', event.error);
+          setStatus(event.error);
+          // Let the sentences that did arrive finish playing
+          if (playback) {
+            await playback.catch(() => {});
+          }
+          return;
+        }
+        if (event.transcript) {
+          setTranscript(event.transcript);
+        }
+        if (event.audio) {
+          if (!playback) {
+            playback = Promise.resolve();
+            setStatus('Playing response...');
+            setIsPlaying(true);
+          }
+          playback = playback.then(() => playSegment(event.audio));
+        }
       }
+      clearTimeout(timeout);
 
-      setTranscript(response.data.transcript);
-      setStatus('Playing response...');
-
-      const audio = new Audio(`data:audio/mp3;base64,${response.data.audio}`);
-      audio.onerror = (e) => {
-        console.error('Error playing audio:', e);
-        setStatus('Error playing audio response: ' + e.message);
-      };
-      audio.onended = () => {
-        setStatus(
-          <Instructions>
-            <span>👆 Click the button to start speaking</span>
-            <span>👆 Click again when you are done</span>
-            <span className="highlight">📱 On mobile: Please keep messages under 5 seconds</span>
-            <span className="desktop">💻 Desktop: Works with longer messages</span>
-          </Instructions>
-        );
-      };
-      await audio.play();
+      if (playback) {
+        await playback;
+      }
+      showInstructions();
     } catch (error) {
       console.error('Error processing audio:', error);
-      setStatus(error.response?.data?.error || 'Error processing audio: ' + error.message);
+      setStatus('Error processing audio: ' + (error.name === 'AbortError' ? 'the request timed out' : error.message));
+      if (playback) {
+        await playback.catch(() => {});
+      }
     } finally {
+      clearTimeout(timeout);
+      setIsPlaying(false);
       setIsProcessing(false);
     }
   };
@@ -363,7 +419,7 @@ const VoiceInterface = () => {
           disabled={isProcessing}
         />
         <Status>
-          {isProcessing ? (
+          {isProcessing && !isPlaying ? (
             <LoadingDots>
               <span></span>
               <span></span>
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from gtts import gTTS, gTTSError, __version__
-from gtts.lang import tts_langs, _fallback_deprecated_lang
+from gtts.lang import tts_langs, _fallback_deprecated_lang, _supported_langs
 import click
 import logging
 import logging.config
@@ -50,7 +50,7 @@ def validate_lang(ctx, param, lang):
     lang = _fallback_deprecated_lang(lang)
 
     try:
-        if lang not in tts_langs():
+        if lang not in _supported_langs():
             raise click.UsageError(
                 "'%s' not in list of supported languages.\n"
                 "Use --all to list languages or "
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from gtts.langs import _main_langs
+from functools import lru_cache
 from warnings import warn
 import logging
 
@@ -26,14 +27,40 @@ def tts_langs():
     - Languages that are undocumented variations that were observed to work and
       present different dialects or accents.
 
+    """
+    langs = dict(_lang_table())
+    log.debug("langs: {}".format(langs))
+    return langs
+
+
+@lru_cache(maxsize=None)
+def _lang_table():
+    """Build the merged languages dictionary once per process.
+
+    Returns:
+        dict: The dictionary returned by :func:`tts_langs`. It is shared
+            between callers and must not be modified, use
+            :func:`tts_langs` to get a copy.
+
     """
     langs = dict()
     langs.update(_main_langs())
     langs.update(_extra_langs())
-    log.debug("langs: {}".format(langs))
     return langs
 
 
+@lru_cache(maxsize=None)
+def _supported_langs():
+    """Set of the language tags Google Text-to-Speech supports.
+
+    Returns:
+        frozenset: The keys of :func:`tts_langs`, for constant-time
+            membership tests (e.g. when validating ``lang``).
+
+    """
+    return frozenset(_lang_table())
+
+
 def _extra_langs():
     """Define extra languages.
 
@@ -72,6 +99,30 @@ def _fallback_deprecated_lang(lang):
 
     """
 
+    fallback_lang = _deprecated_langs().get(lang.lower())
+    if fallback_lang is None:
+        return lang
+
+    msg = (
+        "'{}' has been deprecated, falling back to '{}'. "
+        "This fallback will be removed in a future version."
+    ).format(lang, fallback_lang)
+
+    warn(msg, DeprecationWarning)
+    log.warning(msg)
+
+    return fallback_lang
+
+
+@lru_cache(maxsize=None)
+def _deprecated_langs():
+    """Map deprecated language tags to their fallback.
+
+    Returns:
+        dict: A dictionary of the type ``{ '<deprecated lang>': '<fallback>'}``
+            where ``<deprecated lang>`` is lower-cased.
+
+    """
     deprecated = {
         # '<fallback>': [<list of deprecated langs>]
         "en": [
@@ -96,16 +147,8 @@ def _fallback_deprecated_lang(lang):
         "zh-TW": ["zh-tw"],
     }
 
-    for fallback_lang, deprecated_langs in deprecated.items():
-        if lang.lower() in deprecated_langs:
-            msg = (
-                "'{}' has been deprecated, falling back to '{}'. "
-                "This fallback will be removed in a future version."
-            ).format(lang, fallback_lang)
-
-            warn(msg, DeprecationWarning)
-            log.warning(msg)
-
-            return fallback_lang
-
-    return lang
+    return {
+        deprecated_lang: fallback_lang
+        for fallback_lang, deprecated_langs in deprecated.items()
+        for deprecated_lang in deprecated_langs
+    }
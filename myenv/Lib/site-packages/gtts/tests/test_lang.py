@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import pytest
-from gtts.lang import tts_langs, _extra_langs, _fallback_deprecated_lang
+import warnings
+from gtts.lang import (
+    tts_langs,
+    _extra_langs,
+    _fallback_deprecated_lang,
+    _lang_table,
+    _supported_langs,
+)
 from gtts.langs import _main_langs
 
 """Test language list"""
@@ -19,5 +26,37 @@ def test_deprecated_lang():
         assert _fallback_deprecated_lang("en-gb") == "en"
 
 
+def test_deprecated_lang_warns_every_call():
+    """Deprecation fallback warns every time, not just on first lookup"""
+    for _ in range(2):
+        with pytest.deprecated_call():
+            assert _fallback_deprecated_lang("FR-ca") == "fr"
+
+
+def test_not_deprecated_lang():
+    """Non-deprecated languages are returned as-is, without warning"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert _fallback_deprecated_lang("de") == "de"
+
+
+def test_tts_langs_cached():
+    """Languages table is built once, callers get their own copy"""
+    langs = tts_langs()
+    assert langs == _lang_table()
+    assert langs is not _lang_table()
+    assert _lang_table() is _lang_table()
+
+    langs["xx"] = "Made up"
+    assert "xx" not in tts_langs()
+
+
+def test_supported_langs():
+    """Supported languages set matches the languages table"""
+    assert _supported_langs() == set(tts_langs())
+    assert "zh-TW" in _supported_langs()
+    assert "xx" not in _supported_langs()
+
+
 if __name__ == "__main__":
     pytest.main(["-x", __file__])
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
+import base64
 import os
 import pytest
 from unittest.mock import Mock
 
-from gtts.tts import gTTS, gTTSError
+from gtts.tts import gTTS, gTTSError, _AudioStreamParser
 from gtts.langs import _main_langs
 from gtts.lang import _extra_langs
 
@@ -190,5 +191,59 @@ def test_WebRequest(tmp_path):
         tts.save(filename)
 
 
+def _rpc_body(payload):
+    """Build a TTS API response body around ``payload``"""
+    return (
+        b")]}'\n\n1234\n"
+        b'[["wrb.fr","jQ1olc",' + payload + b',null,null,null,"generic"],'
+        b'["di",42],["af.httprm",41,"-123",1]]\n25\n[["e",4,null,null,1234]]\n'
+    )
+
+
+def _parse(body, chunk_size):
+    parser = _AudioStreamParser(gTTS.GOOGLE_TTS_RPC)
+    decoded = []
+    for i in range(0, len(body), chunk_size):
+        decoded.append(parser.feed(body[i : i + chunk_size]))
+    parser.close()
+    return decoded
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 1024])
+def test_audio_stream_parser(chunk_size):
+    """Decode audio incrementally, whatever the chunk boundaries"""
+    audio = bytes(range(256)) * 4 + b"end"
+    encoded = base64.b64encode(audio)
+    body = _rpc_body(b'"[\\"' + encoded + b'\\"]"')
+
+    decoded = _parse(body, chunk_size)
+    assert b"".join(decoded) == audio
+
+    if chunk_size < len(encoded):
+        # Audio is yielded before the payload has been fully read
+        assert sum(1 for d in decoded if d) > 1
+
+
+def test_audio_stream_parser_no_rpc():
+    """No audio and no error when the response has no TTS RPC"""
+    body = b")]}'\n\n25\n[[\"e\",4,null,null,1234]]\n"
+    assert b"".join(_parse(body, 3)) == b""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1024])
+def test_audio_stream_parser_no_audio(chunk_size):
+    """Raise ValueError when the TTS RPC has no audio stream"""
+    with pytest.raises(ValueError):
+        _parse(_rpc_body(b"null"), chunk_size)
+
+
+def test_audio_stream_parser_truncated():
+    """Raise ValueError when the response is cut within the audio stream"""
+    encoded = base64.b64encode(b"some audio")
+    body = _rpc_body(b'"[\\"' + encoded + b'\\"]"')
+    with pytest.raises(ValueError):
+        _parse(body[: body.index(encoded) + 8], 3)
+
+
 if __name__ == "__main__":
     pytest.main(["-x", __file__])
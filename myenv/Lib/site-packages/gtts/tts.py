@@ -7,7 +7,7 @@ import urllib
 
 import requests
 
-from gtts.lang import _fallback_deprecated_lang, tts_langs
+from gtts.lang import _fallback_deprecated_lang, _supported_langs
 from gtts.tokenizer import Tokenizer, pre_processors, tokenizer_cases
 from gtts.utils import _clean_tokens, _len, _minimize, _translate_url
 
@@ -30,6 +30,93 @@ class Speed:
     NORMAL = None
 
 
+class _AudioStreamParser:
+    """Incremental parser for TTS API responses
+
+    Finds the audio payload of the ``rpc`` response and base64-decodes it
+    as the body arrives, four characters (three bytes of ``mp3``) at a time,
+    instead of waiting for the whole response to match it against a regex.
+
+    Args:
+        rpc (string): The RPC id whose payload holds the audio,
+            i.e. :attr:`gTTS.GOOGLE_TTS_RPC`.
+
+    Raises:
+        ValueError: From :meth:`feed` or :meth:`close` when the ``rpc``
+            response is present but holds no (complete) audio payload.
+
+    """
+
+    _PAYLOAD_START = b',"[\\"'
+    _PAYLOAD_END = re.compile(rb'[\\"]')
+
+    def __init__(self, rpc):
+        self._marker = '{}"'.format(rpc).encode("ascii")
+        self._buffer = b""
+        self._in_payload = False
+
+    def feed(self, chunk):
+        """Parse a chunk of the response body.
+
+        Args:
+            chunk (bytes): The next bytes of the response body.
+
+        Returns:
+            bytes: The audio decoded so far from this chunk (can be empty).
+
+        """
+        self._buffer += chunk
+        decoded = []
+
+        while True:
+            if self._in_payload:
+                end = self._PAYLOAD_END.search(self._buffer)
+                if end:
+                    decoded.append(base64.b64decode(self._buffer[: end.start()]))
+                    self._buffer = self._buffer[end.start() :]
+                    self._in_payload = False
+                    continue
+
+                # Only decode complete 4-character groups
+                size = len(self._buffer) - len(self._buffer) % 4
+                if size:
+                    decoded.append(base64.b64decode(self._buffer[:size]))
+                    self._buffer = self._buffer[size:]
+                break
+
+            idx = self._buffer.find(self._marker)
+            if idx == -1:
+                # Keep what could be the start of a marker split across chunks
+                self._buffer = self._buffer[-(len(self._marker) - 1) :]
+                break
+
+            rest = self._buffer[idx + len(self._marker) :]
+            if len(rest) < len(self._PAYLOAD_START):
+                if not self._PAYLOAD_START.startswith(rest):
+                    raise ValueError("No audio stream in response")
+                # Wait for more data to tell
+                self._buffer = self._buffer[idx:]
+                break
+
+            if not rest.startswith(self._PAYLOAD_START):
+                raise ValueError("No audio stream in response")
+
+            self._buffer = rest[len(self._PAYLOAD_START) :]
+            self._in_payload = True
+
+        return b"".join(decoded)
+
+    def close(self):
+        """Check the response body ended outside of an audio payload.
+
+        Raises:
+            ValueError: When the response was cut within the audio payload.
+
+        """
+        if self._in_payload:
+            raise ValueError("Incomplete audio stream in response")
+
+
 class gTTS:
     """gTTS -- Google Text-to-Speech.
 
@@ -140,8 +227,7 @@ class gTTS:
             self.lang = _fallback_deprecated_lang(lang)
 
             try:
-                langs = tts_langs()
-                if self.lang not in langs:
+                if self.lang not in _supported_langs():
                     raise ValueError("Language not supported: %s" % lang)
             except RuntimeError as e:
                 log.debug(str(e), exc_info=True)
@@ -255,39 +341,47 @@ class gTTS:
 
         prepared_requests = self._prepare_requests()
         for idx, pr in enumerate(prepared_requests):
-            try:
-                with requests.Session() as s:
-                    # Send request
+            with requests.Session() as s:
+                try:
+                    # Send request, the body is read as it arrives
                     r = s.send(
-                        request=pr, proxies=urllib.request.getproxies(), verify=False
+                        request=pr,
+                        proxies=urllib.request.getproxies(),
+                        verify=False,
+                        stream=True,
                     )
 
-                log.debug("headers-%i: %s", idx, r.request.headers)
-                log.debug("url-%i: %s", idx, r.request.url)
-                log.debug("status-%i: %s", idx, r.status_code)
-
-                r.raise_for_status()
-            except requests.exceptions.HTTPError as e:  # pragma: no cover
-                # Request successful, bad response
-                log.debug(str(e))
-                raise gTTSError(tts=self, response=r)
-            except requests.exceptions.RequestException as e:  # pragma: no cover
-                # Request failed
-                log.debug(str(e))
-                raise gTTSError(tts=self)
-
-            # Write
-            for line in r.iter_lines(chunk_size=1024):
-                decoded_line = line.decode("utf-8")
-                if "jQ1olc" in decoded_line:
-                    audio_search = re.search(r'jQ1olc","\[\\"(.*)\\"]', decoded_line)
-                    if audio_search:
-                        as_bytes = audio_search.group(1).encode("ascii")
-                        yield base64.b64decode(as_bytes)
-                    else:
-                        # Request successful, good response,
-                        # no audio stream in response
-                        raise gTTSError(tts=self, response=r)
+                    log.debug("headers-%i: %s", idx, r.request.headers)
+                    log.debug("url-%i: %s", idx, r.request.url)
+                    log.debug("status-%i: %s", idx, r.status_code)
+
+                    r.raise_for_status()
+                except requests.exceptions.HTTPError as e:  # pragma: no cover
+                    # Request successful, bad response
+                    log.debug(str(e))
+                    raise gTTSError(tts=self, response=r)
+                except requests.exceptions.RequestException as e:  # pragma: no cover
+                    # Request failed
+                    log.debug(str(e))
+                    raise gTTSError(tts=self)
+
+                # Write
+                parser = _AudioStreamParser(self.GOOGLE_TTS_RPC)
+                try:
+                    for chunk in r.iter_content(chunk_size=1024):
+                        decoded = parser.feed(chunk)
+                        if decoded:
+                            yield decoded
+                    parser.close()
+                except ValueError as e:
+                    # Request successful, good response,
+                    # no audio stream in response
+                    log.debug(str(e))
+                    raise gTTSError(tts=self, response=r)
+                except requests.exceptions.RequestException as e:  # pragma: no cover
+                    # Response interrupted
+                    log.debug(str(e))
+                    raise gTTSError(tts=self)
             log.debug("part-%i created", idx)
 
     def write_to_fp(self, fp):
@@ -1 +1 @@
-from .audio_segment import AudioSegment
\ No newline at end of file
+from .audio_segment import AudioSegment, AudioSegmentBuilder
@@ -3,6 +3,7 @@ from __future__ import division
 import array
 import os
 import subprocess
+import threading
 from tempfile import TemporaryFile, NamedTemporaryFile
 import wave
 import sys
@@ -24,6 +25,11 @@ try:
 except:
     izip = zip
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only to_numpy() and from_numpy() need it
+    np = None
+
 from .utils import (
     _fd_or_path_or_tempfile,
     db_to_float,
@@ -132,6 +138,35 @@ def read_wav_audio(data, headers=None):
                    data[pos:pos + data_hdr.size])
 
 
+def read_wav_stream_header(stream):
+    """
+    Reads a wav header from a stream, up to the start of the audio data.
+    Returns the header as WavData, whose raw_data is the audio that was read
+    past the header, and the size of the audio data given by the header.
+    """
+    data = b''
+    while True:
+        headers = extract_wav_headers(data)
+        if headers and headers[-1].id == b'data':
+            break
+        if len(headers) >= 10:
+            raise CouldntDecodeError("Couldn't find data header in wav data")
+        block = stream.read(4096)
+        if not block:
+            raise CouldntDecodeError("Couldn't find data header in wav data")
+        data += block
+
+    return read_wav_audio(data, headers), headers[-1].size
+
+
+def _is_writable_buffer(data):
+    """
+    returns whether data is a buffer that its owner can still modify, like a
+    bytearray or a writable memoryview, so it has to be copied to be kept
+    """
+    return not isinstance(data, bytes) and not memoryview(data).readonly
+
+
 def fix_wav_headers(data):
     headers = extract_wav_headers(data)
     if not headers or headers[-1].id != b'data':
@@ -159,6 +194,10 @@ class AudioSegment(object):
         a = AudioSegment.from_mp3(mp3file)
         first_second = a[:1000] # get the first second of an mp3
         slice = a[5000:10000] # get a slice from 5 to 10 seconds of an mp3
+
+    Slices share the audio data of the segment they're taken from instead of
+    copying it, so a short slice keeps all of that audio in memory. Use
+    slice.raw_data to copy the slice's own audio and release the rest.
     """
     converter = get_encoder_name()  # either ffmpeg or avconv
 
@@ -176,6 +215,14 @@ class AudioSegment(object):
         "ogg": "libvorbis"
     }
 
+    # formats whose muxers seek back to finish the file (to write sizes,
+    # indexes or durations in the header), so export() has ffmpeg/avconv
+    # write them to a temporary file instead of a pipe
+    SEEKABLE_OUTPUT_FORMATS = frozenset([
+        "mp4", "m4a", "m4b", "mov", "ipod", "3gp", "3g2", "ismv", "f4v", "psp",
+        "wav", "w64", "aiff", "caf", "flac", "matroska", "mkv", "webm", "asf", "wma", "avi",
+    ])
+
     def __init__(self, data=None, *args, **kwargs):
         self.sample_width = kwargs.pop("sample_width", None)
         self.frame_rate = kwargs.pop("frame_rate", None)
@@ -235,42 +282,88 @@ class AudioSegment(object):
         # Convert 24-bit audio to 32-bit audio.
         # (stdlib audioop and array modules do not support 24-bit data)
         if self.sample_width == 3:
-            byte_buffer = BytesIO()
-
-            # Workaround for python 2 vs python 3. _data in 2.x are length-1 strings,
-            # And in 3.x are ints.
-            pack_fmt = 'BBB' if isinstance(self._data[0], int) else 'ccc'
-
-            # This conversion maintains the 24 bit values.  The values are
-            # not scaled up to the 32 bit range.  Other conversions could be
-            # implemented.
-            i = iter(self._data)
-            padding = {False: b'\x00', True: b'\xFF'}
-            for b0, b1, b2 in izip(i, i, i):
-                byte_buffer.write(padding[b2 > b'\x7f'[0]])
-                old_bytes = struct.pack(pack_fmt, b0, b1, b2)
-                byte_buffer.write(old_bytes)
-
-            self._data = byte_buffer.getvalue()
+            # The three little-endian bytes of every sample become the upper
+            # bytes of a 32-bit sample, which scales the values up to the 32
+            # bit range (a 24-bit sample s becomes s * 256).
+            data = memoryview(self._data).cast('B')
+            widened = bytearray(len(data) // 3 * 4)
+            for i in range(3):
+                widened[i + 1::4] = data[i::3]
+
+            self._data = bytes(widened)
             self.sample_width = 4
             self.frame_width = self.channels * self.sample_width
 
         super(AudioSegment, self).__init__(*args, **kwargs)
 
+    # the audio data is kept in _buffer, or for sums returned by __add__, as
+    # (builder, piece count) in _pending until it is first used
+    _buffer = None
+    _pending = None
+
+    @property
+    def _data(self):
+        pending = self._pending
+        if pending is not None:
+            builder, piece_count = pending
+            with builder._lock:
+                if self._pending is not None:  # not joined by another thread meanwhile
+                    self._buffer = builder._join(piece_count)
+                    self._pending = None
+        return self._buffer
+
+    @_data.setter
+    def _data(self, data):
+        self._buffer = data
+        self._pending = None
+
     @property
     def raw_data(self):
         """
         public access to the raw audio data as a bytestring
         """
+        if not isinstance(self._data, bytes):
+            # slices (and segments created by from_numpy()) share their
+            # parent's buffer until their data is needed as bytes
+            self._data = bytes(self._data)
         return self._data
 
+    def _data_slice(self, start, end):
+        """
+        returns the audio data between the byte offsets start and end, as a
+        view of this segment's data instead of a copy (the data is never
+        modified, so slices can share it). The view keeps all of this
+        segment's data alive until the slice's raw_data is used.
+        """
+        if _is_writable_buffer(self._data):
+            # the caller's buffer, which could still be modified
+            return bytes(memoryview(self._data)[start:end])
+        return memoryview(self._data)[start:end]
+
     def get_array_of_samples(self, array_type_override=None):
         """
         returns the raw_data as an array of samples
         """
         if array_type_override is None:
             array_type_override = self.array_type
-        return array.array(array_type_override, self._data)
+        samples = array.array(array_type_override)
+        samples.frombytes(self._data)
+        return samples
+
+    def to_numpy(self):
+        """
+        returns the samples as a read-only NumPy array of shape
+        (frames, channels), which shares memory with the audio data instead of
+        copying it
+
+        24-bit audio is stored as 32-bit samples, so it's returned as int32
+        samples (the 24-bit values times 256)
+        """
+        if np is None:
+            raise ImportError("AudioSegment.to_numpy() requires NumPy")
+        samples = np.frombuffer(self._data, dtype="i{}".format(self.sample_width))
+        samples.flags.writeable = False
+        return samples.reshape(-1, self.channels)
 
     @property
     def array_type(self):
@@ -289,11 +382,25 @@ class AudioSegment(object):
             return False
 
     def __hash__(self):
-        return hash(AudioSegment) ^ hash((self.channels, self.frame_rate, self.sample_width, self._data))
+        return hash(AudioSegment) ^ hash((self.channels, self.frame_rate, self.sample_width, bytes(self._data)))
 
     def __ne__(self, other):
         return not (self == other)
 
+    def __getstate__(self):
+        # memoryviews can't be pickled (and sums are joined before copying
+        # the attributes, to leave out their builder)
+        data = bytes(self._data)
+        state = self.__dict__.copy()
+        state['_buffer'] = data
+        state.pop('_pending', None)
+        return state
+
+    def __setstate__(self, state):
+        if '_data' in state:  # pickled before _data became a property
+            state = dict(state, _buffer=state.pop('_data'))
+        self.__dict__.update(state)
+
     def __iter__(self):
         return (self[i] for i in xrange(len(self)))
 
@@ -317,10 +424,20 @@ class AudioSegment(object):
 
         start = self._parse_position(start) * self.frame_width
         end = self._parse_position(end) * self.frame_width
-        data = self._data[start:end]
+        data = self._data_slice(start, end)
 
         # ensure the output is as long as the requester is expecting
-        expected_length = end - start
+        data = self._pad_with_silence(data, end - start)
+
+        return self._spawn(data)
+
+    def _pad_with_silence(self, data, expected_length):
+        """
+        pads data (a slice of this segment's data) with silent frames up to
+        expected_length bytes, as slices ending at len(self) can be a few
+        frames longer than the audio since the length in milliseconds is
+        rounded
+        """
         missing_frames = (expected_length - len(data)) // self.frame_width
         if missing_frames:
             if missing_frames > self.frame_count(ms=2):
@@ -330,9 +447,8 @@ class AudioSegment(object):
                     "missing frames: %s" % missing_frames)
             silence = audioop.mul(data[:self.frame_width],
                                   self.sample_width, 0)
-            data += (silence * missing_frames)
-
-        return self._spawn(data)
+            data = b''.join([data, silence * missing_frames])
+        return data
 
     def get_sample_slice(self, start_sample=None, end_sample=None):
         """
@@ -356,12 +472,22 @@ class AudioSegment(object):
         start_i = bounded(start_sample, 0) * self.frame_width
         end_i = bounded(end_sample, max_val) * self.frame_width
 
-        data = self._data[start_i:end_i]
+        data = self._data_slice(start_i, end_i)
         return self._spawn(data)
 
     def __add__(self, arg):
         if isinstance(arg, AudioSegment):
-            return self.append(arg, crossfade=0)
+            # the data of a sum is only joined when it is first used, so
+            # adding to the sum again (as sum() and chains of + do) extends
+            # the same builder instead of copying all the audio added so far
+            pending = self._pending
+            if pending is not None and (self.channels, self.frame_rate, self.sample_width) == \
+                    (arg.channels, arg.frame_rate, arg.sample_width):
+                builder, piece_count = pending
+                with builder._lock:
+                    if len(builder._pieces) == piece_count:
+                        return builder.append(arg, crossfade=0)._pending_segment()
+            return AudioSegmentBuilder(self).append(arg, crossfade=0)._pending_segment()
         else:
             return self.apply_gain(arg)
 
@@ -397,7 +523,7 @@ class AudioSegment(object):
         if isinstance(arg, AudioSegment):
             return self.overlay(arg, position=0, loop=True)
         else:
-            return self._spawn(data=self._data * arg)
+            return self._spawn(data=bytes(self._data) * arg)
 
     def _spawn(self, data, overrides={}):
         """
@@ -471,6 +597,43 @@ class AudioSegment(object):
                                    "frame_rate": frame_rate,
                                    "frame_width": 2})
 
+    @classmethod
+    def from_numpy(cls, samples, frame_rate, sample_width=None):
+        """
+        Creates an audio segment from a NumPy array of int8, int16 or int32
+        samples, of shape (frames,) for mono audio or (frames, channels).
+
+        C-contiguous arrays in native byte order are wrapped without copying,
+        so they must not be modified while the segment is in use (raw_data
+        makes a copy of them as bytes). Other arrays are copied first.
+
+        24-bit audio is given as a uint8 array of little-endian sample bytes,
+        of shape (frames, 3) or (frames, channels, 3), with sample_width=3. It
+        is converted to 32-bit samples like 24-bit wav data.
+        """
+        if np is None:
+            raise ImportError("AudioSegment.from_numpy() requires NumPy")
+        samples = np.asarray(samples)
+
+        if sample_width == 3:
+            if samples.dtype != np.uint8 or samples.ndim not in (2, 3) or samples.shape[-1] != 3:
+                raise ValueError("24-bit samples must be a uint8 array of shape (frames, 3) or (frames, channels, 3)")
+            channels = 1 if samples.ndim == 2 else samples.shape[1]
+            samples = np.ascontiguousarray(samples)
+        else:
+            if samples.dtype.kind != "i" or samples.dtype.itemsize not in (1, 2, 4):
+                raise ValueError("samples must be int8, int16 or int32, not {}".format(samples.dtype))
+            if sample_width not in (None, samples.dtype.itemsize):
+                raise ValueError("sample_width {} doesn't match {} samples".format(sample_width, samples.dtype))
+            if samples.ndim not in (1, 2):
+                raise ValueError("samples must have shape (frames,) or (frames, channels)")
+            sample_width = samples.dtype.itemsize
+            channels = 1 if samples.ndim == 1 else samples.shape[1]
+            samples = np.ascontiguousarray(samples, dtype=samples.dtype.newbyteorder("="))
+
+        data = memoryview(samples.reshape(-1).view(np.uint8)).toreadonly()
+        return cls(data, sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
     @classmethod
     def from_mono_audiosegments(cls, *mono_segments):
         if not len(mono_segments):
@@ -641,8 +804,103 @@ class AudioSegment(object):
             return obj[0:duration * 1000]
 
 
+    @classmethod
+    def _decode_command(cls, orig_file, filename, format, codec, parameters, start_second, duration,
+                        read_ahead_limit, probe=True, sample_width=None, frame_rate=None, channels=None,
+                        probe_info=None):
+        """
+        Returns the ffmpeg/avconv command that decodes orig_file to wav on
+        stdout. The file is read from stdin if there's no filename.
+
+        The output has the given sample_width, frame_rate and channels. The
+        file's own sample width is kept otherwise, which is taken from
+        probe_info (the result of mediainfo_json() for the file) or found by
+        running ffprobe on the file, unless probe is False.
+        """
+        conversion_command = [cls.converter,
+                              '-y',  # always overwrite existing files
+                              ]
+
+        # If format is not defined
+        # ffmpeg/avconv will detect it automatically
+        if format:
+            conversion_command += ["-f", format]
+
+        if codec:
+            # force audio decoder
+            conversion_command += ["-acodec", codec]
+
+        if filename:
+            conversion_command += ["-i", filename]
+        else:
+            if cls.converter == 'ffmpeg':
+                conversion_command += ["-read_ahead_limit", str(read_ahead_limit),
+                                       "-i", "cache:pipe:0"]
+            else:
+                conversion_command += ["-i", "-"]
+
+        if sample_width is not None:
+            # the output format is known, there's no need to probe the file
+            info = None
+            conversion_command += ["-acodec", 'pcm_u8' if sample_width == 1 else 'pcm_s%dle' % (8 * sample_width)]
+        elif probe_info is not None:
+            info = probe_info
+        elif probe:
+            info = mediainfo_json(orig_file, read_ahead_limit=read_ahead_limit)
+        else:
+            info = None
+        if info:
+            audio_streams = [x for x in info['streams']
+                             if x['codec_type'] == 'audio']
+            # This is a workaround for some ffprobe versions that always say
+            # that mp3/mp4/aac/webm/ogg files contain fltp samples
+            audio_codec = audio_streams[0].get('codec_name')
+            if (audio_streams[0].get('sample_fmt') == 'fltp' and
+                    audio_codec in ['mp3', 'mp4', 'aac', 'webm', 'ogg']):
+                bits_per_sample = 16
+            else:
+                bits_per_sample = audio_streams[0]['bits_per_sample']
+            if bits_per_sample == 8:
+                acodec = 'pcm_u8'
+            else:
+                acodec = 'pcm_s%dle' % bits_per_sample
+
+            conversion_command += ["-acodec", acodec]
+
+        if frame_rate is not None:
+            conversion_command += ["-ar", str(frame_rate)]
+
+        if channels is not None:
+            conversion_command += ["-ac", str(channels)]
+
+        conversion_command += [
+            "-vn",  # Drop any video streams if there are any
+            "-f", "wav"  # output options (filename last)
+        ]
+
+        if start_second is not None:
+            conversion_command += ["-ss", str(start_second)]
+
+        if duration is not None:
+            conversion_command += ["-t", str(duration)]
+
+        conversion_command += ["-"]
+
+        if parameters is not None:
+            # extend arguments with arbitrary set
+            conversion_command.extend(parameters)
+
+        return conversion_command
+
     @classmethod
     def from_file(cls, file, format=None, codec=None, parameters=None, start_second=None, duration=None, **kwargs):
+        """
+        Decodes an audio file. The sample_width, frame_rate and channels
+        keyword arguments (required for raw files) convert the audio while
+        it's decoded. Giving sample_width, or probe_info (the result of
+        mediainfo_json() for the file), saves running ffprobe on the file
+        before decoding it.
+        """
         orig_file = file
         try:
             filename = fsdecode(file)
@@ -695,71 +953,19 @@ class AudioSegment(object):
             else:
                 return cls(data=file.read(), metadata=metadata)[start_second*1000:(start_second+duration)*1000]
 
-        conversion_command = [cls.converter,
-                              '-y',  # always overwrite existing files
-                              ]
-
-        # If format is not defined
-        # ffmpeg/avconv will detect it automatically
-        if format:
-            conversion_command += ["-f", format]
-
-        if codec:
-            # force audio decoder
-            conversion_command += ["-acodec", codec]
-
-        read_ahead_limit = kwargs.get('read_ahead_limit', -1)
         if filename:
-            conversion_command += ["-i", filename]
             stdin_parameter = None
             stdin_data = None
         else:
-            if cls.converter == 'ffmpeg':
-                conversion_command += ["-read_ahead_limit", str(read_ahead_limit),
-                                       "-i", "cache:pipe:0"]
-            else:
-                conversion_command += ["-i", "-"]
             stdin_parameter = subprocess.PIPE
             stdin_data = file.read()
 
-        if codec:
-            info = None
-        else:
-            info = mediainfo_json(orig_file, read_ahead_limit=read_ahead_limit)
-        if info:
-            audio_streams = [x for x in info['streams']
-                             if x['codec_type'] == 'audio']
-            # This is a workaround for some ffprobe versions that always say
-            # that mp3/mp4/aac/webm/ogg files contain fltp samples
-            audio_codec = audio_streams[0].get('codec_name')
-            if (audio_streams[0].get('sample_fmt') == 'fltp' and
-                    audio_codec in ['mp3', 'mp4', 'aac', 'webm', 'ogg']):
-                bits_per_sample = 16
-            else:
-                bits_per_sample = audio_streams[0]['bits_per_sample']
-            if bits_per_sample == 8:
-                acodec = 'pcm_u8'
-            else:
-                acodec = 'pcm_s%dle' % bits_per_sample
-
-            conversion_command += ["-acodec", acodec]
-
-        conversion_command += [
-            "-vn",  # Drop any video streams if there are any
-            "-f", "wav"  # output options (filename last)
-        ]
-
-        if start_second is not None:
-            conversion_command += ["-ss", str(start_second)]
-
-        if duration is not None:
-            conversion_command += ["-t", str(duration)]
-
-        conversion_command += ["-"]
-
-        if parameters is not None:
-            # extend arguments with arbitrary set
-            conversion_command.extend(parameters)
+        conversion_command = cls._decode_command(orig_file, filename, format, codec, parameters, start_second,
+                                                 duration, kwargs.get('read_ahead_limit', -1), probe=not codec,
+                                                 sample_width=kwargs.get('sample_width'),
+                                                 frame_rate=kwargs.get('frame_rate'),
+                                                 channels=kwargs.get('channels'),
+                                                 probe_info=kwargs.get('probe_info'))
 
         log_conversion(conversion_command)
 
@@ -791,6 +997,209 @@ class AudioSegment(object):
         else:
             return obj[0:duration * 1000]
 
+    @classmethod
+    def iter_file(cls, file, format=None, codec=None, parameters=None, start_second=None, duration=None,
+                  chunk_ms=1000, **kwargs):
+        """
+        Decodes an audio file incrementally, yielding audio segments of
+        chunk_ms milliseconds (the last one can be shorter), so that memory
+        use doesn't depend on the length of the file. Takes the same
+        arguments as from_file().
+
+        wav and raw files are read directly, other formats are decoded by
+        ffmpeg/avconv, whose output is read as it's produced. File objects
+        are fed to ffmpeg/avconv as they're decoded, so they're not probed
+        with ffprobe, and are decoded to 16-bit audio unless sample_width,
+        probe_info, codec or parameters say otherwise.
+        """
+        orig_file = file
+        try:
+            filename = fsdecode(file)
+        except TypeError:
+            filename = None
+        file, close_file = _fd_or_path_or_tempfile(file, 'rb', tempfile=False)
+
+        if format:
+            format = format.lower()
+            format = AUDIO_FILE_EXT_ALIASES.get(format, format)
+
+        def is_format(f):
+            f = f.lower()
+            if format == f:
+                return True
+
+            if filename:
+                return filename.lower().endswith(".{0}".format(f))
+
+            return False
+
+        try:
+            if is_format("wav"):
+                try:
+                    start = file.tell()
+                except (OSError, ValueError):
+                    start = None  # not seekable, can't fall back to ffmpeg after reading the header
+                try:
+                    wav_data, data_size = read_wav_stream_header(file)
+                except CouldntDecodeError:
+                    if start is None:
+                        raise
+                    file.seek(start)
+                else:
+                    metadata = {
+                        'sample_width': wav_data.bits_per_sample // 8,
+                        'frame_rate': wav_data.sample_rate,
+                        'channels': wav_data.channels,
+                        'frame_width': wav_data.channels * wav_data.bits_per_sample // 8,
+                    }
+                    for chunk in cls._iter_pcm_chunks(file, wav_data.raw_data, data_size, metadata, chunk_ms,
+                                                      start_second, duration):
+                        if metadata['sample_width'] == 1:
+                            # convert from unsigned integers in wav
+                            chunk = chunk._spawn(audioop.bias(chunk._data, 1, -128))
+                        yield chunk
+                    return
+            elif is_format("raw") or is_format("pcm"):
+                sample_width = kwargs['sample_width']
+                frame_rate = kwargs['frame_rate']
+                channels = kwargs['channels']
+                metadata = {
+                    'sample_width': sample_width,
+                    'frame_rate': frame_rate,
+                    'channels': channels,
+                    'frame_width': channels * sample_width
+                }
+                for chunk in cls._iter_pcm_chunks(file, b'', None, metadata, chunk_ms, start_second, duration):
+                    yield chunk
+                return
+
+            conversion_command = cls._decode_command(orig_file, filename, format, codec, parameters, start_second,
+                                                     duration, kwargs.get('read_ahead_limit', -1),
+                                                     probe=not codec and filename is not None,
+                                                     sample_width=kwargs.get('sample_width'),
+                                                     frame_rate=kwargs.get('frame_rate'),
+                                                     channels=kwargs.get('channels'),
+                                                     probe_info=kwargs.get('probe_info'))
+            for chunk in cls._iter_decoded_chunks(conversion_command, None if filename else file, chunk_ms):
+                yield chunk
+        finally:
+            if close_file:
+                file.close()
+
+    @classmethod
+    def _iter_pcm_chunks(cls, stream, head, data_size, metadata, chunk_ms, start_second=None, duration=None):
+        """
+        Yields audio segments of chunk_ms milliseconds of the PCM data in
+        stream, which starts with the bytes in head and has data_size bytes
+        (or runs to the end of the stream if data_size is None). Skips
+        start_second seconds and stops after duration seconds, if given.
+        """
+        frame_width = metadata['frame_width']
+        frame_rate = metadata['frame_rate']
+        chunk_size = max(1, int(frame_rate * chunk_ms / 1000.0)) * frame_width
+        remaining = float('inf') if data_size is None else data_size // frame_width * frame_width
+
+        if start_second is not None:
+            skip = min(int(start_second * frame_rate) * frame_width, remaining)
+            remaining -= skip
+            if skip <= len(head):
+                head = head[skip:]
+            else:
+                skip -= len(head)
+                head = b''
+                try:
+                    stream.seek(skip, os.SEEK_CUR)
+                except (AttributeError, OSError, ValueError):
+                    # not seekable, read past the skipped audio instead
+                    while skip > 0:
+                        block = stream.read(min(skip, 2 ** 20))
+                        if not block:
+                            return
+                        skip -= len(block)
+        if duration is not None:
+            remaining = min(remaining, int(duration * frame_rate) * frame_width)
+
+        buffer = head if remaining == float('inf') else head[:remaining]
+        while remaining > 0:
+            while len(buffer) < min(chunk_size, remaining):
+                block = stream.read(min(chunk_size, remaining) - len(buffer))
+                if not block:
+                    break
+                buffer += block
+            data = buffer[:min(chunk_size, remaining)]
+            data = data[:len(data) // frame_width * frame_width]
+            if not data:
+                return
+            yield cls(data, metadata=dict(metadata))
+            buffer = buffer[len(data):]
+            remaining -= len(data)
+
+    @classmethod
+    def _iter_decoded_chunks(cls, conversion_command, stdin_file, chunk_ms):
+        """
+        Runs conversion_command, feeding it stdin_file (unless it's None), and
+        yields audio segments of chunk_ms milliseconds of the wav audio it
+        writes to stdout, as it's produced
+        """
+        log_conversion(conversion_command)
+
+        stderr_file = TemporaryFile()
+        p = subprocess.Popen(conversion_command, stdin=None if stdin_file is None else subprocess.PIPE,
+                             stdout=subprocess.PIPE, stderr=stderr_file)
+
+        def feed_stdin():
+            try:
+                for block in iter(lambda: stdin_file.read(2 ** 16), b''):
+                    p.stdin.write(block)
+            except (BrokenPipeError, ValueError):
+                pass  # the decoder stopped reading, it reports its own errors
+            finally:
+                try:
+                    p.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        if stdin_file is not None:
+            stdin_thread = threading.Thread(target=feed_stdin)
+            stdin_thread.daemon = True
+            stdin_thread.start()
+
+        try:
+            try:
+                wav_data, _ = read_wav_stream_header(p.stdout)
+            except CouldntDecodeError:
+                wav_data = None
+            if wav_data is not None:
+                metadata = {
+                    'sample_width': wav_data.bits_per_sample // 8,
+                    'frame_rate': wav_data.sample_rate,
+                    'channels': wav_data.channels,
+                    'frame_width': wav_data.channels * wav_data.bits_per_sample // 8,
+                }
+                # the data size isn't known in advance when writing to a
+                # pipe, so the header's size is ignored
+                for chunk in cls._iter_pcm_chunks(p.stdout, wav_data.raw_data, None, metadata, chunk_ms):
+                    if metadata['sample_width'] == 1:
+                        # convert from unsigned integers in wav
+                        chunk = chunk._spawn(audioop.bias(chunk._data, 1, -128))
+                    yield chunk
+
+            p.wait()
+            if p.returncode != 0 or wav_data is None:
+                stderr_file.seek(0)
+                raise CouldntDecodeError(
+                    "Decoding failed. ffmpeg returned error code: {0}\n\nOutput from ffmpeg/avlib:\n\n{1}".format(
+                        p.returncode, stderr_file.read().decode(errors='ignore')))
+        finally:
+            if p.poll() is None:
+                # the caller stopped iterating before the end of the file
+                p.kill()
+            p.stdout.close()
+            p.wait()
+            if stdin_file is not None:
+                stdin_thread.join()
+            stderr_file.close()
+
     @classmethod
     def from_mp3(cls, file, parameters=None):
         return cls.from_file(file, 'mp3', parameters=parameters)
@@ -876,37 +1285,42 @@ class AudioSegment(object):
         easy_wav = format == "wav" and codec is None and parameters is None
 
         if easy_wav:
-            data = out_f
-        else:
-            data = NamedTemporaryFile(mode="wb", delete=False)
-
-        pcm_for_wav = self._data
-        if self.sample_width == 1:
-            # convert to unsigned integers for wav
-            pcm_for_wav = audioop.bias(self._data, 1, 128)
-
-        wave_data = wave.open(data, 'wb')
-        wave_data.setnchannels(self.channels)
-        wave_data.setsampwidth(self.sample_width)
-        wave_data.setframerate(self.frame_rate)
-        # For some reason packing the wave header struct with
-        # a float in python 2 doesn't throw an exception
-        wave_data.setnframes(int(self.frame_count()))
-        wave_data.writeframesraw(pcm_for_wav)
-        wave_data.close()
-
-        # for easy wav files, we're done (wav data is written directly to out_f)
-        if easy_wav:
+            pcm_for_wav = self._data
+            if self.sample_width == 1:
+                # convert to unsigned integers for wav
+                pcm_for_wav = audioop.bias(self._data, 1, 128)
+
+            wave_data = wave.open(out_f, 'wb')
+            wave_data.setnchannels(self.channels)
+            wave_data.setsampwidth(self.sample_width)
+            wave_data.setframerate(self.frame_rate)
+            # For some reason packing the wave header struct with
+            # a float in python 2 doesn't throw an exception
+            wave_data.setnframes(int(self.frame_count()))
+            wave_data.writeframesraw(pcm_for_wav)
+            wave_data.close()
+
+            # for easy wav files, we're done (wav data is written directly to out_f)
             out_f.seek(0)
             return out_f
 
-        output = NamedTemporaryFile(mode="w+b", delete=False)
+        # the converter reads the samples from stdin, and writes the encoded
+        # audio to stdout unless the format needs a seekable output file
+        if format in self.SEEKABLE_OUTPUT_FORMATS:
+            output = NamedTemporaryFile(mode="w+b", delete=False)
+            output_name = output.name
+        else:
+            output = None
+            output_name = "pipe:1"
 
         # build converter command to export
         conversion_command = [
             self.converter,
             '-y',  # always overwrite existing files
-            "-f", "wav", "-i", data.name,  # input options (filename last)
+            "-f", "s8" if self.sample_width == 1 else "s%dle" % (8 * self.sample_width),
+            "-ar", str(self.frame_rate),
+            "-ac", str(self.channels),
+            "-i", "pipe:0",  # input options (filename last)
         ]
 
         if codec is None:
@@ -953,32 +1367,35 @@ class AudioSegment(object):
             conversion_command.extend(["-write_xing", "0"])
 
         conversion_command.extend([
-            "-f", format, output.name,  # output options (filename last)
+            "-f", format, output_name,  # output options (filename last)
         ])
 
         log_conversion(conversion_command)
 
-        # read stdin / write stdout
-        with open(os.devnull, 'rb') as devnull:
-            p = subprocess.Popen(conversion_command, stdin=devnull, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        p_out, p_err = p.communicate()
-
-        log_subprocess_output(p_out)
-        log_subprocess_output(p_err)
-
-        if p.returncode != 0:
-            raise CouldntEncodeError(
-                "Encoding failed. ffmpeg/avlib returned error code: {0}\n\nCommand:{1}\n\nOutput from ffmpeg/avlib:\n\n{2}".format(
-                    p.returncode, conversion_command, p_err.decode(errors='ignore') ))
+        # write stdin / read stdout
+        try:
+            p = subprocess.Popen(conversion_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+            p_out, p_err = p.communicate(input=self._data)
 
-        output.seek(0)
-        out_f.write(output.read())
+            if output is not None:
+                log_subprocess_output(p_out)
+            log_subprocess_output(p_err)
 
-        data.close()
-        output.close()
+            if p.returncode != 0:
+                raise CouldntEncodeError(
+                    "Encoding failed. ffmpeg/avlib returned error code: {0}\n\nCommand:{1}\n\nOutput from ffmpeg/avlib:\n\n{2}".format(
+                        p.returncode, conversion_command, p_err.decode(errors='ignore') ))
 
-        os.unlink(data.name)
-        os.unlink(output.name)
+            if output is None:
+                out_f.write(p_out)
+            else:
+                output.seek(0)
+                out_f.write(output.read())
+        finally:
+            if output is not None:
+                output.close()
+                os.unlink(output.name)
 
         out_f.seek(0)
         return out_f
@@ -1248,32 +1665,12 @@ class AudioSegment(object):
         return spawn(data=output)
 
     def append(self, seg, crossfade=100):
-        seg1, seg2 = AudioSegment._sync(self, seg)
-
-        if not crossfade:
-            return seg1._spawn(seg1._data + seg2._data)
-        elif crossfade > len(self):
-            raise ValueError("Crossfade is longer than the original AudioSegment ({}ms > {}ms)".format(
-                crossfade, len(self)
-            ))
-        elif crossfade > len(seg):
-            raise ValueError("Crossfade is longer than the appended AudioSegment ({}ms > {}ms)".format(
-                crossfade, len(seg)
-            ))
-
-        xf = seg1[-crossfade:].fade(to_gain=-120, start=0, end=float('inf'))
-        xf *= seg2[:crossfade].fade(from_gain=-120, start=0, end=float('inf'))
-
-        output = TemporaryFile()
-
-        output.write(seg1[:-crossfade]._data)
-        output.write(xf._data)
-        output.write(seg2[crossfade:]._data)
-
-        output.seek(0)
-        obj = seg1._spawn(data=output)
-        output.close()
-        return obj
+        """
+        Returns this segment followed by seg, crossfading the two over
+        crossfade milliseconds. To append many segments, use an
+        AudioSegmentBuilder, which only copies the audio once.
+        """
+        return AudioSegmentBuilder(self).append(seg, crossfade=crossfade).build()
 
     def fade(self, to_gain=0, from_gain=0, start=None, end=None,
              duration=None):
@@ -1396,4 +1793,143 @@ class AudioSegment(object):
         return src.format(base64=data)
 
 
+class AudioSegmentBuilder(object):
+    """
+    Appends AudioSegments one after the other, with optional crossfades, like
+    AudioSegment.append() does, but keeps the appended data as a list of
+    pieces that build() joins once, instead of copying all the audio gathered
+    so far on every append:
+
+        builder = AudioSegmentBuilder()
+        for chunk in chunks:
+            builder.append(chunk, crossfade=25)
+        output = builder.build()
+    """
+
+    def __init__(self, seg=None):
+        # an empty segment with the format of the audio gathered so far
+        self._template = None
+        self._pieces = []
+        self._size = 0  # bytes in self._pieces
+        self._lock = threading.Lock()  # held while sums returned by AudioSegment.__add__ extend or join the pieces
+        if seg is not None:
+            self.append(seg, crossfade=0)
+
+    def __len__(self):
+        """
+        returns the length of the audio gathered so far in milliseconds
+        """
+        if self._template is None:
+            return 0
+        frame_count = self._size // self._template.frame_width
+        return round(1000 * (frame_count / self._template.frame_rate))
+
+    def append(self, seg, crossfade=100):
+        """
+        Appends seg, crossfading it with the audio gathered so far over
+        crossfade milliseconds, and returns the builder. The result is the
+        same as with AudioSegment.append(), including the conversion of both
+        to the highest channel count, frame rate and sample width.
+        """
+        if crossfade and crossfade > len(self):
+            raise ValueError("Crossfade is longer than the original AudioSegment ({}ms > {}ms)".format(
+                crossfade, len(self)
+            ))
+        elif crossfade and crossfade > len(seg):
+            raise ValueError("Crossfade is longer than the appended AudioSegment ({}ms > {}ms)".format(
+                crossfade, len(seg)
+            ))
+
+        if self._template is None:
+            self._template = seg._spawn(b'')
+        else:
+            seg = self._sync(seg)
+
+        if not crossfade:
+            self._add(seg._data)
+            return self
+
+        xf = self._pop_tail(crossfade).fade(to_gain=-120, start=0, end=float('inf'))
+        xf *= seg[:crossfade].fade(from_gain=-120, start=0, end=float('inf'))
+        self._add(xf._data)
+        self._add(seg[crossfade:]._data)
+        return self
+
+    def build(self):
+        """
+        returns the audio gathered so far as an AudioSegment
+        """
+        if self._template is None:
+            return AudioSegment.empty()
+        return self._template._spawn(self._join(len(self._pieces)))
+
+    def _sync(self, seg):
+        """
+        converts the audio gathered so far and seg to the same format, like
+        AudioSegment._sync(), and returns the converted seg
+        """
+        template = self._template
+        channels = max(template.channels, seg.channels)
+        frame_rate = max(template.frame_rate, seg.frame_rate)
+        sample_width = max(template.sample_width, seg.sample_width)
+
+        if (template.channels, template.frame_rate, template.sample_width) != (channels, frame_rate, sample_width):
+            converted = self.build().set_channels(channels).set_frame_rate(frame_rate).set_sample_width(sample_width)
+            self._template = converted._spawn(b'')
+            self._pieces = []
+            self._size = 0
+            self._add(converted._data)
+
+        return seg.set_channels(channels).set_frame_rate(frame_rate).set_sample_width(sample_width)
+
+    def _add(self, data):
+        if _is_writable_buffer(data):
+            # the caller's buffer, which could be modified before build()
+            data = bytes(data)
+        if data:
+            self._pieces.append(data)
+            self._size += len(data)
+
+    def _pop_tail(self, ms):
+        """
+        removes the last ms milliseconds of the audio gathered so far and
+        returns them as an AudioSegment, cutting at the same frames as
+        output[:-ms] and output[-ms:] would
+        """
+        template = self._template
+        length = len(self)
+        start = int(template.frame_count(ms=length - ms)) * template.frame_width
+        end = int(template.frame_count(ms=length)) * template.frame_width
+
+        tail = []
+        while self._size > start:
+            piece = self._pieces.pop()
+            self._size -= len(piece)
+            tail.append(piece)
+        tail.reverse()
+
+        # the first piece of the tail can begin before start
+        if self._size < start:
+            head = memoryview(tail[0])
+            keep = start - self._size
+            self._pieces.append(head[:keep])
+            self._size += keep
+            tail[0] = head[keep:]
+
+        data = b''.join(tail)[:end - start]
+        return template._spawn(template._pad_with_silence(data, end - start))
+
+    def _join(self, piece_count):
+        return b''.join(self._pieces[:piece_count])
+
+    def _pending_segment(self):
+        """
+        returns an AudioSegment of the audio gathered so far whose data is
+        only joined when it is first used, for AudioSegment.__add__
+        """
+        seg = self._template._spawn(b'')
+        seg._pending = (self, len(self._pieces))
+        return seg
+
+
 from . import effects
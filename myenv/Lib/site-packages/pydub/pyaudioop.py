@@ -1,25 +1,46 @@
+"""
+Pure Python replacement for the audioop module, which was removed from the
+standard library in Python 3.13.
+
+Every function gives the same results as the standard library audioop module
+(including its rounding and clipping rules, and sample widths of 1, 2, 3 and
+4 bytes). Samples are processed as whole NumPy arrays when NumPy is
+installed, and with the array module otherwise.
+
+The u-law, a-law and ADPCM codecs are not implemented.
+"""
 try:
     from __builtin__ import max as builtin_max
     from __builtin__ import min as builtin_min
 except ImportError:
     from builtins import max as builtin_max
     from builtins import min as builtin_min
+import array
+import itertools
 import math
-import struct
+import sys
 try:
     from fractions import gcd
 except ImportError:  # Python 3.9+
     from math import gcd
-from ctypes import create_string_buffer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, samples are processed with the array module without it
+    np = None
 
 
 class error(Exception):
     pass
 
 
+_ARRAY_TYPES = {1: "b", 2: "h", 4: "i"}
+_NUMPY_TYPES = {1: "i1", 2: "i2", 4: "i4"}
+
+
 def _check_size(size):
-    if size != 1 and size != 2 and size != 4:
-        raise error("Size should be 1, 2 or 4")
+    if size not in (1, 2, 3, 4):
+        raise error("Size should be 1, 2, 3 or 4")
 
 
 def _check_params(length, size):
@@ -28,505 +49,503 @@ def _check_params(length, size):
         raise error("not a whole number of frames")
 
 
-def _sample_count(cp, size):
-    return len(cp) / size
-
-
-def _get_samples(cp, size, signed=True):
-    for i in range(_sample_count(cp, size)):
-        yield _get_sample(cp, size, i, signed)
-
+def _check_int(value):
+    # arguments that audioop stores in a C int
+    if not -0x80000000 <= value <= 0x7fffffff:
+        raise OverflowError("Python int too large to convert to C int")
 
-def _struct_format(size, signed):
-    if size == 1:
-        return "b" if signed else "B"
-    elif size == 2:
-        return "h" if signed else "H"
-    elif size == 4:
-        return "i" if signed else "I"
 
-
-def _get_sample(cp, size, i, signed=True):
-    fmt = _struct_format(size, signed)
-    start = i * size
-    end = start + size
-    return struct.unpack_from(fmt, buffer(cp)[start:end])[0]
-
-
-def _put_sample(cp, size, i, val, signed=True):
-    fmt = _struct_format(size, signed)
-    struct.pack_into(fmt, cp, i * size, val)
+def _buffer(cp):
+    """Returns cp (any bytes-like object) as a memoryview of bytes"""
+    return memoryview(cp).cast("B")
 
 
 def _get_maxval(size, signed=True):
-    if signed and size == 1:
-        return 0x7f
-    elif size == 1:
-        return 0xff
-    elif signed and size == 2:
-        return 0x7fff
-    elif size == 2:
-        return 0xffff
-    elif signed and size == 4:
-        return 0x7fffffff
-    elif size == 4:
-        return 0xffffffff
+    return (1 << (8 * size - 1)) - 1 if signed else (1 << (8 * size)) - 1
 
 
 def _get_minval(size, signed=True):
-    if not signed:
-        return 0
-    elif size == 1:
-        return -0x80
-    elif size == 2:
-        return -0x8000
-    elif size == 4:
-        return -0x80000000
-
-
-def _get_clipfn(size, signed=True):
-    maxval = _get_maxval(size, signed)
-    minval = _get_minval(size, signed)
-    return lambda val: builtin_max(min(val, maxval), minval)
-
-
-def _overflow(val, size, signed=True):
-    minval = _get_minval(size, signed)
-    maxval = _get_maxval(size, signed)
-    if minval <= val <= maxval:
-        return val
-
-    bits = size * 8
-    if signed:
-        offset = 2**(bits-1)
-        return ((val + offset) % (2**bits)) - offset
+    return -(1 << (8 * size - 1)) if signed else 0
+
+
+def _samples(cp, size):
+    """
+    Returns the signed samples of cp, as an int64 NumPy array if NumPy is
+    installed, and as a sequence of ints otherwise
+    """
+    data = _buffer(cp)
+    if size != 3:
+        if np is not None:
+            return np.frombuffer(data, dtype=_NUMPY_TYPES[size]).astype(np.int64)
+        return array.array(_ARRAY_TYPES[size], bytes(data))
+
+    # 24 bit samples are little-endian, they are widened to the upper bytes of
+    # little-endian 32 bit samples and sign extended by shifting them back down
+    widened = bytearray(len(data) // 3 * 4)
+    for i in range(3):
+        widened[i + 1::4] = data[i::3]
+    if np is not None:
+        return np.frombuffer(widened, dtype="<i4").astype(np.int64) >> 8
+    samples = array.array("i", bytes(widened))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return [sample >> 8 for sample in samples]
+
+
+def _pack(samples, size):
+    """Returns the bytes of samples, which must fit in size bytes"""
+    if np is not None:
+        samples = np.asarray(samples)
+        if size != 3:
+            return samples.astype(_NUMPY_TYPES[size]).tobytes()
+        data = samples.astype("<i4").tobytes()
     else:
-        return val % (2**bits)
+        if size != 3:
+            return array.array(_ARRAY_TYPES[size], samples).tobytes()
+        samples = array.array("i", samples)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        data = samples.tobytes()
+    # drop the most significant byte of every little-endian 32 bit sample
+    packed = bytearray(len(data) // 4 * 3)
+    for i in range(3):
+        packed[i::3] = data[i::4]
+    return bytes(packed)
+
+
+def _fbound(values, minval, maxval):
+    """
+    Clips and rounds floats to integers the way audioop does: values above
+    maxval become maxval, values below minval + 1 become minval, and the rest
+    are rounded down
+    """
+    if np is not None:
+        return np.where(values > maxval, maxval,
+                        np.where(values < minval + 1, minval, np.floor(values))).astype(np.int64)
+    return [maxval if value > maxval else minval if value < minval + 1 else int(math.floor(value))
+            for value in values]
+
+
+def _sum_of_products(values1, values2):
+    """Returns the exact sum of values1[i] * values2[i]"""
+    if np is not None:
+        # products of (unsigned) 16 bit samples fit in 32 bits, so 2**30 of
+        # them can be summed in 64 bit integers
+        total = 0
+        for start in range(0, len(values1), 1 << 30):
+            total += int(np.dot(values1[start:start + (1 << 30)], values2[start:start + (1 << 30)]))
+        return total
+    return sum(map(int.__mul__, values1, values2))
+
+
+def _divide(numerator, denominator):
+    # C double division, which doesn't raise for a zero denominator
+    if denominator == 0:
+        return math.copysign(float("inf"), numerator) if numerator else float("nan")
+    return numerator / denominator
 
 
 def getsample(cp, size, i):
     _check_params(len(cp), size)
     if not (0 <= i < len(cp) / size):
         raise error("Index out of range")
-    return _get_sample(cp, size, i)
+    return int(_samples(_buffer(cp)[i * size:(i + 1) * size], size)[0])
 
 
 def max(cp, size):
     _check_params(len(cp), size)
-
     if len(cp) == 0:
         return 0
-
-    return builtin_max(abs(sample) for sample in _get_samples(cp, size))
+    samples = _samples(cp, size)
+    if np is not None:
+        return int(np.abs(samples).max())
+    return builtin_max(builtin_max(samples), -builtin_min(samples))
 
 
 def minmax(cp, size):
     _check_params(len(cp), size)
-
-    max_sample, min_sample = 0, 0
-    for sample in _get_samples(cp, size):
-        max_sample = builtin_max(sample, max_sample)
-        min_sample = builtin_min(sample, min_sample)
-
-    return min_sample, max_sample
+    if len(cp) == 0:
+        return 0x7fffffff, -0x80000000
+    samples = _samples(cp, size)
+    if np is not None:
+        return int(samples.min()), int(samples.max())
+    return builtin_min(samples), builtin_max(samples)
 
 
 def avg(cp, size):
     _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
+    sample_count = len(cp) // size
     if sample_count == 0:
         return 0
-    return sum(_get_samples(cp, size)) / sample_count
+    samples = _samples(cp, size)
+    total = int(samples.sum()) if np is not None else sum(samples)
+    return int(math.floor(total / sample_count))
 
 
 def rms(cp, size):
     _check_params(len(cp), size)
-
-    sample_count = _sample_count(cp, size)
+    sample_count = len(cp) // size
     if sample_count == 0:
         return 0
+    samples = _samples(cp, size)
+    if np is not None and size > 2:
+        # squares of 32 bit samples don't fit in 64 bits, split them into 16 bit halves
+        high, low = samples >> 16, samples & 0xffff
+        sum_squares = ((_sum_of_products(high, high) << 32) + (_sum_of_products(high, low) << 17)
+                       + _sum_of_products(low, low))
+    else:
+        sum_squares = _sum_of_products(samples, samples)
+    return int(math.sqrt(float(sum_squares) / sample_count))
 
-    sum_squares = sum(sample**2 for sample in _get_samples(cp, size))
-    return int(math.sqrt(sum_squares / sample_count))
-
-
-def _sum2(cp1, cp2, length):
-    size = 2
-    total = 0
-    for i in range(length):
-        total += getsample(cp1, size, i) * getsample(cp2, size, i)
-    return total
-
-
-def findfit(cp1, cp2):
-    size = 2
 
-    if len(cp1) % 2 != 0 or len(cp2) % 2 != 0:
+def _check_width2(cp):
+    if len(cp) % 2 != 0:
         raise error("Strings should be even-sized")
 
-    if len(cp1) < len(cp2):
-        raise error("First sample should be longer")
-
-    len1 = _sample_count(cp1, size)
-    len2 = _sample_count(cp2, size)
-
-    sum_ri_2 = _sum2(cp2, cp2, len2)
-    sum_aij_2 = _sum2(cp1, cp1, len2)
-    sum_aij_ri = _sum2(cp1, cp2, len2)
-
-    result = (sum_ri_2 * sum_aij_2 - sum_aij_ri * sum_aij_ri) / sum_aij_2
-
-    best_result = result
-    best_i = 0
-
-    for i in range(1, len1 - len2 + 1):
-        aj_m1 = _get_sample(cp1, size, i - 1)
-        aj_lm1 = _get_sample(cp1, size, i + len2 - 1)
 
-        sum_aij_2 += aj_lm1**2 - aj_m1**2
-        sum_aij_ri = _sum2(buffer(cp1)[i*size:], cp2, len2)
+def _window_sums_of_squares(samples, window):
+    """Returns the sum of squares of every window of consecutive samples"""
+    if np is not None:
+        sums = np.zeros(len(samples) + 1, dtype=np.int64)
+        np.cumsum(samples * samples, out=sums[1:])
+        return sums[window:] - sums[:len(sums) - window]
+    sums = [0] + list(itertools.accumulate(sample * sample for sample in samples))
+    return [sums[i + window] - sums[i] for i in range(len(sums) - window)]
 
-        result = (sum_ri_2 * sum_aij_2 - sum_aij_ri * sum_aij_ri) / sum_aij_2
 
-        if result < best_result:
-            best_result = result
-            best_i = i
+def _correlations(samples, reference):
+    """Returns the sum of products of reference with every window of samples"""
+    if np is not None:
+        return np.correlate(samples, reference, mode="valid")
+    return [_sum_of_products(samples[i:i + len(reference)], reference)
+            for i in range(len(samples) - len(reference) + 1)]
 
-    factor = _sum2(buffer(cp1)[best_i*size:], cp2, len2) / sum_ri_2
 
+def findfit(cp1, cp2):
+    _check_width2(cp1)
+    _check_width2(cp2)
+    if len(cp1) < len(cp2):
+        raise error("First sample should be longer")
+    if len(cp2) == 0:
+        return 0, float("nan")
+    samples, reference = _samples(cp1, 2), _samples(cp2, 2)
+
+    sum_ri_2 = float(_sum_of_products(reference, reference))
+    sums_aij_2 = _window_sums_of_squares(samples, len(reference))
+    sums_aij_ri = _correlations(samples, reference)
+    if np is not None:
+        sums_aij_2, sums_aij_ri = sums_aij_2.astype(np.float64), sums_aij_ri.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            results = (sum_ri_2 * sums_aij_2 - sums_aij_ri * sums_aij_ri) / sums_aij_2
+        # the first of the smallest results, NaN results are never smaller
+        best_i = 0 if np.isnan(results[0]) else int(np.nanargmin(results))
+    else:
+        results = [_divide(sum_ri_2 * float(sum_aij_2) - float(sum_aij_ri) * float(sum_aij_ri), float(sum_aij_2))
+                   for sum_aij_2, sum_aij_ri in zip(sums_aij_2, sums_aij_ri)]
+        best_i = 0
+        for i, result in enumerate(results):
+            if result < results[best_i]:
+                best_i = i
+
+    factor = _divide(float(sums_aij_ri[best_i]), sum_ri_2)
     return best_i, factor
 
 
 def findfactor(cp1, cp2):
-    size = 2
-
-    if len(cp1) % 2 != 0:
-        raise error("Strings should be even-sized")
-
+    _check_width2(cp1)
+    _check_width2(cp2)
     if len(cp1) != len(cp2):
         raise error("Samples should be same size")
-
-    sample_count = _sample_count(cp1, size)
-
-    sum_ri_2 = _sum2(cp2, cp2, sample_count)
-    sum_aij_ri = _sum2(cp1, cp2, sample_count)
-
-    return sum_aij_ri / sum_ri_2
+    samples, reference = _samples(cp1, 2), _samples(cp2, 2)
+    return _divide(float(_sum_of_products(samples, reference)), float(_sum_of_products(reference, reference)))
 
 
 def findmax(cp, len2):
-    size = 2
-    sample_count = _sample_count(cp, size)
-
-    if len(cp) % 2 != 0:
-        raise error("Strings should be even-sized")
-
-    if len2 < 0 or sample_count < len2:
+    _check_width2(cp)
+    if len2 < 0 or len(cp) // 2 < len2:
         raise error("Input sample should be longer")
-
-    if sample_count == 0:
+    if len(cp) == 0:
         return 0
-
-    result = _sum2(cp, cp, len2)
-    best_result = result
-    best_i = 0
-
-    for i in range(1, sample_count - len2 + 1):
-        sample_leaving_window = getsample(cp, size, i - 1)
-        sample_entering_window = getsample(cp, size, i + len2 - 1)
-
-        result -= sample_leaving_window**2
-        result += sample_entering_window**2
-
-        if result > best_result:
-            best_result = result
-            best_i = i
-
-    return best_i
+    sums = _window_sums_of_squares(_samples(cp, 2), len2)
+    if np is not None:
+        return int(np.argmax(sums))
+    return builtin_max(range(len(sums)), key=lambda i: (sums[i], -i))
+
+
+def _extremes(cp, size):
+    """
+    Returns the values at which the samples of cp change direction, the way
+    avgpp() and maxpp() find peaks
+    """
+    samples = _samples(cp, size)
+    if np is not None:
+        # runs of equal samples don't change direction
+        changes = samples[np.concatenate(([True], samples[1:] != samples[:-1]))]
+        falling = changes[1:] < changes[:-1]
+        turns = np.flatnonzero(falling[1:] != falling[:-1]) + 1
+        return changes[turns]
+    changes = [key for key, _ in itertools.groupby(samples)]
+    falling = [b < a for a, b in zip(changes, changes[1:])]
+    return [changes[i + 1] for i in range(len(falling) - 1) if falling[i] != falling[i + 1]]
 
 
 def avgpp(cp, size):
     _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-
-    prevextremevalid = False
-    prevextreme = None
-    avg = 0
-    nextreme = 0
-
-    prevval = getsample(cp, size, 0)
-    val = getsample(cp, size, 1)
-
-    prevdiff = val - prevval
-
-    for i in range(1, sample_count):
-        val = getsample(cp, size, i)
-        diff = val - prevval
-
-        if diff * prevdiff < 0:
-            if prevextremevalid:
-                avg += abs(prevval - prevextreme)
-                nextreme += 1
-
-            prevextremevalid = True
-            prevextreme = prevval
-
-        prevval = val
-        if diff != 0:
-            prevdiff = diff
-
-    if nextreme == 0:
+    if len(cp) <= size:
         return 0
-
-    return avg / nextreme
+    extremes = _extremes(cp, size)
+    if len(extremes) < 2:
+        return 0
+    if np is not None:
+        total = float(np.abs(np.diff(extremes)).sum())
+    else:
+        total = float(sum(abs(b - a) for a, b in zip(extremes, extremes[1:])))
+    return int(total / (len(extremes) - 1))
 
 
 def maxpp(cp, size):
     _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-
-    prevextremevalid = False
-    prevextreme = None
-    max = 0
-
-    prevval = getsample(cp, size, 0)
-    val = getsample(cp, size, 1)
-
-    prevdiff = val - prevval
-
-    for i in range(1, sample_count):
-        val = getsample(cp, size, i)
-        diff = val - prevval
-
-        if diff * prevdiff < 0:
-            if prevextremevalid:
-                extremediff = abs(prevval - prevextreme)
-                if extremediff > max:
-                    max = extremediff
-            prevextremevalid = True
-            prevextreme = prevval
-
-        prevval = val
-        if diff != 0:
-            prevdiff = diff
-
-    return max
+    if len(cp) <= size:
+        return 0
+    extremes = _extremes(cp, size)
+    if len(extremes) < 2:
+        return 0
+    if np is not None:
+        return int(np.abs(np.diff(extremes)).max())
+    return builtin_max(abs(b - a) for a, b in zip(extremes, extremes[1:]))
 
 
 def cross(cp, size):
     _check_params(len(cp), size)
-
-    crossings = 0
-    last_sample = 0
-    for sample in _get_samples(cp, size):
-        if sample <= 0 < last_sample or sample >= 0 > last_sample:
-            crossings += 1
-        last_sample = sample
-
-    return crossings
+    if len(cp) == 0:
+        return -1
+    samples = _samples(cp, size)
+    if np is not None:
+        negative = samples < 0
+        return int(np.count_nonzero(negative[1:] != negative[:-1]))
+    negative = [sample < 0 for sample in samples]
+    return sum(map(bool.__ne__, negative, negative[1:]))
 
 
 def mul(cp, size, factor):
     _check_params(len(cp), size)
-    clip = _get_clipfn(size)
-
-    result = create_string_buffer(len(cp))
-
-    for i, sample in enumerate(_get_samples(cp, size)):
-        sample = clip(int(sample * factor))
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    samples = _samples(cp, size)
+    if np is not None:
+        scaled = samples * float(factor)
+    else:
+        scaled = [sample * float(factor) for sample in samples]
+    return _pack(_fbound(scaled, _get_minval(size), _get_maxval(size)), size)
 
 
 def tomono(cp, size, fac1, fac2):
     _check_params(len(cp), size)
-    clip = _get_clipfn(size)
-
-    sample_count = _sample_count(cp, size)
-
-    result = create_string_buffer(len(cp) / 2)
-
-    for i in range(0, sample_count, 2):
-        l_sample = getsample(cp, size, i)
-        r_sample = getsample(cp, size, i + 1)
-
-        sample = (l_sample * fac1) + (r_sample * fac2)
-        sample = clip(sample)
-
-        _put_sample(result, size, i / 2, sample)
-
-    return result.raw
+    if (len(cp) // size) % 2 != 0:
+        raise error("not a whole number of frames")
+    samples = _samples(cp, size)
+    if np is not None:
+        mixed = samples[0::2] * float(fac1) + samples[1::2] * float(fac2)
+    else:
+        mixed = [l_sample * float(fac1) + r_sample * float(fac2)
+                 for l_sample, r_sample in zip(samples[0::2], samples[1::2])]
+    return _pack(_fbound(mixed, _get_minval(size), _get_maxval(size)), size)
 
 
 def tostereo(cp, size, fac1, fac2):
     _check_params(len(cp), size)
-
-    sample_count = _sample_count(cp, size)
-
-    result = create_string_buffer(len(cp) * 2)
-    clip = _get_clipfn(size)
-
-    for i in range(sample_count):
-        sample = _get_sample(cp, size, i)
-
-        l_sample = clip(sample * fac1)
-        r_sample = clip(sample * fac2)
-
-        _put_sample(result, size, i * 2, l_sample)
-        _put_sample(result, size, i * 2 + 1, r_sample)
-
-    return result.raw
+    samples = _samples(cp, size)
+    minval, maxval = _get_minval(size), _get_maxval(size)
+    if np is not None:
+        result = np.empty(2 * len(samples), dtype=np.int64)
+        result[0::2] = _fbound(samples * float(fac1), minval, maxval)
+        result[1::2] = _fbound(samples * float(fac2), minval, maxval)
+    else:
+        result = [0] * (2 * len(samples))
+        result[0::2] = _fbound([sample * float(fac1) for sample in samples], minval, maxval)
+        result[1::2] = _fbound([sample * float(fac2) for sample in samples], minval, maxval)
+    return _pack(result, size)
 
 
 def add(cp1, cp2, size):
     _check_params(len(cp1), size)
-
     if len(cp1) != len(cp2):
         raise error("Lengths should be the same")
-
-    clip = _get_clipfn(size)
-    sample_count = _sample_count(cp1, size)
-    result = create_string_buffer(len(cp1))
-
-    for i in range(sample_count):
-        sample1 = getsample(cp1, size, i)
-        sample2 = getsample(cp2, size, i)
-
-        sample = clip(sample1 + sample2)
-
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    minval, maxval = _get_minval(size), _get_maxval(size)
+    samples1, samples2 = _samples(cp1, size), _samples(cp2, size)
+    if np is not None:
+        return _pack(np.clip(samples1 + samples2, minval, maxval), size)
+    return _pack([builtin_min(builtin_max(sample1 + sample2, minval), maxval)
+                  for sample1, sample2 in zip(samples1, samples2)], size)
 
 
 def bias(cp, size, bias):
     _check_params(len(cp), size)
-
-    result = create_string_buffer(len(cp))
-
-    for i, sample in enumerate(_get_samples(cp, size)):
-        sample = _overflow(sample + bias, size)
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    _check_int(bias)
+    # samples are treated as unsigned integers that wrap around on overflow
+    mask = _get_maxval(size, signed=False)
+    offset = bias & mask
+    if np is not None and size != 3:
+        unsigned = np.frombuffer(_buffer(cp), dtype="u{}".format(size))
+        return (unsigned + np.array(offset, dtype=unsigned.dtype)).tobytes()
+    samples = _samples(cp, size)
+    if np is not None:
+        biased = (samples + offset) & mask
+        biased = np.where(biased > _get_maxval(size), biased - (mask + 1), biased)
+    else:
+        biased = [(sample + offset) & mask for sample in samples]
+        biased = [sample - (mask + 1) if sample > _get_maxval(size) else sample for sample in biased]
+    return _pack(biased, size)
 
 
 def reverse(cp, size):
     _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-
-    result = create_string_buffer(len(cp))
-    for i, sample in enumerate(_get_samples(cp, size)):
-        _put_sample(result, size, sample_count - i - 1, sample)
+    data = _buffer(cp)
+    if np is not None:
+        return np.frombuffer(data, dtype="V{}".format(size))[::-1].tobytes()
+    if size != 3:
+        samples = array.array(_ARRAY_TYPES[size], bytes(data))
+        samples.reverse()
+        return samples.tobytes()
+    return b"".join(bytes(data[i:i + size]) for i in range(len(data) - size, -1, -size))
 
-    return result.raw
 
-
-def lin2lin(cp, size, size2):
+def byteswap(cp, size):
     _check_params(len(cp), size)
-    _check_size(size2)
-
-    if size == size2:
-        return cp
+    data = _buffer(cp)
+    if np is not None and size != 3:
+        return np.frombuffer(data, dtype=_NUMPY_TYPES[size]).byteswap().tobytes()
+    if np is not None:
+        return np.frombuffer(data, dtype=np.uint8).reshape(-1, size)[:, ::-1].tobytes()
+    swapped = bytearray(len(data))
+    for i in range(size):
+        swapped[size - 1 - i::size] = data[i::size]
+    return bytes(swapped)
 
-    new_len = (len(cp) / size) * size2
 
-    result = create_string_buffer(new_len)
+def _to_sample32(samples, size):
+    """Scales samples of the given width to 32 bit samples"""
+    shift = 32 - 8 * size
+    if np is not None:
+        return samples << shift
+    return [sample << shift for sample in samples]
 
-    for i in range(_sample_count(cp, size)):
-        sample = _get_sample(cp, size, i)
-        if size < size2:
-            sample = sample << (4 * size2 / size)
-        elif size > size2:
-            sample = sample >> (4 * size / size2)
 
-        sample = _overflow(sample, size2)
+def _from_sample32(samples, size):
+    """Scales 32 bit samples down to the given width, rounding down"""
+    shift = 32 - 8 * size
+    if np is not None:
+        return np.asarray(samples, dtype=np.int64) >> shift
+    return [sample >> shift for sample in samples]
 
-        _put_sample(result, size2, i, sample)
 
-    return result.raw
+def lin2lin(cp, size, size2):
+    _check_params(len(cp), size)
+    _check_size(size2)
+    if size == size2:
+        return bytes(_buffer(cp))
+    return _pack(_from_sample32(_to_sample32(_samples(cp, size), size), size2), size2)
 
 
 def ratecv(cp, size, nchannels, inrate, outrate, state, weightA=1, weightB=0):
-    _check_params(len(cp), size)
+    _check_size(size)
     if nchannels < 1:
         raise error("# of channels should be >= 1")
-
-    bytes_per_frame = size * nchannels
-    frame_count = len(cp) / bytes_per_frame
-
-    if bytes_per_frame / nchannels != size:
+    if size > 0x7fffffff // nchannels:
         raise OverflowError("width * nchannels too big for a C int")
-
+    bytes_per_frame = size * nchannels
     if weightA < 1 or weightB < 0:
         raise error("weightA should be >= 1, weightB should be >= 0")
-
     if len(cp) % bytes_per_frame != 0:
         raise error("not a whole number of frames")
-
     if inrate <= 0 or outrate <= 0:
         raise error("sampling rate not > 0")
 
     d = gcd(inrate, outrate)
-    inrate /= d
-    outrate /= d
-
-    prev_i = [0] * nchannels
-    cur_i = [0] * nchannels
+    inrate //= d
+    outrate //= d
+    d = gcd(weightA, weightB)
+    weightA //= d
+    weightB //= d
 
     if state is None:
         d = -outrate
+        prev_i = [0] * nchannels
+        cur_i = [0] * nchannels
     else:
-        d, samps = state
-
+        if not isinstance(state, tuple):
+            raise TypeError("state must be a tuple or None")
+        try:
+            d, samps = state
+        except ValueError:
+            raise TypeError("ratecv(): illegal state argument")
+        if not isinstance(samps, tuple):
+            raise TypeError("ratecv(): illegal state argument")
         if len(samps) != nchannels:
             raise error("illegal state argument")
-
-        prev_i, cur_i = zip(*samps)
-        prev_i, cur_i = list(prev_i), list(cur_i)
-
-    q = frame_count / inrate
-    ceiling = (q + 1) * outrate
-    nbytes = ceiling * bytes_per_frame
-
-    result = create_string_buffer(nbytes)
-
-    samples = _get_samples(cp, size)
-    out_i = 0
-    while True:
-        while d < 0:
-            if frame_count == 0:
-                samps = zip(prev_i, cur_i)
-                retval = result.raw
-
-                # slice off extra bytes
-                trim_index = (out_i * bytes_per_frame) - len(retval)
-                retval = buffer(retval)[:trim_index]
-
-                return (retval, (d, tuple(samps)))
-
-            for chan in range(nchannels):
-                prev_i[chan] = cur_i[chan]
-                cur_i[chan] = samples.next()
-
-                cur_i[chan] = (
-                    (weightA * cur_i[chan] + weightB * prev_i[chan])
-                    / (weightA + weightB)
-                )
-
-            frame_count -= 1
-            d += outrate
-
-        while d >= 0:
-            for chan in range(nchannels):
-                cur_o = (
-                    (prev_i[chan] * d + cur_i[chan] * (outrate - d))
-                    / outrate
-                )
-                _put_sample(result, size, out_i, _overflow(cur_o, size))
-                out_i += 1
-            d -= inrate
+        if not all(isinstance(channel, tuple) and len(channel) == 2 for channel in samps):
+            raise TypeError("ratecv(): illegal state argument")
+        prev_i = [int(prev) for prev, _ in samps]
+        cur_i = [int(cur) for _, cur in samps]
+
+    frame_count = len(cp) // bytes_per_frame
+    samples = _to_sample32(_samples(cp, size), size)
+
+    # Output frames are interpolated between the last two input frames read.
+    # Input frame k is read once d (which grows by outrate per input frame and
+    # shrinks by inrate per output frame) drops below zero, so output frame j
+    # comes after input frame k(j) = ceil((j*inrate - d) / outrate) - 1, with
+    # d = t_k - j*inrate, where t_k = d + (k + 1)*outrate.
+    # Output frames that the initial state still produces come first.
+    output_channels = [[] for _ in range(nchannels)]
+    if d >= 0:
+        initial_ds = list(range(d, -1, -inrate))
+        for chan in range(nchannels):
+            output_channels[chan] = [int((float(prev_i[chan]) * float(dj) + float(cur_i[chan]) * float(outrate - dj))
+                                         / float(outrate)) for dj in initial_ds]
+        d -= len(initial_ds) * inrate
+
+    if frame_count:
+        last_t = d + frame_count * outrate
+        output_count = last_t // inrate + 1 if last_t >= 0 else 0
+        for chan in range(nchannels):
+            channel = samples[chan::nchannels]
+            if weightB:
+                # a simple digital filter, which depends on the previous filtered sample
+                filtered = []
+                previous = cur_i[chan]
+                for sample in channel:
+                    previous = int((float(weightA) * float(sample) + float(weightB) * float(previous))
+                                   / (float(weightA) + float(weightB)))
+                    filtered.append(previous)
+                channel = np.array(filtered, dtype=np.int64) if np is not None else filtered
+
+            if np is not None:
+                output_i = np.arange(output_count, dtype=np.int64)
+                frame_i = -((d - output_i * inrate) // outrate) - 1  # ceil((j*inrate - d) / outrate) - 1
+                dj = d + (frame_i + 1) * outrate - output_i * inrate
+                cur = channel[frame_i].astype(np.float64)
+                prev = np.where(frame_i > 0, channel[np.maximum(frame_i - 1, 0)], cur_i[chan]).astype(np.float64)
+                interpolated = np.trunc((prev * dj + cur * (outrate - dj)) / float(outrate)).astype(np.int64)
+                output_channels[chan] = np.concatenate((np.asarray(output_channels[chan], dtype=np.int64), interpolated))
+            else:
+                for j in range(output_count):
+                    k = -((d - j * inrate) // outrate) - 1
+                    dj = d + (k + 1) * outrate - j * inrate
+                    prev = channel[k - 1] if k > 0 else cur_i[chan]
+                    output_channels[chan].append(int((float(prev) * float(dj) + float(channel[k]) * float(outrate - dj))
+                                                     / float(outrate)))
+
+            prev_i[chan] = int(channel[-2]) if frame_count > 1 else cur_i[chan]
+            cur_i[chan] = int(channel[-1])
+        d = last_t - output_count * inrate
+
+    if np is not None:
+        interleaved = np.empty(len(output_channels[0]) * nchannels, dtype=np.int64)
+        for chan in range(nchannels):
+            interleaved[chan::nchannels] = output_channels[chan]
+    else:
+        interleaved = [sample for frame in zip(*output_channels) for sample in frame]
+    result = _pack(_from_sample32(interleaved, size), size)
+    return result, (d, tuple(zip(prev_i, cur_i)))
 
 
 def lin2ulaw(cp, size):
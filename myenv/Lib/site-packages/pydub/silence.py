@@ -2,8 +2,118 @@
 Various functions for finding/manipulating silence in AudioSegments
 """
 import itertools
+import math
+import operator
 
-from .utils import db_to_float
+from .utils import db_to_float, ratio_to_db, get_array_type, audioop
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, energies are summed in pure Python without it
+    np = None
+
+# milliseconds of audio whose samples are squared at once when using NumPy, to
+# limit the memory used on long recordings
+ENERGY_BLOCK_MS = 60 * 1000
+
+
+def _frame_bounds(audio_segment, ms_count):
+    """
+    Returns the index of the first frame of every millisecond from 0 to
+    ms_count (inclusive), computed the same way as when slicing audio_segment
+    """
+    frames_per_ms = audio_segment.frame_rate / 1000.0
+    if np is not None:
+        return (np.arange(ms_count + 1) * frames_per_ms).astype(np.int64)
+    return [int(ms * frames_per_ms) for ms in range(ms_count + 1)]
+
+
+def _energy_prefix_sums(audio_segment, bounds):
+    """
+    Returns the running sums of squared samples of audio_segment at the frame
+    indices in bounds: sums[k] is the sum of the squares of every sample in
+    the frames before bounds[k]. The sums are exact integers.
+    """
+    channels = audio_segment.channels
+    sample_width = audio_segment.sample_width
+    frame_count = int(audio_segment.frame_count())
+
+    if np is None:
+        samples = memoryview(audio_segment._data).cast(get_array_type(sample_width * 8))
+        sums = [0]
+        total = 0
+        for start, end in zip(bounds, bounds[1:]):
+            chunk = samples[min(start, frame_count) * channels:min(end, frame_count) * channels]
+            total += sum(map(operator.mul, chunk, chunk))
+            sums.append(total)
+        return sums
+
+    samples = np.frombuffer(audio_segment._data, dtype="i{}".format(sample_width),
+                            count=frame_count * channels)
+    clipped = np.minimum(bounds, frame_count)  # frames past the end are silence
+    interval_count = len(bounds) - 1
+
+    # 32 bit samples are split into 16 bit halves so their squares can be
+    # summed in 64 bit integers: x**2 == (hi**2 << 32) + (hi*lo << 17) + lo**2
+    parts = 3 if sample_width == 4 else 1
+    energies = np.zeros((parts, interval_count), dtype=np.int64)
+    for block_start in range(0, interval_count, ENERGY_BLOCK_MS):
+        block = clipped[block_start:block_start + ENERGY_BLOCK_MS + 1]
+        nonempty = np.flatnonzero(block[1:] > block[:-1])
+        if not len(nonempty):
+            continue
+        block_samples = samples[block[0] * channels:block[-1] * channels].astype(np.int64)
+        offsets = (block[nonempty] - block[0]) * channels
+        if sample_width == 4:
+            high, low = block_samples >> 16, block_samples & 0xFFFF
+            squares = (high * high, high * low, low * low)
+        else:
+            squares = (block_samples * block_samples,)
+        for part, part_squares in enumerate(squares):
+            energies[part, block_start + nonempty] = np.add.reduceat(part_squares, offsets)
+
+    if sample_width == 4:
+        energies = ((energies[0].astype(object) << 32) + (energies[1].astype(object) << 17)
+                    + energies[2].astype(object))
+    else:
+        energies = energies[0]
+        max_square = (1 << (8 * sample_width - 1)) ** 2
+        if frame_count * channels * max_square >= 2 ** 63:  # the running sums could overflow
+            energies = energies.astype(object)
+
+    sums = np.zeros(interval_count + 1, dtype=energies.dtype)
+    np.cumsum(energies, out=sums[1:])
+    return sums
+
+
+def _window_rms(audio_segment, window_starts, window_len):
+    """
+    Returns the rms of audio_segment[start:start + window_len] for every start
+    in window_starts (a list of milliseconds, in increasing order), without
+    slicing the audio segment. The result is the same as AudioSegment.rms.
+    """
+    ms_count = window_starts[-1] + window_len
+    bounds = _frame_bounds(audio_segment, ms_count)
+    sums = _energy_prefix_sums(audio_segment, bounds)
+    channels = audio_segment.channels
+
+    if np is None:
+        rms = []
+        for start in window_starts:
+            end = start + window_len
+            sample_count = (bounds[end] - bounds[start]) * channels
+            rms.append(int(math.sqrt((sums[end] - sums[start]) / sample_count)) if sample_count else 0)
+        return rms
+
+    starts = np.asarray(window_starts, dtype=np.int64)
+    ends = starts + window_len
+    # frames past the end of the audio are counted, as slicing pads them with silence
+    sample_counts = (bounds[ends] - bounds[starts]) * channels
+    window_sums = (sums[ends] - sums[starts]).astype(np.float64)
+    rms = np.zeros(len(starts))
+    counted = sample_counts > 0
+    rms[counted] = np.floor(np.sqrt(window_sums[counted] / sample_counts[counted]))
+    return rms
 
 
 def detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek_step=1):
@@ -25,9 +135,6 @@ def detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek
     # convert silence threshold to a float value (so we can compare it to rms)
     silence_thresh = db_to_float(silence_thresh) * audio_segment.max_possible_amplitude
 
-    # find silence and add start and end indicies to the to_cut list
-    silence_starts = []
-
     # check successive (1 sec by default) chunk of sound for silence
     # try a chunk at every "seek step" (or every chunk for a seek step == 1)
     last_slice_start = seg_len - min_silence_len
@@ -37,11 +144,15 @@ def detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek
     # to make sure the last portion of the audio is searched
     if last_slice_start % seek_step:
         slice_starts = itertools.chain(slice_starts, [last_slice_start])
+    slice_starts = list(slice_starts)
 
-    for i in slice_starts:
-        audio_slice = audio_segment[i:i + min_silence_len]
-        if audio_slice.rms <= silence_thresh:
-            silence_starts.append(i)
+    # the rms of every slice is computed from running sums of the squared
+    # samples, so each sample is only looked at once however long the slices are
+    slice_rms = _window_rms(audio_segment, slice_starts, min_silence_len)
+    if np is not None:
+        silence_starts = [slice_starts[i] for i in np.flatnonzero(slice_rms <= silence_thresh)]
+    else:
+        silence_starts = [i for i, rms in zip(slice_starts, slice_rms) if rms <= silence_thresh]
 
     # short circuit when there is no silence
     if not silence_starts:
@@ -173,7 +284,23 @@ def detect_leading_silence(sound, silence_threshold=-50.0, chunk_size=10):
     """
     trim_ms = 0 # ms
     assert chunk_size > 0 # to avoid infinite loop
-    while sound[trim_ms:trim_ms+chunk_size].dBFS < silence_threshold and trim_ms < len(sound):
+    seg_len = len(sound)
+    frames_per_ms = sound.frame_rate / 1000.0
+    data = memoryview(sound._data)
+
+    def chunk_dBFS(start):
+        # same as sound[start:start+chunk_size].dBFS, without copying the chunk
+        end = min(start + chunk_size, seg_len)
+        start_i = int(min(start, seg_len) * frames_per_ms) * sound.frame_width
+        end_i = int(end * frames_per_ms) * sound.frame_width
+        if end_i > len(data):  # the slice would be padded with silence
+            return sound[start:start + chunk_size].dBFS
+        rms = audioop.rms(data[start_i:end_i], sound.sample_width)
+        if not rms:
+            return -float("infinity")
+        return ratio_to_db(rms / sound.max_possible_amplitude)
+
+    while chunk_dBFS(trim_ms) < silence_threshold and trim_ms < seg_len:
         trim_ms += chunk_size
 
     # if there is no end it should return the length of the segment
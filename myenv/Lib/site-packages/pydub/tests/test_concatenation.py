@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+import array
+import copy
+import pickle
+import random
+import sys
+import threading
+
+import pytest
+
+from pydub import AudioSegment, AudioSegmentBuilder
+
+
+def make_segment(frames, frame_rate=8000, channels=1, sample_width=2, seed=0):
+    rng = random.Random(seed)
+    maxval = (1 << (8 * sample_width - 1)) - 1
+    samples = array.array({1: "b", 2: "h", 4: "i"}[sample_width],
+                          (rng.randint(-maxval, maxval) for _ in range(frames * channels)))
+    return AudioSegment(samples.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
+
+def reference_append(seg1, seg2, crossfade):
+    """The previous AudioSegment.append(), which copied both segments"""
+    seg1, seg2 = AudioSegment._sync(seg1, seg2)
+    if not crossfade:
+        return seg1._spawn([seg1._data, seg2._data])
+    xf = seg1[-crossfade:].fade(to_gain=-120, start=0, end=float('inf'))
+    xf *= seg2[:crossfade].fade(from_gain=-120, start=0, end=float('inf'))
+    return seg1._spawn([seg1[:-crossfade]._data, xf._data, seg2[crossfade:]._data])
+
+
+@pytest.mark.parametrize("frame_rate", [8000, 11025, 44100])
+@pytest.mark.parametrize("crossfade", [0, 1, 10, 25])
+def test_builder_matches_append(frame_rate, crossfade):
+    rng = random.Random(frame_rate + crossfade)
+    segments = [make_segment(rng.randint(frame_rate // 20, frame_rate // 5), frame_rate, seed=i) for i in range(20)]
+
+    expected = segments[0]
+    builder = AudioSegmentBuilder(segments[0])
+    for seg in segments[1:]:
+        expected = reference_append(expected, seg, crossfade)
+        builder.append(seg, crossfade=crossfade)
+        assert len(builder) == len(expected)
+
+    output = builder.build()
+    assert output == expected
+    assert type(output._data) is bytes
+    assert segments[0].append(segments[1], crossfade=crossfade) == reference_append(segments[0], segments[1], crossfade)
+
+
+def test_builder_crossfade_spanning_pieces():
+    pieces = [make_segment(8, seed=i) for i in range(10)]
+    long_piece = make_segment(800, seed=10)
+    expected = builder = None
+    for seg in pieces:
+        expected = seg if expected is None else reference_append(expected, seg, 0)
+        builder = AudioSegmentBuilder(seg) if builder is None else builder.append(seg, crossfade=0)
+    assert builder.append(long_piece, crossfade=5).build() == reference_append(expected, long_piece, 5)
+
+
+def test_builder_converts_formats():
+    mono = make_segment(800, frame_rate=8000, sample_width=1)
+    stereo = make_segment(1600, frame_rate=16000, channels=2, sample_width=2, seed=1)
+    expected = reference_append(reference_append(mono, stereo, 10), mono, 10)
+    output = AudioSegmentBuilder(mono).append(stereo, crossfade=10).append(mono, crossfade=10).build()
+    assert (output.channels, output.frame_rate, output.sample_width) == (2, 16000, 2)
+    assert output == expected
+
+
+def test_builder_errors_and_empty():
+    seg = make_segment(80)
+    assert len(AudioSegmentBuilder()) == 0
+    assert AudioSegmentBuilder().build() == AudioSegment.empty()
+    assert AudioSegmentBuilder().append(seg, crossfade=0).build() == seg
+    with pytest.raises(ValueError):
+        AudioSegmentBuilder().append(seg)
+    with pytest.raises(ValueError):
+        AudioSegmentBuilder(seg).append(seg, crossfade=11)
+    with pytest.raises(ValueError):
+        seg.append(seg[:5], crossfade=6)
+
+
+def test_bytearray_data_is_copied():
+    data = bytearray(make_segment(80).raw_data)
+    seg = AudioSegment(data, sample_width=2, frame_rate=8000, channels=1)
+    builder = AudioSegmentBuilder(seg)
+    expected = bytes(data)
+    data[:2] = b"\x00\x00"
+    assert builder.build().raw_data == expected
+
+
+def test_sum_and_add_chains():
+    segments = [make_segment(80 + i, seed=i) for i in range(50)]
+    expected = segments[0]
+    for seg in segments[1:]:
+        expected = reference_append(expected, seg, 0)
+
+    total = sum(segments)
+    assert total._pending is not None
+    assert total == expected
+    assert type(total._data) is bytes
+    assert total._pending is None
+
+    chained = segments[0]
+    for seg in segments[1:]:
+        chained = chained + seg
+    builder = chained._pending[0]
+    assert len(builder._pieces) == len(segments)  # every + extended the same builder
+    assert chained == expected
+    assert (total + segments[0]).raw_data == expected.raw_data + segments[0].raw_data
+
+
+def test_copies_of_pending_sums():
+    a, b = make_segment(40), make_segment(40, seed=1)
+    total = a + b
+    copied = AudioSegment.__new__(AudioSegment)
+    copied.__dict__.update(vars(total))
+    assert copied.raw_data == total.raw_data == a.raw_data + b.raw_data
+    assert copy.copy(a + b) == copy.deepcopy(a + b) == total
+
+
+def test_add_branches_from_earlier_sums():
+    a, b, c, d = [make_segment(40, seed=i) for i in range(4)]
+    ab = a + b
+    abc = ab + c
+    abd = ab + d
+    assert abc.raw_data == a.raw_data + b.raw_data + c.raw_data
+    assert abd.raw_data == a.raw_data + b.raw_data + d.raw_data
+    assert ab.raw_data == a.raw_data + b.raw_data
+    assert (ab + 6).raw_data == (a.append(b, crossfade=0) + 6).raw_data
+    assert (ab + make_segment(40, channels=2)).channels == 2
+
+
+def test_pending_sums_behave_like_segments():
+    a, b = make_segment(400), make_segment(400, seed=1)
+    total = a + b
+    restored = pickle.loads(pickle.dumps(total))
+    assert restored == a.append(b, crossfade=0)
+    assert "_pending" not in restored.__dict__
+    assert len(a + b) == 100
+    assert hash(a + b) == hash(restored)
+
+    # state pickled while _data was an ordinary attribute
+    old_state = {name: value for name, value in vars(a).items() if not name.startswith('_')}
+    old = AudioSegment.__new__(AudioSegment)
+    old.__setstate__(dict(old_state, _data=a.raw_data))
+    assert old == a
+    with pytest.raises(AttributeError):
+        total.not_an_attribute
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_pending_sums_are_thread_safe(frequent_thread_switches):
+    segments = [make_segment(80, seed=i) for i in range(20)]
+    expected = b"".join(seg.raw_data for seg in segments)
+    extra = make_segment(80, seed=20)
+    for _ in range(20):
+        total = sum(segments)
+        results = []
+        barrier = threading.Barrier(8)
+
+        def use_total(i):
+            barrier.wait()
+            # half of the threads join the sum, the others add to it
+            results.append(total.raw_data if i % 2 else (total + extra).raw_data)
+
+        threads = [threading.Thread(target=use_total, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == sorted([expected] * 4 + [expected + extra.raw_data] * 4)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Checks that the NumPy implementations of effects match their pure Python loops"""
+import array
+import math
+import random
+
+import pytest
+
+from pydub import AudioSegment, effects
+from pydub.utils import get_min_max_value
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKENDS = ["numpy", "python"]
+needs_numpy = pytest.mark.skipif(np is None, reason="NumPy is not installed")
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(effects, "np", None)
+    return request.param
+
+
+def speech(seconds, frame_rate=8000, channels=1, sample_width=2, seed=0):
+    """Harmonics whose loudness jumps every 50 to 300 ms, like syllables"""
+    rng = random.Random(seed)
+    maxval = (1 << (8 * sample_width - 1)) - 1
+    samples = array.array({1: "b", 2: "h", 4: "i"}[sample_width])
+    amplitude, next_change = 0.0, 0
+    for i in range(int(seconds * frame_rate)):
+        if i >= next_change:
+            amplitude = rng.choice((0.02, 0.1, 0.3, 0.6, 0.9))
+            next_change = i + int(rng.uniform(0.05, 0.3) * frame_rate)
+        t = i / frame_rate
+        value = sum(math.sin(2 * math.pi * 150 * k * t) / k for k in range(1, 4)) / 1.84
+        samples.extend([int(maxval * amplitude * value)] * channels)
+    return AudioSegment(samples.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
+
+def without_numpy(monkeypatch, func, *args, **kwargs):
+    with monkeypatch.context() as m:
+        m.setattr(effects, "np", None)
+        return func(*args, **kwargs)
+
+
+def samples_of(seg):
+    return np.frombuffer(seg.raw_data, dtype="i{}".format(seg.sample_width)).astype(np.float64)
+
+
+def assert_compressor_within_tolerance(monkeypatch, seg, **settings):
+    blocks = samples_of(effects.compress_dynamic_range(seg, **settings))
+    frames = samples_of(without_numpy(monkeypatch, effects.compress_dynamic_range, seg, **settings))
+    # the gains differ by at most 0.25 dB, besides rounding to whole sample values
+    assert (np.abs(blocks - frames) <= np.abs(frames) * (10 ** (0.25 / 20) - 1) + 1).all()
+
+
+@needs_numpy
+@pytest.mark.parametrize("frame_rate,channels,sample_width", [(8000, 1, 2), (11025, 2, 2), (8000, 1, 1), (8000, 1, 4), (24000, 1, 2)])
+@pytest.mark.parametrize("settings", [{}, dict(threshold=-30, ratio=8, attack=2, release=100), dict(attack=20, release=20)])
+def test_compressor_stays_within_tolerance(monkeypatch, frame_rate, channels, sample_width, settings):
+    seg = speech(1, frame_rate, channels, sample_width, seed=frame_rate + channels + sample_width)
+    assert_compressor_within_tolerance(monkeypatch, seg, **settings)
+
+
+@needs_numpy
+def test_compressor_edge_cases(monkeypatch):
+    quiet = speech(0.5) - 30  # never above the threshold
+    assert effects.compress_dynamic_range(quiet) == without_numpy(monkeypatch, effects.compress_dynamic_range, quiet) == quiet
+    empty = AudioSegment.empty()
+    assert effects.compress_dynamic_range(empty).raw_data == b""
+    assert_compressor_within_tolerance(monkeypatch, speech(0.002, seed=1) + 20)  # shorter than the attack time
+
+
+def previous_low_pass_filter(seg, cutoff):
+    """The loop that low_pass_filter() used before"""
+    RC = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / seg.frame_rate
+    alpha = dt / (RC + dt)
+    original = seg.get_array_of_samples()
+    filteredArray = array.array(seg.array_type, original)
+    last_val = [0] * seg.channels
+    for i in range(seg.channels):
+        last_val[i] = filteredArray[i] = original[i]
+    for i in range(1, int(seg.frame_count())):
+        for j in range(seg.channels):
+            offset = (i * seg.channels) + j
+            last_val[j] = last_val[j] + (alpha * (original[offset] - last_val[j]))
+            filteredArray[offset] = int(last_val[j])
+    return seg._spawn(data=filteredArray)
+
+
+def previous_high_pass_filter(seg, cutoff):
+    """The loop that high_pass_filter() used before"""
+    RC = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / seg.frame_rate
+    alpha = RC / (RC + dt)
+    minval, maxval = get_min_max_value(seg.sample_width * 8)
+    original = seg.get_array_of_samples()
+    filteredArray = array.array(seg.array_type, original)
+    last_val = [0] * seg.channels
+    for i in range(seg.channels):
+        last_val[i] = filteredArray[i] = original[i]
+    for i in range(1, int(seg.frame_count())):
+        for j in range(seg.channels):
+            offset = (i * seg.channels) + j
+            offset_minus_1 = ((i - 1) * seg.channels) + j
+            last_val[j] = alpha * (last_val[j] + original[offset] - original[offset_minus_1])
+            filteredArray[offset] = int(min(max(last_val[j], minval), maxval))
+    return seg._spawn(data=filteredArray)
+
+
+def filter_inputs(sample_width, channels):
+    """Noise, a tone, and runs of constant and extreme samples"""
+    rng = random.Random(sample_width * channels)
+    minval, maxval = get_min_max_value(sample_width * 8)
+    noise = [rng.randint(minval, maxval) for _ in range(3000 * channels)]
+    tone = [int(maxval * 0.7 * math.sin(i // channels * 0.05)) for i in range(3000 * channels)]
+    runs = [value for value in (maxval // 3, -maxval // 7, 0, maxval, minval, 1) for _ in range(500 * channels)]
+    return [AudioSegment(array.array({1: "b", 2: "h", 4: "i"}[sample_width], samples).tobytes(),
+                         sample_width=sample_width, frame_rate=44100, channels=channels)
+            for samples in (noise, tone, runs)]
+
+
+def max_difference(seg, reference):
+    return max(abs(a - b) for a, b in zip(seg.get_array_of_samples(), reference.get_array_of_samples()))
+
+
+@pytest.mark.parametrize("sample_width", [1, 2, 4])
+@pytest.mark.parametrize("channels", [1, 2])
+@pytest.mark.parametrize("new_filter,previous_filter", [
+    (effects.low_pass_filter, previous_low_pass_filter),
+    (effects.high_pass_filter, previous_high_pass_filter),
+])
+@pytest.mark.parametrize("blocked", [False, True])
+def test_filters_match_the_previous_loop(backend, sample_width, channels, new_filter, previous_filter, blocked):
+    for seg in filter_inputs(sample_width, channels):
+        for cutoff in (20, 300, 5000):
+            output, expected = new_filter(seg, cutoff, blocked=blocked), previous_filter(seg, cutoff)
+            assert len(output.raw_data) == len(expected.raw_data)
+            if blocked and backend == "numpy":  # see OnePoleFilter
+                assert max_difference(output, expected) <= 1
+            else:
+                assert output == expected
+
+
+@pytest.mark.parametrize("filter_class", [effects.LowPassFilter, effects.HighPassFilter])
+@pytest.mark.parametrize("blocked", [False, True])
+def test_filtering_chunks_matches_filtering_at_once(backend, filter_class, blocked):
+    seg = filter_inputs(2, 2)[1] + filter_inputs(2, 2)[2]
+    at_once = filter_class(1000, blocked)(seg)
+    stream_filter = filter_class(1000, blocked)
+    frame_count = int(seg.frame_count())
+    chunks = [stream_filter(seg.get_sample_slice(start, min(start + 1000, frame_count))) for start in range(0, frame_count, 1000)]
+    assert sum(len(chunk.raw_data) for chunk in chunks) == len(at_once.raw_data)
+    joined = at_once._spawn(b"".join(chunk.raw_data for chunk in chunks))
+    if blocked and backend == "numpy":
+        assert max_difference(joined, at_once) <= 1
+    else:
+        assert joined == at_once
+
+
+def test_one_pole_filter_is_abstract():
+    with pytest.raises(TypeError):
+        effects.OnePoleFilter(1000)
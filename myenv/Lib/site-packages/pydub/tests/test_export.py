@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from pydub import AudioSegment, audio_segment
+from pydub.exceptions import CouldntEncodeError
+from pydub.generators import Sine
+
+
+class FakePopen(object):
+    """Stands in for the converter, "encoding" by prefixing its input with b"ENC" """
+    runs = []
+    returncode = 0
+
+    def __init__(self, command, **kwargs):
+        self.command = command
+        self.runs.append(self)
+
+    def communicate(self, input=None):
+        self.input = bytes(input)
+        encoded = b"ENC" + self.input
+        if self.command[-1] == "pipe:1":
+            return encoded, b""
+        with open(self.command[-1], "wb") as f:
+            f.write(encoded)
+        return b"", b""
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    monkeypatch.setattr(audio_segment.subprocess, "Popen", FakePopen)
+    FakePopen.runs = []
+    FakePopen.returncode = 0
+    return FakePopen.runs
+
+
+@pytest.mark.parametrize("sample_width, input_format", [(1, "s8"), (2, "s16le"), (4, "s32le")])
+def test_export_through_pipes(runs, sample_width, input_format):
+    seg = Sine(440).to_audio_segment(200).set_sample_width(sample_width).set_channels(2)
+    out = seg.export(format="mp3")
+    assert out.read() == b"ENC" + seg.raw_data
+
+    command = runs[0].command
+    assert command[command.index("-i") - 6:command.index("-i") + 2] == [
+        "-f", input_format, "-ar", "44100", "-ac", "2", "-i", "pipe:0"]
+    assert command[-3:] == ["-f", "mp3", "pipe:1"]
+    assert runs[0].input == seg.raw_data
+
+
+def test_export_seekable_format(runs, tmp_path):
+    seg = Sine(440).to_audio_segment(200)
+    out_path = str(tmp_path / "speech.mp4")
+    seg.export(out_path, format="mp4").close()
+    with open(out_path, "rb") as f:
+        assert f.read() == b"ENC" + seg.raw_data
+
+    output_name = runs[0].command[-1]
+    assert output_name != "pipe:1"
+    assert not os.path.exists(output_name)
+
+
+def test_export_failure_removes_temporary_file(runs):
+    FakePopen.returncode = 1
+    with pytest.raises(CouldntEncodeError):
+        Sine(440).to_audio_segment(200).export(format="mp4")
+    assert not os.path.exists(runs[0].command[-1])
+
+
+def test_export_wav_without_converter(runs):
+    seg = Sine(440).to_audio_segment(200)
+    assert AudioSegment.from_wav(seg.export(format="wav")) == seg
+    assert runs == []
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import sys
+import time
+import wave
+
+import pytest
+
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+from pydub.generators import Sine
+
+
+def _wav_bytes(seg):
+    wav_file = io.BytesIO()
+    seg.export(wav_file, format="wav")
+    return wav_file.getvalue()
+
+
+class NonSeekable(io.RawIOBase):
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self.data.read(size)
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    seg = Sine(440).to_audio_segment(3000).set_frame_rate(16000).set_channels(2)
+    path = tmp_path / "tone.wav"
+    path.write_bytes(_wav_bytes(seg))
+    return str(path)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"start_second": 1.25},
+    {"duration": 2},
+    {"start_second": 0.5, "duration": 1.1},
+    {"start_second": 5},
+])
+def test_iter_wav(wav_path, kwargs):
+    expected = AudioSegment.from_file(wav_path, **kwargs)
+    chunks = list(AudioSegment.iter_file(wav_path, chunk_ms=300, **kwargs))
+    assert b"".join(chunk.raw_data for chunk in chunks) == expected.raw_data
+    assert all(chunk.frame_count() == 4800 for chunk in chunks[:-1])
+    assert all(chunk.frame_rate == 16000 and chunk.channels == 2 for chunk in chunks)
+
+
+@pytest.mark.parametrize("sample_width", [1, 2, 4])
+def test_iter_wav_sample_widths(sample_width):
+    seg = Sine(440).to_audio_segment(500).set_sample_width(sample_width)
+    chunks = list(AudioSegment.iter_file(io.BytesIO(_wav_bytes(seg)), format="wav", chunk_ms=100))
+    assert b"".join(chunk.raw_data for chunk in chunks) == seg.raw_data
+    assert chunks[0].sample_width == sample_width
+
+
+def test_iter_wav_24_bit():
+    wav_file = io.BytesIO()
+    wav_writer = wave.open(wav_file, "wb")
+    wav_writer.setnchannels(1)
+    wav_writer.setsampwidth(3)
+    wav_writer.setframerate(8000)
+    wav_writer.writeframes(bytes(range(240)) * 100)
+    wav_writer.close()
+
+    expected = AudioSegment.from_file(io.BytesIO(wav_file.getvalue()), format="wav")
+    chunks = list(AudioSegment.iter_file(io.BytesIO(wav_file.getvalue()), format="wav", chunk_ms=100))
+    assert b"".join(chunk.raw_data for chunk in chunks) == expected.raw_data
+    assert chunks[0].sample_width == 4
+
+
+def test_iter_non_seekable_file(wav_path):
+    with open(wav_path, "rb") as f:
+        data = f.read()
+    expected = AudioSegment.from_file(wav_path)[1000:]
+    chunks = AudioSegment.iter_file(NonSeekable(data), format="wav", start_second=1)
+    assert b"".join(chunk.raw_data for chunk in chunks) == expected.raw_data
+
+
+def test_iter_raw():
+    seg = Sine(440).to_audio_segment(2000)
+    chunks = list(AudioSegment.iter_file(io.BytesIO(seg.raw_data), format="raw", chunk_ms=500, start_second=0.5,
+                                         sample_width=seg.sample_width, frame_rate=seg.frame_rate,
+                                         channels=seg.channels))
+    assert len(chunks) == 3
+    assert b"".join(chunk.raw_data for chunk in chunks) == seg[500:].raw_data
+
+
+FAKE_DECODER = r'''
+import os, struct, sys, time
+
+args = sys.argv[1:]
+source = args[args.index("-i") + 1]
+mode = os.environ.get("FAKE_DECODER_MODE", "copy")
+with open(os.environ["FAKE_DECODER_PID_FILE"], "w") as f:
+    f.write(str(os.getpid()))
+if mode == "fail":
+    sys.stderr.write("Invalid data found when processing input\n")
+    sys.exit(1)
+
+# "decodes" raw 16-bit mono 8 kHz audio, writing a wav header with unknown
+# sizes first, like ffmpeg does when writing to a pipe
+out = sys.stdout.buffer
+out.write(b"RIFF\xff\xff\xff\xffWAVEfmt " + struct.pack("<IHHIIHH", 16, 1, 1, 8000, 16000, 2, 16) +
+          b"data\xff\xff\xff\xff")
+audio = sys.stdin.buffer if source == "-" else open(source, "rb")
+for block in iter(lambda: audio.read(16000), b""):
+    out.write(block)
+    out.flush()
+    if mode == "stall":  # keep the rest of the audio to itself
+        time.sleep(60)
+'''
+
+
+@pytest.fixture
+def fake_decoder(tmp_path, monkeypatch):
+    """Points AudioSegment.converter at a script standing in for ffmpeg, and returns its pid file"""
+    if os.name == "nt":
+        pytest.skip("the fake decoder is a shell script")
+    script = tmp_path / "fake_decoder.py"
+    script.write_text(FAKE_DECODER)
+    converter = tmp_path / "fake_ffmpeg"
+    converter.write_text('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(sys.executable, script))
+    converter.chmod(0o755)
+    pid_file = tmp_path / "pid"
+    monkeypatch.setattr(AudioSegment, "converter", str(converter))
+    monkeypatch.setenv("FAKE_DECODER_PID_FILE", str(pid_file))
+    return pid_file
+
+
+def _raw_audio(ms):
+    return Sine(440).to_audio_segment(ms).set_frame_rate(8000).raw_data
+
+
+def _assert_exited(pid_file):
+    with pytest.raises(OSError):  # the process is gone, not even a zombie
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def test_iter_decoded_file(fake_decoder, tmp_path):
+    raw = _raw_audio(2500)
+    path = tmp_path / "speech.mp3"
+    path.write_bytes(raw)
+    chunks = list(AudioSegment.iter_file(str(path), chunk_ms=300, sample_width=2))
+    assert b"".join(chunk.raw_data for chunk in chunks) == raw
+    assert all(chunk.frame_count() == 2400 for chunk in chunks[:-1])
+    assert all(chunk.frame_rate == 8000 and chunk.channels == 1 for chunk in chunks)
+
+
+def test_iter_decoded_file_object(fake_decoder):
+    raw = _raw_audio(60000)  # more than fits in a pipe, so it must be fed while the output is read
+    chunks = AudioSegment.iter_file(io.BytesIO(raw), format="mp3", chunk_ms=1000)
+    assert b"".join(chunk.raw_data for chunk in chunks) == raw
+
+
+@pytest.mark.parametrize("from_file_object", [False, True])
+def test_decoder_output_is_read_as_it_is_produced(fake_decoder, monkeypatch, tmp_path, from_file_object):
+    monkeypatch.setenv("FAKE_DECODER_MODE", "stall")
+    raw = _raw_audio(60000)
+    path = tmp_path / "speech.mp3"
+    path.write_bytes(raw)
+    source = io.BytesIO(raw) if from_file_object else str(path)
+    chunks = AudioSegment.iter_file(source, format="mp3", chunk_ms=300, sample_width=2)
+
+    start = time.time()
+    assert next(chunks).raw_data == raw[:4800]  # doesn't wait for the decoder to finish
+    chunks.close()  # kills the decoder, and stops feeding it
+    assert time.time() - start < 30
+    _assert_exited(fake_decoder)
+
+
+def test_decoder_errors(fake_decoder, monkeypatch):
+    monkeypatch.setenv("FAKE_DECODER_MODE", "fail")
+    with pytest.raises(CouldntDecodeError) as excinfo:
+        list(AudioSegment.iter_file(io.BytesIO(_raw_audio(500)), format="mp3"))
+    assert "error code: 1" in str(excinfo.value)
+    assert "Invalid data found when processing input" in str(excinfo.value)
+    _assert_exited(fake_decoder)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import io
+import wave
+
+import pytest
+
+from pydub import AudioSegment
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("dtype", ["i1", "i2", "i4"])
+def test_from_numpy_shares_memory(dtype):
+    samples = np.arange(-50, 50, dtype=dtype).reshape(-1, 2)
+    seg = AudioSegment.from_numpy(samples, 16000)
+    assert (seg.sample_width, seg.channels, seg.frame_rate) == (samples.itemsize, 2, 16000)
+
+    view = seg.to_numpy()
+    assert view.shape == (50, 2)
+    assert not view.flags.writeable
+    assert np.shares_memory(view, samples)
+    assert (view == samples).all()
+
+    # raw_data copies the samples to bytes
+    assert seg.raw_data == samples.tobytes()
+    assert type(seg.raw_data) is bytes
+
+
+def test_to_numpy_shares_memory():
+    seg = AudioSegment(b"\x01\x00\xff\xff\x00\x80", sample_width=2, frame_rate=8000, channels=1)
+    view = seg.to_numpy()
+    assert view.tolist() == [[1], [-1], [-32768]]
+    assert not view.flags.writeable
+    assert view.ctypes.data == np.frombuffer(seg.raw_data, dtype=np.uint8).ctypes.data
+
+
+def test_from_numpy_copies_other_arrays():
+    samples = np.arange(12, dtype=">i2").reshape(3, 4)
+    for array in [samples, np.asfortranarray(samples.astype("i2")), samples.astype("i2")[:, ::2]]:
+        seg = AudioSegment.from_numpy(array, 8000)
+        assert (seg.to_numpy() == array).all()
+
+
+def test_from_numpy_segment_operations():
+    samples = (1000 * np.sin(np.arange(8000) / 10.0)).astype(np.int16)
+    seg = AudioSegment.from_numpy(samples, 8000)
+    copy = AudioSegment(samples.tobytes(), sample_width=2, frame_rate=8000, channels=1)
+    assert seg == copy
+    assert hash(seg) == hash(copy)
+    assert (seg * 2).raw_data == (copy * 2).raw_data
+    assert seg.append(seg, crossfade=0).raw_data == copy.append(copy, crossfade=0).raw_data
+    assert seg[100:200].raw_data == copy[100:200].raw_data
+    assert (seg + 6).raw_data == (copy + 6).raw_data
+
+
+def test_from_numpy_24_bit():
+    values = np.array([[1, -1], [8388607, -8388608], [0, 4660]])
+    packed = (values[..., np.newaxis] >> np.array([0, 8, 16]) & 0xff).astype(np.uint8)
+    seg = AudioSegment.from_numpy(packed, 48000, sample_width=3)
+    assert (seg.sample_width, seg.channels) == (4, 2)
+    assert (seg.to_numpy() == values * 256).all()
+
+    wav_file = io.BytesIO()
+    wav_writer = wave.open(wav_file, "wb")
+    wav_writer.setnchannels(2)
+    wav_writer.setsampwidth(3)
+    wav_writer.setframerate(48000)
+    wav_writer.writeframes(packed.tobytes())
+    wav_writer.close()
+    assert AudioSegment.from_wav(io.BytesIO(wav_file.getvalue())) == seg
+
+    mono = AudioSegment.from_numpy(packed[:, 0], 48000, sample_width=3)
+    assert mono.channels == 1
+    assert (mono.to_numpy()[:, 0] == values[:, 0] * 256).all()
+
+
+@pytest.mark.parametrize("samples, sample_width", [
+    (np.zeros(4), None),
+    (np.zeros(4, dtype=np.uint16), None),
+    (np.zeros(4, dtype=np.int64), None),
+    (np.zeros((2, 2, 2), dtype=np.int16), None),
+    (np.zeros(4, dtype=np.int16), 4),
+    (np.zeros((4, 2), dtype=np.int32), 3),
+])
+def test_from_numpy_errors(samples, sample_width):
+    with pytest.raises(ValueError):
+        AudioSegment.from_numpy(samples, 8000, sample_width=sample_width)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+import pytest
+
+from pydub import AudioSegment, utils
+
+PROBE_OUTPUT = json.dumps({
+    "streams": [{"index": 0, "codec_type": "audio", "codec_name": "mp3", "sample_fmt": "s16", "bits_per_sample": 16}],
+    "format": {},
+}).encode()
+PROBE_STDERR = b"    Stream #0:0: Audio: mp3, 44100 Hz, mono, s16\n"
+
+
+class FakePopen(object):
+    commands = []
+
+    def __init__(self, command, **kwargs):
+        self.commands.append(command)
+
+    def communicate(self, input=None):
+        return PROBE_OUTPUT, PROBE_STDERR
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    monkeypatch.setattr(utils, "Popen", FakePopen)
+    monkeypatch.setattr(utils, "_probe_cache", type(utils._probe_cache)())
+    FakePopen.commands = []
+    return FakePopen.commands
+
+
+@pytest.fixture
+def mp3_path(tmp_path):
+    path = tmp_path / "speech.mp3"
+    path.write_bytes(b"\xff\xfb" * 100)
+    return str(path)
+
+
+def test_cached_by_path(probes, mp3_path):
+    info = utils.mediainfo_json(mp3_path)
+    assert info["streams"][0]["bits_per_sample"] == 16
+    info["streams"][0]["bits_per_sample"] = 8  # callers can't modify the cached result
+    assert utils.mediainfo_json(mp3_path)["streams"][0]["bits_per_sample"] == 16
+    assert len(probes) == 1
+
+    os.utime(mp3_path, (0, 0))
+    utils.mediainfo_json(mp3_path)
+    assert len(probes) == 2
+
+
+def test_cached_by_contents(probes):
+    utils.mediainfo_json(io.BytesIO(b"\xff\xfb" * 100))
+    utils.mediainfo_json(io.BytesIO(b"\xff\xfb" * 100))
+    assert len(probes) == 1
+    utils.mediainfo_json(io.BytesIO(b"\xff\xfa" * 100))
+    assert len(probes) == 2
+
+
+def test_cache_size(probes, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "PROBE_CACHE_SIZE", 2)
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / "{}.mp3".format(i)))
+        with open(paths[-1], "wb") as f:
+            f.write(b"\x00" * i)
+        utils.mediainfo_json(paths[-1])
+    utils.mediainfo_json(paths[2])
+    assert len(probes) == 3
+    utils.mediainfo_json(paths[0])
+    assert len(probes) == 4
+
+
+def _decode_command(mp3_path, **kwargs):
+    return AudioSegment._decode_command(mp3_path, mp3_path, "mp3", None, None, None, None, -1, **kwargs)
+
+
+def test_decode_command_probes(probes, mp3_path):
+    command = _decode_command(mp3_path)
+    assert command[command.index("-i") + 1:command.index("-i") + 4] == [mp3_path, "-acodec", "pcm_s16le"]
+    assert len(probes) == 1
+
+
+def test_decode_command_pinned_parameters(probes, mp3_path):
+    command = _decode_command(mp3_path, sample_width=4, frame_rate=16000, channels=1)
+    assert command[command.index("-i") + 2:command.index("-vn")] == ["-acodec", "pcm_s32le", "-ar", "16000",
+                                                                      "-ac", "1"]
+    assert _decode_command(mp3_path, sample_width=1)[command.index("-i") + 3] == "pcm_u8"
+    assert probes == []
+
+
+def test_decode_command_probe_info(probes, mp3_path):
+    info = {"streams": [{"codec_type": "audio", "codec_name": "flac", "bits_per_sample": 24}]}
+    command = _decode_command(mp3_path, probe_info=info)
+    assert "pcm_s24le" in command
+    assert probes == []
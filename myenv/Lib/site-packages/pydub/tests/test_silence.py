@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Checks that silence detection from running sums of squared samples matches slicing the audio"""
+import array
+import itertools
+import random
+
+import pytest
+
+from pydub import AudioSegment, silence
+from pydub.utils import db_to_float
+
+BACKENDS = ["numpy", "python"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(silence, "np", None)
+    return request.param
+
+
+def reference_detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """The previous detect_silence(), which took the rms of a slice of the audio at every step"""
+    seg_len = len(audio_segment)
+    if seg_len < min_silence_len:
+        return []
+    silence_thresh = db_to_float(silence_thresh) * audio_segment.max_possible_amplitude
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = range(0, last_slice_start + 1, seek_step)
+    if last_slice_start % seek_step:
+        slice_starts = itertools.chain(slice_starts, [last_slice_start])
+    silence_starts = [i for i in slice_starts if audio_segment[i:i + min_silence_len].rms <= silence_thresh]
+    if not silence_starts:
+        return []
+
+    silent_ranges = []
+    prev_i = silence_starts.pop(0)
+    current_range_start = prev_i
+    for silence_start_i in silence_starts:
+        continuous = (silence_start_i == prev_i + seek_step)
+        silence_has_gap = silence_start_i > (prev_i + min_silence_len)
+        if not continuous and silence_has_gap:
+            silent_ranges.append([current_range_start, prev_i + min_silence_len])
+            current_range_start = silence_start_i
+        prev_i = silence_start_i
+    silent_ranges.append([current_range_start, prev_i + min_silence_len])
+    return silent_ranges
+
+
+def make_recording(ms, frame_rate=8000, channels=1, sample_width=2, seed=0, loud=True):
+    """Audio alternating between loud and quiet pieces of 20 to 300 ms (or only quiet ones)"""
+    rng = random.Random(seed)
+    maxval = (1 << (8 * sample_width - 1)) - 1
+    samples = array.array({1: "b", 2: "h", 4: "i"}[sample_width])
+    frame_count = int(ms * frame_rate / 1000)
+    while len(samples) < frame_count * channels:
+        amplitude = maxval if loud and rng.random() < 0.5 else maxval // 500
+        piece = int(rng.randint(20, 300) * frame_rate / 1000) * channels
+        samples.extend(rng.randint(-amplitude, amplitude) for _ in range(piece))
+    del samples[frame_count * channels:]
+    return AudioSegment(samples.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
+
+@pytest.mark.parametrize("sample_width", [1, 2, 4])
+@pytest.mark.parametrize("frame_rate,channels", [(8000, 1), (11025, 2), (44100, 1)])
+def test_matches_slicing(backend, sample_width, frame_rate, channels):
+    seg = make_recording(1500, frame_rate, channels, sample_width, seed=sample_width)
+    for min_silence_len, seek_step in [(100, 1), (250, 7), (40, 100), (1499, 3)]:
+        for thresh in (-30, -50):
+            expected = reference_detect_silence(seg, min_silence_len, thresh, seek_step)
+            assert silence.detect_silence(seg, min_silence_len, thresh, seek_step) == expected
+
+
+def test_segment_shorter_than_the_window(backend):
+    seg = make_recording(90, loud=False)
+    assert silence.detect_silence(seg, 100, -16) == reference_detect_silence(seg, 100, -16) == []
+    assert silence.detect_nonsilent(seg, 100, -16) == [[0, 90]]
+    assert silence.detect_silence(seg, 90, -16) == reference_detect_silence(seg, 90, -16) == [[0, 90]]
+
+
+@pytest.mark.parametrize("seek_step", [1, 10, 333])
+def test_quiet_and_digitally_silent_audio(backend, seek_step):
+    quiet = make_recording(2000, channels=2, loud=False)
+    assert silence.detect_silence(quiet, 300, -40, seek_step) == reference_detect_silence(quiet, 300, -40, seek_step) == [[0, 2000]]
+    digital_silence = AudioSegment.silent(2000, frame_rate=8000)
+    assert silence.detect_silence(digital_silence, 300, -80, seek_step) == [[0, 2000]]
+    assert silence.detect_silence(quiet, 300, -80, seek_step) == reference_detect_silence(quiet, 300, -80, seek_step) == []
+
+
+def test_window_rms_matches_slices(backend, monkeypatch):
+    monkeypatch.setattr(silence, "ENERGY_BLOCK_MS", 64)  # several blocks, the last one partly past the end of the audio
+    for sample_width in (1, 2, 4):
+        seg = make_recording(333, frame_rate=11025, channels=2, sample_width=sample_width, seed=3)
+        starts = list(range(0, len(seg) - 50, 9)) + [len(seg) - 50]  # 333 ms is 3671.325 frames, so the last window is padded
+        rms = silence._window_rms(seg, starts, 50)
+        assert [int(value) for value in rms] == [seg[start:start + 50].rms for start in starts]
+
+
+def test_32_bit_sums_do_not_overflow(backend):
+    maxval = (1 << 31) - 1
+    seg = AudioSegment(array.array("i", [maxval, -maxval - 1] * 8000).tobytes(), sample_width=4, frame_rate=8000, channels=1)
+    assert [int(value) for value in silence._window_rms(seg, [0, 500], 1000)] == [seg.rms, seg[500:1500].rms]
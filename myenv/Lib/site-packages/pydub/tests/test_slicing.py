@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import array
+import pickle
+
+import pytest
+
+from pydub import AudioSegment, AudioSegmentBuilder, silence
+from pydub.utils import make_chunks
+
+
+def make_segment(frames=8000, channels=2):
+    samples = array.array("h", ((i * 37) % 20000 - 10000 for i in range(frames * channels)))
+    return AudioSegment(samples.tobytes(), sample_width=2, frame_rate=8000, channels=channels)
+
+
+def copied_slice(seg, start_frame, end_frame):
+    data = seg.raw_data[start_frame * seg.frame_width:end_frame * seg.frame_width]
+    return seg._spawn(bytes(data))
+
+
+def test_slices_share_the_parent_buffer():
+    seg = make_segment()
+    parent = seg.raw_data
+    part = seg[100:200]
+    assert isinstance(part._data, memoryview)
+    assert part._data.obj is parent
+    assert part == copied_slice(seg, 800, 1600)
+
+    # slices of slices still point at the original buffer
+    inner = part[10:20]
+    assert inner._data.obj is parent
+    assert inner == copied_slice(seg, 880, 960)
+
+    sample_slice = seg.get_sample_slice(5, 25)
+    assert sample_slice._data.obj is parent
+    assert sample_slice == copied_slice(seg, 5, 25)
+
+
+def test_raw_data_is_materialized_once():
+    part = make_segment()[100:200]
+    data = part.raw_data
+    assert type(data) is bytes
+    assert part.raw_data is data
+    assert part[10:20] == copied_slice(part, 80, 160)
+
+
+@pytest.mark.parametrize("wrap", [bytearray, lambda data: memoryview(bytearray(data))])
+def test_slices_of_mutable_buffers_are_copied(wrap):
+    buffer = wrap(make_segment().raw_data)
+    seg = AudioSegment(buffer, sample_width=2, frame_rate=8000, channels=2)
+    part = seg[:10]
+    chunk = AudioSegmentBuilder(seg[:0]).append(seg, crossfade=0)
+    expected = bytes(buffer[:part.frame_width * 80])
+    whole = bytes(buffer)
+    buffer[:4] = b"\x00\x00\x00\x00"
+    assert part.raw_data == expected
+    assert chunk.build().raw_data == whole
+
+
+def test_slices_of_read_only_views_are_shared():
+    parent = make_segment().raw_data
+    seg = AudioSegment(memoryview(parent), sample_width=2, frame_rate=8000, channels=2)
+    assert seg[:10]._data.obj is parent
+
+
+def test_slices_can_release_their_parent():
+    seg = make_segment()
+    part = seg[100:110]
+    assert part._data.obj is seg.raw_data
+    data = part.raw_data
+    assert type(part._data) is bytes and part._data is data
+
+
+def test_sliced_segment_operations():
+    seg = make_segment()
+    part, copy = seg[250:750], copied_slice(seg, 2000, 6000)
+    assert part == copy
+    assert hash(part) == hash(copy)
+    assert len(part) == 500
+    assert part.rms == copy.rms
+    assert part.get_array_of_samples() == copy.get_array_of_samples()
+    assert (part + part).raw_data == (copy + copy).raw_data
+    assert (part * 3).raw_data == (copy * 3).raw_data
+    assert part.reverse().raw_data == copy.reverse().raw_data
+    assert part.overlay(seg[:200]).raw_data == copy.overlay(seg[:200]).raw_data
+    assert part.set_channels(1).raw_data == copy.set_channels(1).raw_data
+    assert silence.detect_silence(part, 100, -80) == silence.detect_silence(copy, 100, -80)
+
+    restored = pickle.loads(pickle.dumps(part))
+    assert restored == copy
+    assert type(restored._data) is bytes
+
+
+def test_slice_past_the_end_is_padded_with_silence():
+    # 86 frames last 10.75 ms, which rounds up to 11 ms (88 frames)
+    seg = make_segment(frames=86)
+    part = seg[5:]
+    assert len(part) == 6
+    assert part.raw_data == copied_slice(seg, 40, 86).raw_data + b"\x00" * 2 * seg.frame_width
+
+
+def test_make_chunks_shares_the_parent_buffer():
+    seg = make_segment()
+    parent = seg.raw_data
+    chunks = make_chunks(seg, 300)
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    assert all(chunk._data.obj is parent for chunk in chunks)
+    assert b"".join(chunk._data for chunk in chunks) == parent
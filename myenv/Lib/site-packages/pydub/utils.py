@@ -1,9 +1,13 @@
 from __future__ import division
 
+import copy
+import hashlib
 import json
 import os
 import re
 import sys
+import threading
+from collections import OrderedDict
 from subprocess import Popen, PIPE
 from math import log, ceil
 from tempfile import TemporaryFile
@@ -13,7 +17,7 @@ from functools import wraps
 try:
     import audioop
 except ImportError:
-    import pyaudioop as audioop
+    from . import pyaudioop as audioop
 
 if sys.version_info >= (3, 0):
     basestring = str
@@ -34,6 +38,12 @@ ARRAY_RANGES = {
     32: (-0x80000000, 0x7fffffff),
 }
 
+# number of mediainfo_json() results kept for files that are probed again
+# (0 disables the cache)
+PROBE_CACHE_SIZE = 64
+_probe_cache = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
 
 def get_frame_width(bit_depth):
     return FRAME_WIDTHS[bit_depth]
@@ -246,6 +256,10 @@ def get_extra_info(stderr):
 
 def mediainfo_json(filepath, read_ahead_limit=-1):
     """Return json dictionary with media info(codec, duration, size, bitrate...) from filepath
+
+    The results for the last PROBE_CACHE_SIZE files are cached, so a file
+    that hasn't changed (or a file object with the same contents) isn't
+    probed again
     """
     prober = get_prober_name()
     command_args = [
@@ -270,6 +284,33 @@ def mediainfo_json(filepath, read_ahead_limit=-1):
         if close_file:
             file.close()
 
+    # files are identified by their path, size and modification time, and
+    # file objects by a hash of their contents
+    if stdin_data is None:
+        try:
+            stat = os.stat(command_args[-1])
+            cache_key = (os.path.abspath(command_args[-1]), stat.st_size, stat.st_mtime_ns)
+        except (OSError, ValueError):
+            cache_key = None  # not a local file (a URL for example)
+    else:
+        cache_key = (hashlib.sha1(stdin_data).hexdigest(), read_ahead_limit)
+
+    with _probe_cache_lock:
+        if cache_key in _probe_cache:
+            _probe_cache.move_to_end(cache_key)
+            return copy.deepcopy(_probe_cache[cache_key])
+
+    info = _probe(prober, command_args, stdin_parameter, stdin_data)
+
+    if info and cache_key is not None and PROBE_CACHE_SIZE > 0:
+        with _probe_cache_lock:
+            _probe_cache[cache_key] = copy.deepcopy(info)
+            while len(_probe_cache) > PROBE_CACHE_SIZE:
+                _probe_cache.popitem(last=False)
+    return info
+
+
+def _probe(prober, command_args, stdin_parameter, stdin_data):
     command = [prober, '-of', 'json'] + command_args
     res = Popen(command, stdin=stdin_parameter, stdout=PIPE, stderr=PIPE)
     output, stderr = res.communicate(input=stdin_data)
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
-"""Library for performing speech recognition, with support for several engines and APIs, online and offline."""
+"""Library for performing speech recognition, with support for several engines and APIs, online and offline.
+
+On Python 3.13 and later, which no longer include the ``audioop`` and ``aifc`` modules, audio conversions use ``pydub.pyaudioop`` instead (so the ``pydub`` package must be installed), and AIFF files are not supported.
+"""
 
 import io
 import os
@@ -8,23 +11,35 @@ import tempfile
 import sys
 import subprocess
 import wave
-import aifc
 import math
-import audioop
 import collections
 import json
+import mmap
+import struct
 import base64
 import threading
 import hashlib
 import hmac
 import time
 import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import requests
 except (ModuleNotFoundError, ImportError):
     pass
 
+try:
+    import audioop
+except ImportError:  # removed from the standard library in Python 3.13; use the pure Python version from pydub
+    from pydub import pyaudioop as audioop
+
+try:
+    import aifc
+except ImportError:  # removed from the standard library in Python 3.13, so AIFF files can't be read
+    aifc = None
+
 __author__ = "Anthony Zhang (Uberi)"
 __version__ = "3.10.0"
 __license__ = "BSD"
@@ -34,6 +49,7 @@ from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
 from .audio import AudioData, get_flac_converter
+from .transport import AsyncHTTPTransport, PooledHTTPTransport, UrllibTransport
 from .exceptions import (
     RequestError,
     TranscriptionFailed, 
@@ -70,11 +86,15 @@ class Microphone(AudioSource):
     Higher ``sample_rate`` values result in better audio quality, but also more bandwidth (and therefore, slower recognition). Additionally, some CPUs, such as those in older Raspberry Pi models, can't keep up if this value is too high.
 
     Higher ``chunk_size`` values help avoid triggering on rapidly changing ambient noise, but also makes detection less sensitive. This value, generally, should be left at its default.
+
+    If ``callback_mode`` is true, PyAudio delivers audio through a callback instead of being read in blocking mode. The callback copies each buffer of ``callback_chunk_size`` samples (defaulting to ``chunk_size``) into a preallocated ring buffer holding ``buffer_duration`` seconds of audio, and reading from the microphone drains that ring buffer. This way, audio keeps being captured while Python code is busy, for example with speech recognition. Smaller ``callback_chunk_size`` values lower latency at the cost of more CPU time spent in callbacks. Audio that arrives while the ring buffer is full is dropped, and counted in ``microphone_instance.overflow_count`` (the number of dropped buffers).
     """
-    def __init__(self, device_index=None, sample_rate=None, chunk_size=1024):
+    def __init__(self, device_index=None, sample_rate=None, chunk_size=1024, callback_mode=False, callback_chunk_size=None, buffer_duration=10):
         assert device_index is None or isinstance(device_index, int), "Device index must be None or an integer"
         assert sample_rate is None or (isinstance(sample_rate, int) and sample_rate > 0), "Sample rate must be None or a positive integer"
         assert isinstance(chunk_size, int) and chunk_size > 0, "Chunk size must be a positive integer"
+        assert callback_chunk_size is None or (isinstance(callback_chunk_size, int) and callback_chunk_size > 0), "Callback chunk size must be None or a positive integer"
+        assert buffer_duration > 0, "Buffer duration must be a positive number"
 
         # set up PyAudio
         self.pyaudio_module = self.get_pyaudio()
@@ -95,9 +115,18 @@ class Microphone(AudioSource):
         self.SAMPLE_WIDTH = self.pyaudio_module.get_sample_size(self.format)  # size of each sample
         self.SAMPLE_RATE = sample_rate  # sampling rate in Hertz
         self.CHUNK = chunk_size  # number of frames stored in each buffer
+        self.callback_mode = callback_mode
+        self.callback_chunk_size = chunk_size if callback_chunk_size is None else callback_chunk_size  # number of frames delivered by each callback
+        self.buffer_duration = buffer_duration  # seconds of audio the ring buffer can hold in callback mode
 
         self.audio = None
         self.stream = None
+        self._closed_overflow_count = 0  # dropped buffers of streams that have already been closed
+
+    @property
+    def overflow_count(self):
+        """Number of buffers of audio that were dropped because the ring buffer was full, in callback mode."""
+        return self._closed_overflow_count + getattr(self.stream, "overflow_count", 0)
 
     @staticmethod
     def get_pyaudio():
@@ -174,12 +203,24 @@ class Microphone(AudioSource):
         assert self.stream is None, "This audio source is already inside a context manager"
         self.audio = self.pyaudio_module.PyAudio()
         try:
-            self.stream = Microphone.MicrophoneStream(
-                self.audio.open(
+            if self.callback_mode:
+                stream = Microphone.CallbackMicrophoneStream(
+                    self.SAMPLE_WIDTH, int(math.ceil(self.buffer_duration * self.SAMPLE_RATE)),
+                    self.pyaudio_module.paContinue, self.pyaudio_module.paInputOverflow,
+                )
+                stream.pyaudio_stream = self.audio.open(
                     input_device_index=self.device_index, channels=1, format=self.format,
-                    rate=self.SAMPLE_RATE, frames_per_buffer=self.CHUNK, input=True,
+                    rate=self.SAMPLE_RATE, frames_per_buffer=self.callback_chunk_size, input=True,
+                    stream_callback=stream.callback,
+                )
+                self.stream = stream
+            else:
+                self.stream = Microphone.MicrophoneStream(
+                    self.audio.open(
+                        input_device_index=self.device_index, channels=1, format=self.format,
+                        rate=self.SAMPLE_RATE, frames_per_buffer=self.CHUNK, input=True,
+                    )
                 )
-            )
         except Exception:
             self.audio.terminate()
         return self
@@ -188,6 +229,7 @@ class Microphone(AudioSource):
         try:
             self.stream.close()
         finally:
+            self._closed_overflow_count += getattr(self.stream, "overflow_count", 0)
             self.stream = None
             self.audio.terminate()
 
@@ -206,6 +248,68 @@ class Microphone(AudioSource):
             finally:
                 self.pyaudio_stream.close()
 
+    class CallbackMicrophoneStream(object):
+        """
+        Microphone stream fed by PyAudio's stream callback through a single-producer, single-consumer ring buffer.
+
+        The callback thread only advances ``write_position`` and the reading thread only advances ``read_position`` (both count bytes since the stream was opened), so no lock is needed to move audio between them.
+        """
+        def __init__(self, sample_width, capacity_frames, pa_continue, pa_input_overflow):
+            self.sample_width = sample_width
+            self.capacity = capacity_frames * sample_width  # size of the ring buffer in bytes
+            self.buffer = bytearray(self.capacity)
+            self.write_position = 0
+            self.read_position = 0
+            self.data_available = threading.Event()  # set by the callback whenever audio is written, to wake up ``read``
+            self.overflow_count = 0  # buffers dropped because the ring buffer was full
+            self.input_overflow_count = 0  # buffers for which PortAudio reported that its own input buffer overflowed
+            self.closed = False
+            self.pyaudio_stream = None
+            self._pa_continue, self._pa_input_overflow = pa_continue, pa_input_overflow
+
+        def callback(self, in_data, frame_count, time_info, status):
+            if status & self._pa_input_overflow:
+                self.input_overflow_count += 1
+            size = len(in_data)
+            if size > self.capacity - (self.write_position - self.read_position):  # ring buffer full, drop this buffer
+                self.overflow_count += 1
+                return None, self._pa_continue
+            start = self.write_position % self.capacity
+            first_part = min(size, self.capacity - start)
+            self.buffer[start:start + first_part] = in_data[:first_part]
+            self.buffer[:size - first_part] = in_data[first_part:]  # wrap around to the start of the ring buffer
+            self.write_position += size
+            self.data_available.set()
+            return None, self._pa_continue
+
+        def read(self, size):
+            size = min(size * self.sample_width, self.capacity)
+            while True:
+                available = self.write_position - self.read_position
+                if available >= size or (self.closed and available > 0):
+                    break
+                if self.closed:
+                    return b""
+                self.data_available.clear()
+                if self.write_position - self.read_position >= size: continue  # the callback wrote more audio after we checked
+                self.data_available.wait()
+            size = min(size, available)
+            start = self.read_position % self.capacity
+            first_part = min(size, self.capacity - start)
+            data = bytes(self.buffer[start:start + first_part]) + bytes(self.buffer[:size - first_part])
+            self.read_position += size
+            return data
+
+        def close(self):
+            try:
+                # sometimes, if the stream isn't stopped, closing the stream throws an exception
+                if not self.pyaudio_stream.is_stopped():
+                    self.pyaudio_stream.stop_stream()
+            finally:
+                self.pyaudio_stream.close()
+                self.closed = True
+                self.data_available.set()
+
 
 class AudioFile(AudioSource):
     """
@@ -217,16 +321,20 @@ class AudioFile(AudioSource):
 
     WAV files must be in PCM/LPCM format; WAVE_FORMAT_EXTENSIBLE and compressed WAV are not supported and may result in undefined behaviour.
 
-    Both AIFF and AIFF-C (compressed AIFF) formats are supported.
+    Both AIFF and AIFF-C (compressed AIFF) formats are supported, except on Python 3.13 and later, where the ``aifc`` module was removed from the standard library.
 
     FLAC files must be in native FLAC format; OGG-FLAC is not supported and may result in undefined behaviour.
+
+    If ``memory_map`` is true and the audio is a mono PCM WAV file on disk (given as a path, or as a file object backed by a real file), the file is memory-mapped instead of read: reading from the stream returns read-only ``memoryview`` slices of the mapping, and ``recognizer_instance.record`` returns an ``AudioData`` instance whose ``frame_data`` is a ``memoryview`` of the mapped region, so the audio is never copied into memory (until the instance is pickled or copied, which converts it to ``bytes``). Other files are read normally.
     """
 
-    def __init__(self, filename_or_fileobject):
+    def __init__(self, filename_or_fileobject, memory_map=False):
         assert isinstance(filename_or_fileobject, (type(""), type(u""))) or hasattr(filename_or_fileobject, "read"), "Given audio file must be a filename string or a file-like object"
         self.filename_or_fileobject = filename_or_fileobject
+        self.memory_map = memory_map
         self.stream = None
         self.DURATION = None
+        self._mapped_file = None  # file object that was memory-mapped, if it was opened by this class
 
         self.audio_reader = None
         self.little_endian = False
@@ -236,23 +344,29 @@ class AudioFile(AudioSource):
 
     def __enter__(self):
         assert self.stream is None, "This audio source is already inside a context manager"
+        if self.memory_map and self._enter_memory_mapped():
+            return self
         try:
             # attempt to read the file as WAV
             self.audio_reader = wave.open(self.filename_or_fileobject, "rb")
             self.little_endian = True  # RIFF WAV is a little-endian format (most ``audioop`` operations assume that the frames are stored in little-endian form)
         except (wave.Error, EOFError):
-            try:
-                # attempt to read the file as AIFF
-                self.audio_reader = aifc.open(self.filename_or_fileobject, "rb")
-                self.little_endian = False  # AIFF is a big-endian format
-            except (aifc.Error, EOFError):
+            self.audio_reader = None
+            if aifc is not None:
+                try:
+                    # attempt to read the file as AIFF
+                    self.audio_reader = aifc.open(self.filename_or_fileobject, "rb")
+                    self.little_endian = False  # AIFF is a big-endian format
+                except (aifc.Error, EOFError):
+                    pass
+            if self.audio_reader is None:
                 # attempt to read the file as FLAC
                 if hasattr(self.filename_or_fileobject, "read"):
                     flac_data = self.filename_or_fileobject.read()
                 else:
                     with open(self.filename_or_fileobject, "rb") as f: flac_data = f.read()
 
-                # run the FLAC converter with the FLAC data to get the AIFF data
+                # run the FLAC converter with the FLAC data to get the AIFF data (or WAV data, without ``aifc``)
                 flac_converter = get_flac_converter()
                 if os.name == "nt":  # on Windows, specify that the process is to be started without showing a console window
                     startup_info = subprocess.STARTUPINFO()
@@ -262,17 +376,22 @@ class AudioFile(AudioSource):
                     startup_info = None  # default startupinfo
                 process = subprocess.Popen([
                     flac_converter,
-                    "--stdout", "--totally-silent",  # put the resulting AIFF file in stdout, and make sure it's not mixed with any program output
-                    "--decode", "--force-aiff-format",  # decode the FLAC file into an AIFF file
+                    "--stdout", "--totally-silent",  # put the decoded file in stdout, and make sure it's not mixed with any program output
+                    "--decode",  # decode the FLAC file into a WAV file, or an AIFF file with the option below
+                ] + (["--force-aiff-format"] if aifc is not None else []) + [
                     "-",  # the input FLAC file contents will be given in stdin
                 ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, startupinfo=startup_info)
-                aiff_data, _ = process.communicate(flac_data)
-                aiff_file = io.BytesIO(aiff_data)
+                decoded_data, _ = process.communicate(flac_data)
+                decoded_file = io.BytesIO(decoded_data)
                 try:
-                    self.audio_reader = aifc.open(aiff_file, "rb")
-                except (aifc.Error, EOFError):
+                    if aifc is not None:
+                        self.audio_reader = aifc.open(decoded_file, "rb")
+                        self.little_endian = False  # AIFF is a big-endian format
+                    else:
+                        self.audio_reader = wave.open(decoded_file, "rb")
+                        self.little_endian = True
+                except (wave.Error, EOFError) + ((aifc.Error,) if aifc is not None else ()):
                     raise ValueError("Audio file could not be read as PCM WAV, AIFF/AIFF-C, or Native FLAC; check if file is corrupted or in another format")
-                self.little_endian = False  # AIFF is a big-endian format
         assert 1 <= self.audio_reader.getnchannels() <= 2, "Audio must be mono or stereo"
         self.SAMPLE_WIDTH = self.audio_reader.getsampwidth()
 
@@ -291,12 +410,101 @@ class AudioFile(AudioSource):
         self.stream = AudioFile.AudioFileStream(self.audio_reader, self.little_endian, samples_24_bit_pretending_to_be_32_bit)
         return self
 
+    def _enter_memory_mapped(self):
+        """Memory-maps the audio if it is a mono PCM WAV file on disk, returning whether it was mapped."""
+        if hasattr(self.filename_or_fileobject, "read"):
+            file = self.filename_or_fileobject
+            try:
+                file.fileno()
+            except (AttributeError, OSError, io.UnsupportedOperation):  # not backed by a real file
+                return False
+        else:
+            file = open(self.filename_or_fileobject, "rb")
+
+        file_start = file.tell()
+        try:
+            mapped = self._map_wav_data(file, file_start)
+        except BaseException:
+            if file is not self.filename_or_fileobject: file.close()
+            raise
+        finally:
+            if file is self.filename_or_fileobject: file.seek(file_start)  # leave file objects where we found them
+        if mapped is None:
+            if file is not self.filename_or_fileobject: file.close()
+            return False
+
+        self.audio_reader, mapping, data_start, data_end = mapped
+        self.little_endian = True
+        self.SAMPLE_WIDTH = self.audio_reader.getsampwidth()
+        self.SAMPLE_RATE = self.audio_reader.getframerate()
+        self.CHUNK = 4096
+        data_end -= (data_end - data_start) % self.SAMPLE_WIDTH  # ignore any partial sample at the end
+        self.FRAME_COUNT = (data_end - data_start) // self.SAMPLE_WIDTH
+        self.DURATION = self.FRAME_COUNT / float(self.SAMPLE_RATE)
+        self.stream = AudioFile.MemoryMappedStream(mapping, data_start, data_end, self.SAMPLE_WIDTH)
+        self._mapped_file = file if file is not self.filename_or_fileobject else None
+        return True
+
+    @staticmethod
+    def _map_wav_data(file, file_start):
+        """Returns ``(audio_reader, mapping, data_start, data_end)`` for the mono PCM WAV file in ``file``, or ``None`` if it isn't one."""
+        try:
+            audio_reader = wave.open(file, "rb")  # make sure this is a PCM WAV file that ``wave`` would accept
+        except (wave.Error, EOFError):
+            return None
+        if audio_reader.getnchannels() != 1:  # stereo audio needs to be converted to mono, which can't be done without copying
+            return None
+
+        # find the data chunk of the RIFF file
+        file.seek(file_start + 12)  # skip the RIFF header
+        while True:
+            chunk_header = file.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"data":
+                data_start = file.tell()
+                break
+            file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)  # chunks are padded to an even size
+
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return audio_reader, mapping, data_start, min(len(mapping), data_start + chunk_size)
+
     def __exit__(self, exc_type, exc_value, traceback):
+        if isinstance(self.stream, AudioFile.MemoryMappedStream):
+            self.stream.close()
+            if self._mapped_file is not None:
+                self._mapped_file.close()
+                self._mapped_file = None
+            self.stream = None
+            self.DURATION = None
+            return
         if not hasattr(self.filename_or_fileobject, "read"):  # only close the file if it was opened by this class in the first place (if the file was originally given as a path)
             self.audio_reader.close()
         self.stream = None
         self.DURATION = None
 
+    class MemoryMappedStream(object):
+        """Stream over the audio samples of a memory-mapped WAV file, returning ``memoryview`` slices of the mapping instead of copies."""
+        def __init__(self, mapping, data_start, data_end, sample_width):
+            self.mapping = mapping
+            self.view = memoryview(mapping)[data_start:data_end].toreadonly()  # the audio samples
+            self.sample_width = sample_width
+            self.position = 0  # offset into ``view`` in bytes
+
+        def read(self, size=-1):
+            end = len(self.view) if size == -1 else min(len(self.view), self.position + size * self.sample_width)
+            buffer = self.view[self.position:end]
+            self.position = end
+            return buffer
+
+        def close(self):
+            self.view.release()
+            try:
+                self.mapping.close()
+            except BufferError:  # ``memoryview`` slices are still in use (e.g., by ``AudioData`` instances); the mapping is closed once they're garbage collected
+                pass
+
     class AudioFileStream(object):
         def __init__(self, audio_reader, little_endian, samples_24_bit_pretending_to_be_32_bit):
             self.audio_reader = audio_reader  # an audio file object (e.g., a `wave.Wave_read` instance)
@@ -334,9 +542,12 @@ class Recognizer(AudioSource):
         self.dynamic_energy_ratio = 1.5
         self.pause_threshold = 0.8  # seconds of non-speaking audio before a phrase is considered complete
         self.operation_timeout = None  # seconds after an internal operation (e.g., an API request) starts before it times out, or ``None`` for no timeout
+        self.transport = PooledHTTPTransport()  # sends the requests of the web API recognizers, reusing connections across calls and threads; see ``speech_recognition.transport``
+        self.async_transport = AsyncHTTPTransport()  # sends the requests of the ``recognize_*_async`` methods with non-blocking I/O
 
         self.phrase_threshold = 0.3  # minimum seconds of speaking audio before we consider the speaking audio a phrase - values below this are ignored (for filtering out clicks and pops)
         self.non_speaking_duration = 0.5  # seconds of non-speaking audio to keep on both sides of the recording
+        self.endpointer = None  # decides when phrases end in ``listen``, or ``None`` to end them after ``pause_threshold`` seconds of audio below the energy threshold; see ``speech_recognition.endpointing``
 
     def record(self, source, duration=None, offset=None):
         """
@@ -348,6 +559,8 @@ class Recognizer(AudioSource):
         assert source.stream is not None, "Audio source must be entered before recording, see documentation for ``AudioSource``; are you using ``source`` outside of a ``with`` statement?"
 
         frames = io.BytesIO()
+        zero_copy = isinstance(source.stream, AudioFile.MemoryMappedStream)  # with memory-mapped files, the recording is a region of the mapping
+        record_start = record_end = source.stream.position if zero_copy else None
         seconds_per_buffer = (source.CHUNK + 0.0) / source.SAMPLE_RATE
         elapsed_time = 0
         offset_time = 0
@@ -365,9 +578,16 @@ class Recognizer(AudioSource):
                 elapsed_time += seconds_per_buffer
                 if duration and elapsed_time > duration: break
 
-                frames.write(buffer)
+                if zero_copy:
+                    if record_start == record_end: record_start = source.stream.position - len(buffer)
+                    record_end = source.stream.position
+                else:
+                    frames.write(buffer)
 
-        frame_data = frames.getvalue()
+        if zero_copy:
+            frame_data = source.stream.view[record_start:record_end]
+        else:
+            frame_data = frames.getvalue()
         frames.close()
         return AudioData(frame_data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
 
@@ -459,6 +679,8 @@ class Recognizer(AudioSource):
 
         The ``snowboy_configuration`` parameter allows integration with `Snowboy <https://snowboy.kitt.ai/>`__, an offline, high-accuracy, power-efficient hotword recognition engine. When used, this function will pause until Snowboy detects a hotword, after which it will unpause. This parameter should either be ``None`` to turn off Snowboy support, or a tuple of the form ``(SNOWBOY_LOCATION, LIST_OF_HOT_WORD_FILES)``, where ``SNOWBOY_LOCATION`` is the path to the Snowboy root directory, and ``LIST_OF_HOT_WORD_FILES`` is a list of paths to Snowboy hotword configuration files (`*.pmdl` or `*.umdl` format).
 
+        If ``recognizer_instance.endpointer`` is set, it decides which audio is speech and when the phrase has ended instead, once the phrase has started (see ``speech_recognition.endpointing``).
+
         This operation will always complete within ``timeout + phrase_timeout`` seconds if both are numbers, either by returning the audio data, or by raising a ``speech_recognition.WaitTimeoutError`` exception.
         """
         assert isinstance(source, AudioSource), "Source must be an audio source"
@@ -514,6 +736,8 @@ class Recognizer(AudioSource):
             # read audio input until the phrase ends
             pause_count, phrase_count = 0, 0
             phrase_start_time = elapsed_time
+            endpointer = self.endpointer
+            if endpointer is not None: endpointer.reset(self, source)
             while True:
                 # handle phrase being too long by cutting off the audio
                 elapsed_time += seconds_per_buffer
@@ -525,6 +749,14 @@ class Recognizer(AudioSource):
                 frames.append(buffer)
                 phrase_count += 1
 
+                if endpointer is not None:  # let the endpointer decide whether the phrase has ended
+                    if endpointer.is_speech(buffer):
+                        pause_count = 0
+                    else:
+                        pause_count += 1
+                    if endpointer.is_end_of_phrase(pause_count * seconds_per_buffer): break
+                    continue
+
                 # check if speaking has stopped for longer than the pause threshold on the audio input
                 energy = audioop.rms(buffer, source.SAMPLE_WIDTH)  # unit energy of the audio signal within the buffer
                 if energy > self.energy_threshold:
@@ -577,6 +809,169 @@ class Recognizer(AudioSource):
         listener_thread.start()
         return stopper
 
+    async def listen_async(self, source, phrase_time_limit=None):
+        """
+        Async generator that repeatedly records phrases from ``source`` (an ``AudioSource`` instance) and yields them as ``AudioData`` instances, like ``recognizer_instance.listen_in_background`` does with its callback. Use it as ``async for audio in recognizer_instance.listen_async(source):``.
+
+        Phrase recognition uses the exact same mechanism as ``recognizer_instance.listen(source)``, and the ``phrase_time_limit`` parameter works in the same way. Audio sources only offer blocking reads, so listening runs in the event loop's default executor, one second at a time; the event loop itself is never blocked. ``source`` is entered when the generator starts, and exited when it is closed or cancelled, once the listening in progress (at most about a second, or ``phrase_time_limit`` seconds if a phrase has started) has finished.
+        """
+        assert isinstance(source, AudioSource), "Source must be an audio source"
+        loop = asyncio.get_running_loop()
+        with source as s:
+            listening = None
+            try:
+                while True:
+                    listening = loop.run_in_executor(None, self.listen, s, 1, phrase_time_limit)
+                    try:  # listen for 1 second at a time, so that closing the generator doesn't have to wait for a phrase
+                        audio = await asyncio.shield(listening)  # cancelling the generator must not abandon the executor thread
+                    except WaitTimeoutError:  # listening timed out, just try again
+                        continue
+                    yield audio
+            finally:
+                if listening is not None and not listening.done():  # closed or cancelled while the executor thread is still reading from the source, which must stay open until it is done
+                    try:
+                        await listening
+                    except Exception:  # the generator is being closed anyway
+                        pass
+
+    def _send_recognition_request(self, request):
+        """Sends ``request`` using ``recognizer_instance.transport``, returning the response text."""
+        try:
+            response = self.transport.urlopen(request, timeout=self.operation_timeout)
+        except HTTPError as e:
+            raise RequestError("recognition request failed: {}".format(e.reason))
+        except URLError as e:
+            raise RequestError("recognition connection failed: {}".format(e.reason))
+        return response.read().decode("utf-8")
+
+    async def _send_recognition_request_async(self, request):
+        """Sends ``request`` using ``recognizer_instance.async_transport``, returning the response text."""
+        try:
+            response = await self.async_transport.urlopen(request, timeout=self.operation_timeout)
+        except HTTPError as e:
+            raise RequestError("recognition request failed: {}".format(e.reason))
+        except URLError as e:
+            raise RequestError("recognition connection failed: {}".format(e.reason))
+        return response.read().decode("utf-8")
+
+    def split_on_silence(self, audio_data, max_segment_duration=30, overlap=0.25):
+        """
+        Splits ``audio_data`` (an ``AudioData`` instance) into segments of speech, returning a list of ``(start_time, end_time, forced_cut, segment_audio_data)`` tuples in chronological order, where the times are in seconds.
+
+        Speech is detected the same way as in ``recognizer_instance.listen``: audio is speech if its energy is above ``recognizer_instance.energy_threshold``. Segments end wherever there are at least ``recognizer_instance.pause_threshold`` seconds of non-speaking audio, and stretches of speech shorter than ``recognizer_instance.phrase_threshold`` seconds are discarded. The energy threshold is not adjusted while splitting.
+
+        Segments longer than ``max_segment_duration`` seconds are cut at the quietest point in the second half of the allowed duration; ``forced_cut`` is true for a segment that ends at such a cut. Each segment is then extended by ``overlap`` seconds of the surrounding audio on both sides, so that words at a cut aren't lost.
+        """
+        assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+        assert max_segment_duration > self.pause_threshold, "``max_segment_duration`` must be greater than ``recognizer_instance.pause_threshold``"
+        assert overlap >= 0, "``overlap`` must be a non-negative number"
+
+        raw_data = audio_data.get_raw_data()  # 8-bit audio is returned with signed samples, so its energy is computed correctly
+        sample_width, sample_rate = audio_data.sample_width, audio_data.sample_rate
+        seconds_per_buffer = 0.05
+        buffer_size = max(1, int(sample_rate * seconds_per_buffer)) * sample_width
+        seconds_per_buffer = float(buffer_size // sample_width) / sample_rate
+        energies = [audioop.rms(raw_data[i:i + buffer_size], sample_width) for i in range(0, len(raw_data), buffer_size)]
+        pause_buffer_count = int(math.ceil(self.pause_threshold / seconds_per_buffer))
+        phrase_buffer_count = int(math.ceil(self.phrase_threshold / seconds_per_buffer))
+        max_segment_buffer_count = max(1, int(max_segment_duration / seconds_per_buffer))
+
+        # find stretches of speech separated by pauses of at least ``pause_threshold`` seconds
+        regions = []  # list of ``[first_buffer, end_buffer, speaking_buffer_count]`` lists
+        pause_count = pause_buffer_count  # the start of the audio counts as a pause
+        for i, energy in enumerate(energies):
+            if energy > self.energy_threshold:
+                if pause_count >= pause_buffer_count:
+                    regions.append([i, i + 1, 0])
+                regions[-1][1] = i + 1
+                regions[-1][2] += 1
+                pause_count = 0
+            else:
+                pause_count += 1
+        regions = [(start, end) for start, end, speaking_count in regions if speaking_count >= phrase_buffer_count]
+
+        # cut stretches that are too long at their quietest point
+        cuts = []  # list of ``(first_buffer, end_buffer, forced_cut)`` tuples
+        for start, end in regions:
+            while end - start > max_segment_buffer_count:
+                window_start = start + max_segment_buffer_count // 2
+                cut = min(range(window_start, start + max_segment_buffer_count), key=lambda i: (energies[i], -i)) + 1  # prefer later cuts, so there are fewer segments
+                cuts.append((start, cut, True))
+                start = cut
+            cuts.append((start, end, False))
+
+        overlap_buffer_count = int(math.ceil(overlap / seconds_per_buffer))
+        segments = []
+        for start, end, forced_cut in cuts:
+            start, end = max(0, start - overlap_buffer_count), min(len(energies), end + overlap_buffer_count)
+            segment = AudioData(audio_data.frame_data[start * buffer_size:end * buffer_size], sample_rate, sample_width)
+            segments.append((start * seconds_per_buffer, min(end * seconds_per_buffer, float(len(raw_data) // sample_width) / sample_rate), forced_cut, segment))
+        return segments
+
+    def recognize_long(self, audio_data, engine="google", max_workers=4, max_segment_duration=30, overlap=0.25, show_segments=False, **engine_options):
+        """
+        Performs speech recognition on long ``audio_data`` (an ``AudioData`` instance) by splitting it into segments at pauses with ``recognizer_instance.split_on_silence`` and recognizing the segments concurrently.
+
+        The speech recognition engine is specified by ``engine``: either the name of a ``recognizer_instance.recognize_*`` method, like ``"google"`` (the default) or ``"wit"``, or a function that takes an ``AudioData`` instance and returns its transcription. Extra keyword arguments are passed to the engine, like ``recognizer_instance.recognize_long(audio, engine="wit", key=WIT_KEY)``. If the engine returns a tuple, like ``recognize_google(..., with_confidence=True)`` does, its first element is used as the transcription.
+
+        Up to ``max_workers`` segments are recognized at the same time. The ``max_segment_duration`` and ``overlap`` parameters work as in ``recognizer_instance.split_on_silence``; where a segment had to be cut in the middle of speech, words repeated at the start of the next segment because of the overlap are removed.
+
+        Returns the transcriptions of all the segments joined in order if ``show_segments`` is false (the default). Otherwise, returns a tuple ``(transcription, segments)``, where ``segments`` is a list of dictionaries with ``"start"`` and ``"end"`` times in seconds and the ``"transcript"`` of each segment, which is ``None`` if that segment was unintelligible.
+
+        Raises a ``speech_recognition.UnknownValueError`` exception if none of the speech is intelligible. Exceptions raised by the engine for any segment, like ``speech_recognition.RequestError``, are re-raised.
+        """
+        assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+        assert max_workers >= 1, "``max_workers`` must be a positive integer"
+        if isinstance(engine, str):
+            recognize = getattr(self, "recognize_{}".format(engine), None)
+            assert recognize is not None, "``engine`` must be the name of a speech recognition engine, like \"google\""
+        else:
+            assert callable(engine), "``engine`` must be a string or a function"
+            recognize = engine
+
+        def recognize_segment(segment_audio):
+            try:
+                result = recognize(segment_audio, **engine_options)
+            except UnknownValueError:  # nothing intelligible in this segment, the others might still have speech
+                return None
+            return result[0] if isinstance(result, tuple) else result
+
+        segments = self.split_on_silence(audio_data, max_segment_duration, overlap)
+        if not segments:
+            raise UnknownValueError()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(segments))) as executor:
+            futures = [executor.submit(recognize_segment, segment_audio) for _, _, _, segment_audio in segments]
+            try:
+                transcripts = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:  # don't send requests for segments that haven't started yet
+                    future.cancel()
+                raise
+
+        # stitch the transcriptions together
+        words, results = [], []
+        previous_forced_cut = False
+        for (start_time, end_time, forced_cut, _), transcript in zip(segments, transcripts):
+            results.append({"start": start_time, "end": end_time, "transcript": transcript})
+            if transcript is None:
+                previous_forced_cut = False
+                continue
+            segment_words = transcript.split()
+            if previous_forced_cut:  # the overlap may have caused the words around the cut to be recognized twice
+                for count in range(min(4, len(words), len(segment_words)), 0, -1):
+                    if [word.lower() for word in words[-count:]] == [word.lower() for word in segment_words[:count]]:
+                        segment_words = segment_words[count:]
+                        break
+            words.extend(segment_words)
+            previous_forced_cut = forced_cut
+        if all(transcript is None for transcript in transcripts):
+            raise UnknownValueError()
+
+        transcription = " ".join(words)
+        if show_segments:
+            return transcription, results
+        return transcription
+
     def recognize_sphinx(self, audio_data, language="en-US", keyword_entries=None, grammar=None, show_all=False):
         """
         Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using CMU Sphinx.
@@ -686,6 +1081,19 @@ class Recognizer(AudioSource):
 
         Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the key isn't valid, or if there is no internet connection.
         """
+        request = self._google_request(audio_data, key, language, pfilter)
+        response_text = self._send_recognition_request(request)
+        return self._google_result(response_text, show_all, with_confidence)
+
+    async def recognize_google_async(self, audio_data, key=None, language="en-US", pfilter=0, show_all=False, with_confidence=False):
+        """
+        Async counterpart of ``recognizer_instance.recognize_google``, which takes the same parameters and returns the same results, but converts the audio in the event loop's default executor and sends the request with non-blocking I/O on the running event loop using ``recognizer_instance.async_transport``.
+        """
+        request = await asyncio.get_running_loop().run_in_executor(None, self._google_request, audio_data, key, language, pfilter)
+        response_text = await self._send_recognition_request_async(request)
+        return self._google_result(response_text, show_all, with_confidence)
+
+    def _google_request(self, audio_data, key, language, pfilter):
         assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
         assert key is None or isinstance(key, str), "``key`` must be ``None`` or a string"
         assert isinstance(language, str), "``language`` must be a string"
@@ -702,16 +1110,9 @@ class Recognizer(AudioSource):
             "pFilter": pfilter
         }))
         request = Request(url, data=flac_data, headers={"Content-Type": "audio/x-flac; rate={}".format(audio_data.sample_rate)})
+        return request
 
-        # obtain audio transcription results
-        try:
-            response = urlopen(request, timeout=self.operation_timeout)
-        except HTTPError as e:
-            raise RequestError("recognition request failed: {}".format(e.reason))
-        except URLError as e:
-            raise RequestError("recognition connection failed: {}".format(e.reason))
-        response_text = response.read().decode("utf-8")
-
+    def _google_result(self, response_text, show_all, with_confidence):
         # ignore any blank blocks
         actual_result = []
         for line in response_text.split("\n"):
@@ -826,6 +1227,19 @@ class Recognizer(AudioSource):
 
         Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the key isn't valid, or if there is no internet connection.
         """
+        request = self._wit_request(audio_data, key)
+        response_text = self._send_recognition_request(request)
+        return self._wit_result(response_text, show_all)
+
+    async def recognize_wit_async(self, audio_data, key, show_all=False):
+        """
+        Async counterpart of ``recognizer_instance.recognize_wit``, which takes the same parameters and returns the same results, but converts the audio in the event loop's default executor and sends the request with non-blocking I/O on the running event loop using ``recognizer_instance.async_transport``.
+        """
+        request = await asyncio.get_running_loop().run_in_executor(None, self._wit_request, audio_data, key)
+        response_text = await self._send_recognition_request_async(request)
+        return self._wit_result(response_text, show_all)
+
+    def _wit_request(self, audio_data, key):
         assert isinstance(audio_data, AudioData), "Data must be audio data"
         assert isinstance(key, str), "``key`` must be a string"
 
@@ -835,13 +1249,9 @@ class Recognizer(AudioSource):
         )
         url = "https://api.wit.ai/speech?v=20170307"
         request = Request(url, data=wav_data, headers={"Authorization": "Bearer {}".format(key), "Content-Type": "audio/wav"})
-        try:
-            response = urlopen(request, timeout=self.operation_timeout)
-        except HTTPError as e:
-            raise RequestError("recognition request failed: {}".format(e.reason))
-        except URLError as e:
-            raise RequestError("recognition connection failed: {}".format(e.reason))
-        response_text = response.read().decode("utf-8")
+        return request
+
+    def _wit_result(self, response_text, show_all):
         result = json.loads(response_text)
 
         # return results
@@ -889,7 +1299,7 @@ class Recognizer(AudioSource):
                 start_time = monotonic()
 
             try:
-                credential_response = urlopen(credential_request, timeout=60)  # credential response can take longer, use longer timeout instead of default one
+                credential_response = self.transport.urlopen(credential_request, timeout=60)  # credential response can take longer, use longer timeout instead of default one
             except HTTPError as e:
                 raise RequestError("credential request failed: {}".format(e.reason))
             except URLError as e:
@@ -928,7 +1338,7 @@ class Recognizer(AudioSource):
             })
 
         try:
-            response = urlopen(request, timeout=self.operation_timeout)
+            response = self.transport.urlopen(request, timeout=self.operation_timeout)
         except HTTPError as e:
             raise RequestError("recognition request failed: {}".format(e.reason))
         except URLError as e:
@@ -981,7 +1391,7 @@ class Recognizer(AudioSource):
                 start_time = monotonic()
 
             try:
-                credential_response = urlopen(credential_request, timeout=60)  # credential response can take longer, use longer timeout instead of default one
+                credential_response = self.transport.urlopen(credential_request, timeout=60)  # credential response can take longer, use longer timeout instead of default one
             except HTTPError as e:
                 raise RequestError("credential request failed: {}".format(e.reason))
             except URLError as e:
@@ -1020,7 +1430,7 @@ class Recognizer(AudioSource):
             })
 
         try:
-            response = urlopen(request, timeout=self.operation_timeout)
+            response = self.transport.urlopen(request, timeout=self.operation_timeout)
         except HTTPError as e:
             raise RequestError("recognition request failed: {}".format(e.reason))
         except URLError as e:
@@ -1081,6 +1491,19 @@ class Recognizer(AudioSource):
 
         Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the key isn't valid, or if there is no internet connection.
         """
+        request = self._houndify_request(audio_data, client_id, client_key)
+        response_text = self._send_recognition_request(request)
+        return self._houndify_result(response_text, show_all)
+
+    async def recognize_houndify_async(self, audio_data, client_id, client_key, show_all=False):
+        """
+        Async counterpart of ``recognizer_instance.recognize_houndify``, which takes the same parameters and returns the same results, but converts the audio in the event loop's default executor and sends the request with non-blocking I/O on the running event loop using ``recognizer_instance.async_transport``.
+        """
+        request = await asyncio.get_running_loop().run_in_executor(None, self._houndify_request, audio_data, client_id, client_key)
+        response_text = await self._send_recognition_request_async(request)
+        return self._houndify_result(response_text, show_all)
+
+    def _houndify_request(self, audio_data, client_id, client_key):
         assert isinstance(audio_data, AudioData), "Data must be audio data"
         assert isinstance(client_id, str), "``client_id`` must be a string"
         assert isinstance(client_key, str), "``client_key`` must be a string"
@@ -1105,13 +1528,9 @@ class Recognizer(AudioSource):
             "Hound-Request-Authentication": "{};{}".format(user_id, request_id),
             "Hound-Client-Authentication": "{};{};{}".format(client_id, request_time, request_signature)
         })
-        try:
-            response = urlopen(request, timeout=self.operation_timeout)
-        except HTTPError as e:
-            raise RequestError("recognition request failed: {}".format(e.reason))
-        except URLError as e:
-            raise RequestError("recognition connection failed: {}".format(e.reason))
-        response_text = response.read().decode("utf-8")
+        return request
+
+    def _houndify_result(self, response_text, show_all):
         result = json.loads(response_text)
 
         # return results
@@ -1209,7 +1628,7 @@ class Recognizer(AudioSource):
                 # Retrieve transcription JSON containing transcript.
                 transcript_uri = job['Transcript']['TranscriptFileUri']
                 import urllib.request, json
-                with urllib.request.urlopen(transcript_uri) as json_data:
+                with self.transport.urlopen(transcript_uri) as json_data:
                     d = json.load(json_data)
                     confidences = []
                     for item in d['results']['items']:
@@ -1368,6 +1787,19 @@ class Recognizer(AudioSource):
 
         Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the key isn't valid, or if there is no internet connection.
         """
+        request = self._ibm_request(audio_data, key, language)
+        response_text = self._send_recognition_request(request)
+        return self._ibm_result(response_text, show_all)
+
+    async def recognize_ibm_async(self, audio_data, key, language="en-US", show_all=False):
+        """
+        Async counterpart of ``recognizer_instance.recognize_ibm``, which takes the same parameters and returns the same results, but converts the audio in the event loop's default executor and sends the request with non-blocking I/O on the running event loop using ``recognizer_instance.async_transport``.
+        """
+        request = await asyncio.get_running_loop().run_in_executor(None, self._ibm_request, audio_data, key, language)
+        response_text = await self._send_recognition_request_async(request)
+        return self._ibm_result(response_text, show_all)
+
+    def _ibm_request(self, audio_data, key, language):
         assert isinstance(audio_data, AudioData), "Data must be audio data"
         assert isinstance(key, str), "``key`` must be a string"
 
@@ -1384,13 +1816,9 @@ class Recognizer(AudioSource):
         password = key
         authorization_value = base64.standard_b64encode("{}:{}".format(username, password).encode("utf-8")).decode("utf-8")
         request.add_header("Authorization", "Basic {}".format(authorization_value))
-        try:
-            response = urlopen(request, timeout=self.operation_timeout)
-        except HTTPError as e:
-            raise RequestError("recognition request failed: {}".format(e.reason))
-        except URLError as e:
-            raise RequestError("recognition connection failed: {}".format(e.reason))
-        response_text = response.read().decode("utf-8")
+        return request
+
+    def _ibm_result(self, response_text, show_all):
         result = json.loads(response_text)
 
         # return results
@@ -1,27 +1,44 @@
-import aifc
-import audioop
+import collections
 import io
 import os
 import platform
 import stat
 import subprocess
 import sys
+import threading
 import wave
 
+from . import flac
+
+try:
+    import audioop
+except ImportError:  # removed from the standard library in Python 3.13; use the pure Python version from pydub
+    from pydub import pyaudioop as audioop
+
+try:
+    import aifc
+except ImportError:  # removed from the standard library in Python 3.13, so AIFF data can't be written
+    aifc = None
+
 
 class AudioData(object):
     """
     Creates a new ``AudioData`` instance, which represents mono audio data.
 
-    The raw audio data is specified by ``frame_data``, which is a sequence of bytes representing audio samples. This is the frame data structure used by the PCM WAV format.
+    The raw audio data is specified by ``frame_data``, which is a sequence of bytes representing audio samples. This is the frame data structure used by the PCM WAV format. It is usually ``bytes``, but may be a read-only ``memoryview`` (``recognizer_instance.record`` returns one for memory-mapped ``AudioFile`` instances); pickling or copying an instance converts a ``memoryview`` to ``bytes``.
 
     The width of each sample, in bytes, is specified by ``sample_width``. Each group of ``sample_width`` bytes represents a single audio sample.
 
     The audio data is assumed to have a sample rate of ``sample_rate`` samples per second (Hertz).
 
     Usually, instances of this class are obtained from ``recognizer_instance.record`` or ``recognizer_instance.listen``, or in the callback for ``recognizer_instance.listen_in_background``, rather than instantiating them directly.
+
+    Converted audio returned by the ``get_*_data`` methods is cached per instance, so repeated calls with the same arguments don't redo the conversion. The cache is bounded by ``conversion_cache_size`` bytes, and is discarded whenever ``frame_data`` is replaced. ``frame_data`` itself should not be modified in place.
     """
 
+    flac_encoder = "auto"  # default FLAC encoder for ``get_flac_data``: "builtin", "binary" or "auto"
+    conversion_cache_size = 16 * 1024 * 1024  # maximum total size of the cached conversions of each instance, in bytes; 0 disables the cache
+
     def __init__(self, frame_data, sample_rate, sample_width):
         assert sample_rate > 0, "Sample rate must be a positive integer"
         assert (
@@ -30,6 +47,23 @@ class AudioData(object):
         self.frame_data = frame_data
         self.sample_rate = sample_rate
         self.sample_width = int(sample_width)
+        self._conversion_cache = _ConversionCache()
+
+    def _get_cached_conversion(self, key):
+        return self._conversion_cache.get(self.frame_data, key)
+
+    def _cache_conversion(self, key, data):
+        if data is not self.frame_data:  # unconverted audio is already stored in ``frame_data``
+            self._conversion_cache.put(
+                self.frame_data, key, data, self.conversion_cache_size
+            )
+        return data
+
+    def __getstate__(self):  # memoryviews can't be pickled
+        state = self.__dict__.copy()
+        if isinstance(self.frame_data, memoryview):
+            state["frame_data"] = self.frame_data.tobytes()
+        return state
 
     def get_segment(self, start_ms=None, end_ms=None):
         """
@@ -78,6 +112,11 @@ class AudioData(object):
             convert_width % 1 == 0 and 1 <= convert_width <= 4
         ), "Sample width to convert to must be between 1 and 4 inclusive"
 
+        cache_key = ("raw", convert_rate, convert_width)
+        raw_data = self._get_cached_conversion(cache_key)
+        if raw_data is not None:
+            return raw_data
+
         raw_data = self.frame_data
 
         # make sure unsigned 8-bit audio (which uses unsigned samples) is handled like higher sample width audio (which uses signed samples)
@@ -131,7 +170,7 @@ class AudioData(object):
                 raw_data, 1, 128
             )  # add 128 to every sample to make them act like unsigned samples again
 
-        return raw_data
+        return self._cache_conversion(cache_key, raw_data)
 
     def get_wav_data(self, convert_rate=None, convert_width=None):
         """
@@ -143,6 +182,11 @@ class AudioData(object):
 
         Writing these bytes directly to a file results in a valid `WAV file <https://en.wikipedia.org/wiki/WAV>`__.
         """
+        cache_key = ("wav", convert_rate, convert_width)
+        wav_data = self._get_cached_conversion(cache_key)
+        if wav_data is not None:
+            return wav_data
+
         raw_data = self.get_raw_data(convert_rate, convert_width)
         sample_rate = (
             self.sample_rate if convert_rate is None else convert_rate
@@ -162,7 +206,7 @@ class AudioData(object):
                 wav_data = wav_file.getvalue()
             finally:  # make sure resources are cleaned up
                 wav_writer.close()
-        return wav_data
+        return self._cache_conversion(cache_key, wav_data)
 
     def get_aiff_data(self, convert_rate=None, convert_width=None):
         """
@@ -173,7 +217,16 @@ class AudioData(object):
         If ``convert_rate`` is specified and the audio sample rate is not ``convert_rate`` Hz, the resulting audio is resampled to match.
 
         Writing these bytes directly to a file results in a valid `AIFF-C file <https://en.wikipedia.org/wiki/Audio_Interchange_File_Format>`__.
+
+        Raises a ``RuntimeError`` on Python 3.13 and later, where the ``aifc`` module was removed from the standard library.
         """
+        if aifc is None:
+            raise RuntimeError("AIFF data can't be written without the aifc module, which was removed from the standard library in Python 3.13")
+        cache_key = ("aiff", convert_rate, convert_width)
+        aiff_data = self._get_cached_conversion(cache_key)
+        if aiff_data is not None:
+            return aiff_data
+
         raw_data = self.get_raw_data(convert_rate, convert_width)
         sample_rate = (
             self.sample_rate if convert_rate is None else convert_rate
@@ -204,9 +257,9 @@ class AudioData(object):
                 aiff_data = aiff_file.getvalue()
             finally:  # make sure resources are cleaned up
                 aiff_writer.close()
-        return aiff_data
+        return self._cache_conversion(cache_key, aiff_data)
 
-    def get_flac_data(self, convert_rate=None, convert_width=None):
+    def get_flac_data(self, convert_rate=None, convert_width=None, encoder=None):
         """
         Returns a byte string representing the contents of a FLAC file containing the audio represented by the ``AudioData`` instance.
 
@@ -216,17 +269,56 @@ class AudioData(object):
 
         If ``convert_width`` is specified and the audio samples are not ``convert_width`` bytes each, the resulting audio is converted to match.
 
+        The FLAC data is produced by ``encoder``: ``"builtin"`` encodes it in-process (see ``speech_recognition.flac``), ``"binary"`` runs the FLAC command line tool, and ``"auto"`` uses the in-process encoder if NumPy is installed, the FLAC command line tool otherwise, and the in-process encoder if that tool isn't available either. If not specified, ``encoder`` defaults to ``AudioData.flac_encoder``, which is ``"auto"``. Raises an ``OSError`` if the FLAC command line tool fails.
+
         Writing these bytes directly to a file results in a valid `FLAC file <https://en.wikipedia.org/wiki/FLAC>`__.
         """
         assert convert_width is None or (
             convert_width % 1 == 0 and 1 <= convert_width <= 3
         ), "Sample width to convert to must be between 1 and 3 inclusive"
+        if encoder is None:
+            encoder = self.flac_encoder
+        assert encoder in (
+            "auto",
+            "builtin",
+            "binary",
+        ), "``encoder`` must be one of \"auto\", \"builtin\" or \"binary\""
 
         if (
             self.sample_width > 3 and convert_width is None
         ):  # resulting WAV data would be 32-bit, which is not convertable to FLAC using our encoder
             convert_width = 3  # the largest supported sample width is 24-bit, so we'll limit the sample width to that
 
+        if encoder == "auto":
+            if flac.HAS_NUMPY:
+                encoder = "builtin"
+            else:
+                try:
+                    get_flac_converter()
+                except OSError:  # no FLAC converter available for this system
+                    encoder = "builtin"
+                else:
+                    encoder = "binary"
+
+        cache_key = ("flac", convert_rate, convert_width, encoder)
+        flac_data = self._get_cached_conversion(cache_key)
+        if flac_data is not None:
+            return flac_data
+
+        if encoder == "builtin":
+            sample_width = (
+                self.sample_width if convert_width is None else convert_width
+            )
+            raw_data = self.get_raw_data(
+                convert_rate, sample_width
+            )  # always pass the sample width, so that 8-bit audio is returned with unsigned samples
+            sample_rate = (
+                self.sample_rate if convert_rate is None else convert_rate
+            )
+            return self._cache_conversion(
+                cache_key, flac.encode_flac(raw_data, sample_rate, sample_width)
+            )
+
         # run the FLAC converter with the WAV data to get the FLAC data
         wav_data = self.get_wav_data(convert_rate, convert_width)
         flac_converter = get_flac_converter()
@@ -255,7 +347,54 @@ class AudioData(object):
             startupinfo=startup_info,
         )
         flac_data, stderr = process.communicate(wav_data)
-        return flac_data
+        if process.returncode != 0:  # the output of a failed conversion must not be cached
+            raise OSError(
+                "FLAC conversion failed with exit code {}".format(process.returncode)
+            )
+        return self._cache_conversion(cache_key, flac_data)
+
+
+class _ConversionCache(object):
+    """Least recently used cache of the converted audio of an ``AudioData`` instance, bounded by the total size of the cached byte strings."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.source = None  # the frame data the cached conversions were made from
+
+    def _check_source(self, source):
+        if source is not self.source:  # the frame data was replaced, so everything cached so far is stale
+            self.entries.clear()
+            self.size = 0
+            self.source = source
+
+    def get(self, source, key):
+        with self.lock:
+            self._check_source(source)
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, source, key, data, max_size):
+        with self.lock:
+            self._check_source(source)
+            if len(data) > max_size:  # too large to cache at all
+                return
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > max_size:  # evict the least recently used conversions until we're within budget
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __getstate__(self):  # locks can't be pickled, and the cached conversions can be recomputed
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
 
 
 def get_flac_converter():
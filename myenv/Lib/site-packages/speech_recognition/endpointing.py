@@ -0,0 +1,115 @@
+"""
+Endpointers decide when a phrase being recorded by ``Recognizer.listen`` has ended.
+
+By default, ``Recognizer.listen`` ends a phrase after ``recognizer_instance.pause_threshold`` seconds of audio with an energy below ``recognizer_instance.energy_threshold``. Setting ``recognizer_instance.endpointer`` to an endpointer replaces that decision. An endpointer is any object with these methods:
+
+* ``reset(recognizer, source)``, called when a phrase starts, with the ``Recognizer`` and ``AudioSource`` instances being used.
+* ``is_speech(buffer)``, called for every buffer of the phrase, returning whether the buffer contains speech.
+* ``is_end_of_phrase(pause_duration)``, called after every buffer with the number of seconds of non-speech at the end of the phrase so far, returning whether the phrase has ended.
+"""
+
+import collections
+import math
+
+try:
+    import audioop
+except ImportError:  # removed from the standard library in Python 3.13; use the pure Python version from pydub
+    from pydub import pyaudioop as audioop
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, spectral flatness isn't used without it
+    np = None
+
+
+class AdaptiveEndpointer(object):
+    """
+    Endpointer that combines energy, zero-crossing rate and spectral flatness to classify buffers, and adapts the pause that ends a phrase to the speaker's observed pauses between words.
+
+    A buffer is voiced speech if its energy is above ``recognizer_instance.energy_threshold`` and it isn't noise-like, meaning its spectral flatness (0 for a pure tone, 1 for white noise) is at most ``max_flatness``. It is unvoiced speech (like "s" or "f" sounds) if its energy is above ``unvoiced_energy_ratio`` times the energy threshold and it has at least ``min_unvoiced_crossing_rate`` zero crossings per second. Spectral flatness is only computed if NumPy is installed, and for audio with a sample width of 1, 2 or 4 bytes.
+
+    The pause that ends a phrase is ``gap_multiplier`` times the ``gap_percentile`` quantile (the 90th percentile by default) of the last ``gap_history`` pauses seen between words, limited to between ``min_pause`` seconds and ``max_pause`` seconds. ``max_pause`` defaults to ``recognizer_instance.pause_threshold``, which is also used until at least ``min_gap_count`` pauses between words have been seen. The pause history is kept across phrases.
+
+    ``trailing_silence_probability``, if specified, is a function that is called with the endpointer and the current pause duration in seconds after every non-speech buffer, and returns the probability that the speaker has finished. The phrase then also ends once that probability reaches ``end_probability``. The features of the last buffer are available as ``endpointer_instance.energy``, ``endpointer_instance.crossing_rate`` and ``endpointer_instance.flatness`` (``None`` when not computed).
+    """
+    def __init__(self, min_pause=0.25, max_pause=None, gap_multiplier=1.5, gap_percentile=0.9, gap_history=20, min_gap_count=3, max_flatness=0.5, unvoiced_energy_ratio=0.5, min_unvoiced_crossing_rate=3000, trailing_silence_probability=None, end_probability=0.8):
+        assert min_pause >= 0, "``min_pause`` must be a non-negative number"
+        assert max_pause is None or max_pause >= min_pause, "``max_pause`` must be ``None`` or at least ``min_pause``"
+        assert gap_multiplier > 0, "``gap_multiplier`` must be a positive number"
+        assert 0 <= gap_percentile <= 1, "``gap_percentile`` must be between 0 and 1 inclusive"
+        assert trailing_silence_probability is None or callable(trailing_silence_probability), "``trailing_silence_probability`` must be ``None`` or a function"
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self.gap_multiplier = gap_multiplier
+        self.gap_percentile = gap_percentile
+        self.min_gap_count = min_gap_count
+        self.max_flatness = max_flatness
+        self.unvoiced_energy_ratio = unvoiced_energy_ratio
+        self.min_unvoiced_crossing_rate = min_unvoiced_crossing_rate
+        self.trailing_silence_probability = trailing_silence_probability
+        self.end_probability = end_probability
+        self.gaps = collections.deque(maxlen=gap_history)  # durations of the most recent pauses between words, in seconds
+
+        self.energy = self.crossing_rate = self.flatness = None
+        self.recognizer = None
+        self.sample_rate, self.sample_width = None, None
+        self._pause_buffer_count = 0
+        self._pause_duration = 0.0
+
+    def reset(self, recognizer, source):
+        self.recognizer = recognizer
+        self.sample_rate, self.sample_width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        self._pause_buffer_count = 0
+        self._pause_duration = 0.0
+
+    def pause_limit(self):
+        """Returns the number of seconds of non-speech that currently ends a phrase."""
+        max_pause = self.recognizer.pause_threshold if self.max_pause is None else self.max_pause
+        if len(self.gaps) < self.min_gap_count:
+            return max_pause
+        gaps = sorted(self.gaps)
+        long_gap = gaps[min(len(gaps) - 1, int(self.gap_percentile * len(gaps)))]  # pauses longer than this are rare between words
+        return min(max_pause, max(self.min_pause, self.gap_multiplier * long_gap))
+
+    def is_speech(self, buffer):
+        sample_count = len(buffer) // self.sample_width
+        if sample_count == 0:
+            return False
+        buffer_duration = float(sample_count) / self.sample_rate
+        self.energy = audioop.rms(buffer, self.sample_width)
+        self.crossing_rate = audioop.cross(buffer, self.sample_width) / buffer_duration
+        self.flatness = spectral_flatness(buffer, self.sample_width)
+
+        threshold = self.recognizer.energy_threshold
+        voiced = self.energy > threshold and (self.flatness is None or self.flatness <= self.max_flatness)
+        unvoiced = self.energy > threshold * self.unvoiced_energy_ratio and self.crossing_rate >= self.min_unvoiced_crossing_rate
+        speaking = voiced or unvoiced
+
+        if speaking:
+            if 0 < self._pause_duration < self.pause_limit():  # the speaker resumed after a pause between words
+                self.gaps.append(self._pause_duration)
+            self._pause_buffer_count = 0
+        else:
+            self._pause_buffer_count += 1
+        self._pause_duration = self._pause_buffer_count * buffer_duration
+        return speaking
+
+    def is_end_of_phrase(self, pause_duration):
+        if pause_duration <= 0:
+            return False
+        if pause_duration >= self.pause_limit():
+            return True
+        if self.trailing_silence_probability is not None:
+            return self.trailing_silence_probability(self, pause_duration) >= self.end_probability
+        return False
+
+
+def spectral_flatness(buffer, sample_width):
+    """Returns the spectral flatness of the audio samples in ``buffer``, between 0 (tonal) and 1 (noise-like), or ``None`` if it can't be computed (NumPy isn't installed, or the sample width is 3)."""
+    if np is None or sample_width not in (1, 2, 4):
+        return None
+    samples = np.frombuffer(buffer[:len(buffer) - len(buffer) % sample_width], dtype="<i{}".format(sample_width)).astype(np.float64)
+    if len(samples) < 2:
+        return None
+    power = np.abs(np.fft.rfft(samples * np.hanning(len(samples)))) ** 2 + 1e-10
+    return float(math.exp(np.mean(np.log(power))) / np.mean(power))
@@ -0,0 +1,238 @@
+"""In-process FLAC encoder, used by ``AudioData.get_flac_data`` to avoid running the FLAC command line tool for every conversion."""
+
+import hashlib
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python code path is used without it
+    np = None
+
+HAS_NUMPY = np is not None  # whether encoding is vectorized, and therefore much faster than running the FLAC command line tool
+BLOCK_SIZE = 4096  # samples per FLAC frame
+MAX_FIXED_ORDER = 4  # highest order of the fixed linear predictors defined by the FLAC format
+MAX_RICE_PARAMETER = 14  # largest Rice parameter that fits in a 4-bit partition header (15 is the escape code)
+
+_SAMPLE_SIZE_CODES = {8: 0b001, 16: 0b100, 24: 0b110}  # frame header codes for the supported bits per sample
+
+
+def _crc_table(polynomial, width):
+    top_bit, mask = 1 << (width - 1), (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) if crc & top_bit else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+
+_CRC8_TABLE = _crc_table(0x07, 8)
+_CRC16_TABLE = _crc_table(0x8005, 16)
+
+
+def _crc8(data):
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def _crc16(data):
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+class _BitWriter(object):
+    """Accumulates big-endian bit fields into a byte string."""
+    def __init__(self):
+        self.value = 0
+        self.length = 0
+
+    def write(self, value, width):
+        self.value = (self.value << width) | (value & ((1 << width) - 1))
+        self.length += width
+
+    def getvalue(self):
+        padding = -self.length % 8  # frames and subframes are zero-padded to a byte boundary
+        return (self.value << padding).to_bytes((self.length + padding) // 8, "big")
+
+
+def _utf8_number(number):
+    """Returns ``number`` coded like a UTF-8 character, as FLAC frame headers store frame numbers."""
+    if number < 0x80:
+        return bytes([number])
+    continuation = []
+    while True:
+        continuation.insert(0, 0x80 | (number & 0x3F))
+        number >>= 6
+        size = len(continuation) + 1
+        if number < (1 << (7 - size)):  # fits in the first byte after the ``size`` leading ones
+            return bytes([((0xFF << (8 - size)) & 0xFF) | number] + continuation)
+
+
+def _decode_samples(raw_data, sample_width):
+    """Returns the signed samples of little-endian ``raw_data`` (8-bit samples are unsigned, as in WAV files)."""
+    if np is not None:
+        if sample_width == 1:
+            return np.frombuffer(raw_data, dtype=np.uint8).astype(np.int64) - 128
+        if sample_width == 2:
+            return np.frombuffer(raw_data, dtype="<i2").astype(np.int64)
+        padded = np.zeros((len(raw_data) // 3, 4), dtype=np.uint8)  # 24-bit: widen to 32-bit and shift the sign back in
+        padded[:, 1:] = np.frombuffer(raw_data, dtype=np.uint8).reshape(-1, 3)
+        return padded.view("<i4").reshape(-1).astype(np.int64) >> 8
+    if sample_width == 1:
+        return [sample - 128 for sample in raw_data]
+    if sample_width == 2:
+        return list(struct.unpack("<{}h".format(len(raw_data) // 2), raw_data))
+    return [int.from_bytes(raw_data[i:i + 3], "little", signed=True) for i in range(0, len(raw_data), 3)]
+
+
+def _fixed_residuals(block, order):
+    """Returns the residuals of the FLAC fixed predictor of the given order, i.e. the ``order``-th differences of ``block``."""
+    if np is not None:
+        return np.diff(block, n=order) if order else block
+    residuals = block
+    for _ in range(order):
+        residuals = [b - a for a, b in zip(residuals, residuals[1:])]
+    return residuals
+
+
+def _rice_code(residuals):
+    """Returns ``(parameter, bit_count, bits_value)`` for the Rice coding of ``residuals`` with the cheapest parameter."""
+    if np is not None:
+        folded = (residuals << 1) ^ (residuals >> 63)  # zigzag: 0, -1, 1, -2, ... -> 0, 1, 2, 3, ...
+        count = len(folded)
+        costs = [int(np.sum(folded >> k)) + count * (k + 1) for k in range(MAX_RICE_PARAMETER + 1)]
+        parameter = min(range(len(costs)), key=costs.__getitem__)
+        quotients = folded >> parameter
+        lengths = quotients + 1 + parameter
+        ends = np.cumsum(lengths)
+        bits = np.zeros(int(ends[-1]), dtype=np.uint8)
+        stop_bits = ends - parameter - 1
+        bits[stop_bits] = 1  # each unary quotient is a run of zeros terminated by a one
+        for i in range(parameter):  # followed by the ``parameter`` low bits, most significant first
+            bits[stop_bits + 1 + i] = (folded >> (parameter - 1 - i)) & 1
+        packed = np.packbits(bits).tobytes()
+        return parameter, len(bits), int.from_bytes(packed, "big") >> (-len(bits) % 8)
+
+    folded = [(r << 1) if r >= 0 else ((-r << 1) - 1) for r in residuals]
+    count = len(folded)
+    estimate = max(0, min(MAX_RICE_PARAMETER, (sum(folded) // max(count, 1)).bit_length() - 1))
+    costs = {
+        k: sum(value >> k for value in folded) + count * (k + 1)
+        for k in range(max(0, estimate - 1), min(MAX_RICE_PARAMETER, estimate + 1) + 1)
+    }
+    parameter = min(costs, key=costs.__getitem__)
+    low_bits_format = "0{}b".format(parameter)
+    mask = (1 << parameter) - 1
+    bit_string = "".join(
+        "0" * (value >> parameter) + "1" + (format(value & mask, low_bits_format) if parameter else "")
+        for value in folded
+    )
+    return parameter, len(bit_string), int(bit_string, 2)
+
+
+def _encode_subframe(writer, block, bits_per_sample):
+    """Writes the cheapest of a CONSTANT, FIXED or VERBATIM subframe for ``block``."""
+    first = int(block[0])
+    is_constant = bool((block == first).all()) if np is not None else all(sample == first for sample in block)
+    if is_constant:
+        writer.write(0b00000000, 8)  # zero padding bit, CONSTANT subframe type, no wasted bits
+        writer.write(first, bits_per_sample)
+        return
+
+    # low-order bits that are zero in every sample (e.g., audio widened from a lower sample width) don't need to be stored
+    if np is not None:
+        all_bits = int(np.bitwise_or.reduce(block))
+    else:
+        all_bits = 0
+        for sample in block:
+            all_bits |= sample
+    wasted_bits = (all_bits & -all_bits).bit_length() - 1
+    if wasted_bits:
+        block = block >> wasted_bits if np is not None else [sample >> wasted_bits for sample in block]
+        bits_per_sample -= wasted_bits
+
+    # pick the fixed predictor with the smallest residuals
+    best_order, best_magnitude = 0, None
+    for order in range(min(MAX_FIXED_ORDER, len(block) - 1) + 1):
+        residuals = _fixed_residuals(block, order)
+        magnitude = int(np.abs(residuals).sum()) if np is not None else sum(abs(r) for r in residuals)
+        if best_magnitude is None or magnitude < best_magnitude:
+            best_order, best_magnitude = order, magnitude
+
+    parameter, bit_count, bits_value = _rice_code(_fixed_residuals(block, best_order))
+    fixed_size = best_order * bits_per_sample + 2 + 4 + 4 + bit_count
+    if fixed_size >= len(block) * bits_per_sample:  # incompressible audio, store it as-is
+        subframe_type = 0b000001  # VERBATIM
+    else:
+        subframe_type = 0b001000 | best_order  # FIXED, with the predictor order
+
+    writer.write(subframe_type << 1 | (1 if wasted_bits else 0), 8)  # zero padding bit, subframe type, wasted bits flag
+    if wasted_bits:
+        writer.write(1, wasted_bits)  # number of wasted bits in unary: ``wasted_bits - 1`` zeros and a one
+
+    if subframe_type == 0b000001:
+        for sample in block:
+            writer.write(int(sample), bits_per_sample)
+        return
+
+    for sample in block[:best_order]:  # warm-up samples
+        writer.write(int(sample), bits_per_sample)
+    writer.write(0b00, 2)  # residual coding method: Rice with 4-bit parameters
+    writer.write(0, 4)  # partition order 0: a single partition
+    writer.write(parameter, 4)
+    writer.write(bits_value, bit_count)
+
+
+def _encode_frame(frame_number, block, bits_per_sample):
+    header = bytearray(b"\xFF\xF8")  # sync code, fixed block size stream
+    header.append((0b0111 << 4) | 0b0000)  # block size stored as a 16-bit number after the frame number, sample rate from STREAMINFO
+    header.append((0b0000 << 4) | (_SAMPLE_SIZE_CODES[bits_per_sample] << 1))  # mono
+    header += _utf8_number(frame_number)
+    header += struct.pack(">H", len(block) - 1)
+    header.append(_crc8(header))
+
+    writer = _BitWriter()
+    _encode_subframe(writer, block, bits_per_sample)
+    frame = bytes(header) + writer.getvalue()
+    return frame + struct.pack(">H", _crc16(frame))
+
+
+def encode_flac(raw_data, sample_rate, sample_width):
+    """
+    Returns a byte string representing the contents of a mono FLAC file for the audio samples in ``raw_data``.
+
+    ``raw_data`` is little-endian PCM audio in the same format as ``AudioData.get_raw_data``, with ``sample_width`` bytes per sample (1 to 3 inclusive; 8-bit samples are unsigned) and ``sample_rate`` samples per second.
+
+    Audio is compressed using FLAC's fixed linear predictors and Rice coding. NumPy is used to speed up encoding if it is installed.
+    """
+    assert 1 <= sample_width <= 3, "Sample width must be between 1 and 3 inclusive"
+    assert 0 < sample_rate < (1 << 20), "Sample rate must be a positive integer less than 2**20"
+    bits_per_sample = sample_width * 8
+    samples = _decode_samples(raw_data[:len(raw_data) - len(raw_data) % sample_width], sample_width)
+    sample_count = len(samples)
+
+    frames = [
+        _encode_frame(frame_number, samples[start:start + BLOCK_SIZE], bits_per_sample)
+        for frame_number, start in enumerate(range(0, sample_count, BLOCK_SIZE))
+    ]
+
+    # the MD5 signature is computed over the signed samples, in little-endian order
+    if sample_width == 1:
+        signed_data = bytes((sample - 128) & 0xFF for sample in raw_data) if np is None else (np.frombuffer(raw_data, dtype=np.uint8) ^ 0x80).tobytes()
+    else:
+        signed_data = raw_data[:sample_count * sample_width]
+
+    block_size = BLOCK_SIZE if sample_count > BLOCK_SIZE else max(16, sample_count)  # the shorter last block doesn't count towards the minimum block size
+    frame_sizes = [len(frame) for frame in frames] or [0]
+    stream_info = struct.pack(">HH", block_size, block_size)
+    stream_info += min(frame_sizes).to_bytes(3, "big") + max(frame_sizes).to_bytes(3, "big")
+    stream_info += ((sample_rate << 44) | (0 << 41) | ((bits_per_sample - 1) << 36) | sample_count).to_bytes(8, "big")  # sample rate, channels - 1, bits per sample - 1, total samples
+    stream_info += hashlib.md5(signed_data).digest()
+
+    metadata_block_header = bytes([0x80 | 0]) + len(stream_info).to_bytes(3, "big")  # last metadata block, STREAMINFO
+    return b"fLaC" + metadata_block_header + stream_info + b"".join(frames)
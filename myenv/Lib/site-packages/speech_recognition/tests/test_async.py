@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Tests for the async methods of Recognizer, with fake audio sources and transports"""
+import asyncio
+import io
+import json
+import threading
+import time
+
+import speech_recognition as sr
+
+
+class FakeSource(sr.AudioSource):
+    def __init__(self):
+        self.is_open = False
+
+    def __enter__(self):
+        self.is_open = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.is_open = False
+
+
+def test_listen_async_keeps_the_source_open_while_listening():
+    source = FakeSource()
+    recognizer = sr.Recognizer()
+    calls = []
+
+    def listen(s, timeout, phrase_time_limit):
+        calls.append(s.is_open)
+        time.sleep(0.2)
+        calls.append(s.is_open)
+        if len(calls) == 2:
+            return sr.AudioData(b"\x00\x00", 16000, 2)
+        raise sr.WaitTimeoutError("listening timed out")
+    recognizer.listen = listen
+
+    async def consume():
+        async for audio in recognizer.listen_async(source):
+            consumed.append(audio)
+
+    async def main():
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.3)  # cancelled during the second call to listen
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return source.is_open
+
+    consumed = []
+    assert asyncio.run(main()) is False
+    assert len(consumed) == 1
+    assert calls == [True, True, True, True]
+
+
+class FakeAsyncTransport(object):
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    async def urlopen(self, request, timeout=None):
+        self.requests.append(request)
+        return io.BytesIO(self.response)
+
+
+def test_recognize_google_async_converts_audio_off_the_event_loop():
+    result = {"result": [{"alternative": [{"transcript": "hello world", "confidence": 0.9}], "final": True}], "result_index": 0}
+    recognizer = sr.Recognizer()
+    recognizer.async_transport = FakeAsyncTransport(json.dumps(result).encode("utf-8"))
+    threads = []
+    google_request = recognizer._google_request
+
+    def recorded_google_request(*args):
+        threads.append(threading.current_thread())
+        return google_request(*args)
+    recognizer._google_request = recorded_google_request
+
+    audio = sr.AudioData(b"\x00\x01" * 16000, 16000, 2)
+    assert asyncio.run(recognizer.recognize_google_async(audio)) == "hello world"
+    assert threads and threads[0] is not threading.main_thread()
+    assert recognizer.async_transport.requests[0].data[:4] == b"fLaC"
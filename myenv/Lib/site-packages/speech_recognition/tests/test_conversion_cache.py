@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Tests for the per-instance cache of converted audio"""
+import os
+import pickle
+import stat
+
+import pytest
+
+from speech_recognition import AudioData, audio
+from speech_recognition.audio import _ConversionCache
+
+SOURCE = b"frames"
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = _ConversionCache()
+    for key in "abc":
+        cache.put(SOURCE, key, key.encode() * 10, 30)
+    assert cache.get(SOURCE, "a") == b"a" * 10  # "b" is now the least recently used
+    cache.put(SOURCE, "d", b"d" * 10, 30)
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.get(SOURCE, "b") is None
+
+
+def test_total_size_stays_within_the_budget():
+    cache = _ConversionCache()
+    cache.put(SOURCE, "a", b"a" * 10, 25)
+    cache.put(SOURCE, "b", b"b" * 10, 25)
+    cache.put(SOURCE, "a", b"a" * 5, 25)  # replacing an entry accounts for the old one
+    assert cache.size == 15
+    cache.put(SOURCE, "c", b"c" * 20, 25)
+    assert list(cache.entries) == ["a", "c"] and cache.size == 25  # only "b" had to go
+
+
+def test_entries_larger_than_the_budget_are_skipped():
+    cache = _ConversionCache()
+    cache.put(SOURCE, "a", b"a" * 10, 20)
+    cache.put(SOURCE, "b", b"b" * 21, 20)
+    assert cache.get(SOURCE, "b") is None
+    assert cache.get(SOURCE, "a") == b"a" * 10  # nothing was evicted for it
+    cache.put(SOURCE, "c", b"c", 0)
+    assert cache.get(SOURCE, "c") is None
+
+
+def test_replacing_frame_data_invalidates_the_cache():
+    audio_data = AudioData(b"\x00\x01" * 800, 16000, 2)
+    wav_data = audio_data.get_wav_data()
+    assert audio_data.get_wav_data() is wav_data
+    audio_data.frame_data = b"\x02\x03" * 800
+    assert audio_data.get_wav_data() is not wav_data
+    assert audio_data.get_wav_data().endswith(b"\x02\x03" * 800)
+    assert audio_data._conversion_cache.size == len(audio_data.get_wav_data())
+
+
+def test_pickling_drops_the_cached_conversions():
+    audio_data = AudioData(b"\x00\x01" * 800, 16000, 2)
+    wav_data = audio_data.get_wav_data()
+    restored = pickle.loads(pickle.dumps(audio_data))
+    assert restored._conversion_cache.size == 0 and not restored._conversion_cache.entries
+    assert restored.get_wav_data() == wav_data
+    assert restored._conversion_cache.size == len(wav_data)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="uses a shell script as the FLAC converter")
+def test_failed_flac_conversions_raise_and_are_not_cached(tmp_path, monkeypatch):
+    converter = tmp_path / "flac"
+    converter.write_text("#!/bin/sh\ncat > /dev/null\nprintf partial\nexit 3\n")
+    converter.chmod(converter.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(audio, "get_flac_converter", lambda: str(converter))
+    audio_data = AudioData(b"\x00\x01" * 800, 16000, 2)
+    with pytest.raises(OSError, match="exit code 3"):
+        audio_data.get_flac_data(encoder="binary")
+    assert not any(key[0] == "flac" for key in audio_data._conversion_cache.entries)
+
+    converter.write_text("#!/bin/sh\ncat > /dev/null\nprintf fLaC\n")
+    assert audio_data.get_flac_data(encoder="binary") == b"fLaC"
+    assert audio_data.get_flac_data(encoder="binary") is audio_data.get_flac_data(encoder="binary")
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Tests for the adaptive endpointer and how Recognizer.listen uses endpointers"""
+import array
+import io
+import math
+import random
+
+import pytest
+
+import speech_recognition as sr
+from speech_recognition import endpointing
+
+SAMPLE_RATE = 16000
+CHUNK = 1024  # 64 ms buffers
+
+BACKENDS = ["numpy", "python"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(endpointing, "np", None)
+    return request.param
+
+
+def tone(amplitude, seconds=CHUNK / SAMPLE_RATE, frequency=200):
+    return array.array("h", (int(amplitude * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+                             for i in range(int(seconds * SAMPLE_RATE)))).tobytes()
+
+
+def noise(amplitude, seconds=CHUNK / SAMPLE_RATE, seed=0):
+    rng = random.Random(seed)
+    return array.array("h", (rng.randint(-amplitude, amplitude) for _ in range(int(seconds * SAMPLE_RATE)))).tobytes()
+
+
+def silence(seconds=CHUNK / SAMPLE_RATE):
+    return b"\x00\x00" * int(seconds * SAMPLE_RATE)
+
+
+class FakeStream(object):
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def read(self, size):
+        return self.data.read(size * 2)
+
+
+class FakeMicrophone(sr.AudioSource):
+    CHUNK = CHUNK
+    SAMPLE_RATE = SAMPLE_RATE
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, data):
+        self.stream = FakeStream(data)
+
+
+def make_recognizer():
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 1000
+    recognizer.dynamic_energy_threshold = False
+    return recognizer
+
+
+def started_endpointer(**kwargs):
+    endpointer = endpointing.AdaptiveEndpointer(**kwargs)
+    endpointer.reset(make_recognizer(), FakeMicrophone(b""))
+    return endpointer
+
+
+def test_features(backend):
+    endpointer = started_endpointer()
+    assert endpointer.is_speech(tone(5000))
+    assert endpointer.energy == pytest.approx(5000 / math.sqrt(2), rel=0.02)
+    assert endpointer.crossing_rate == pytest.approx(400, rel=0.1)  # two zero crossings per period
+    if backend == "numpy":
+        assert endpointer.flatness < 0.1  # tonal
+        endpointer.is_speech(noise(5000))
+        assert endpointer.flatness > 0.5  # noise-like
+    else:
+        assert endpointer.flatness is None
+    assert endpointing.spectral_flatness(b"\x00\x00\x00", 3) is None
+    assert not endpointer.is_speech(b"")
+
+
+def test_speech_classification(backend):
+    endpointer = started_endpointer()
+    assert not endpointer.is_speech(tone(1000))  # below the energy threshold
+    assert endpointer.is_speech(noise(1500))  # quieter than voiced speech, but hissing like an "s"
+    assert not endpointer.is_speech(noise(500))  # quiet hiss
+
+    endpointer = started_endpointer(min_unvoiced_crossing_rate=float("inf"))
+    # loud noise is only told apart from voiced speech by its spectral flatness
+    assert endpointer.is_speech(noise(5000)) == (backend == "python")
+
+
+def pause_between_words(endpointer, pause_buffers):
+    endpointer.is_speech(tone(5000))
+    for _ in range(pause_buffers):
+        endpointer.is_speech(silence())
+
+
+def test_pause_limit_adapts_to_pauses_between_words():
+    endpointer = started_endpointer(min_gap_count=3, gap_history=5)
+    assert endpointer.pause_limit() == endpointer.recognizer.pause_threshold == 0.8
+    for _ in range(3):
+        pause_between_words(endpointer, 3)
+    assert endpointer.pause_limit() == 0.8  # the third pause is only recorded when speech resumes
+    endpointer.is_speech(tone(5000))
+    assert list(endpointer.gaps) == [pytest.approx(0.192)] * 3
+    assert endpointer.pause_limit() == pytest.approx(1.5 * 0.192)
+
+    for _ in range(6):  # only the most recent pauses count
+        pause_between_words(endpointer, 2)
+    endpointer.is_speech(tone(5000))
+    assert list(endpointer.gaps) == [pytest.approx(0.128)] * 5
+    assert endpointer.pause_limit() == 0.25  # limited to min_pause
+
+    # the history is kept across phrases, but a pause that ends a phrase isn't a pause between words
+    endpointer.reset(endpointer.recognizer, FakeMicrophone(b""))
+    pause_between_words(endpointer, 20)
+    endpointer.is_speech(tone(5000))
+    assert list(endpointer.gaps) == [pytest.approx(0.128)] * 5
+
+
+def test_end_of_phrase():
+    endpointer = started_endpointer(max_pause=0.5)
+    assert not endpointer.is_end_of_phrase(0)
+    assert not endpointer.is_end_of_phrase(0.49)
+    assert endpointer.is_end_of_phrase(0.5)
+
+
+def test_trailing_silence_hook():
+    calls = []
+
+    def trailing_silence_probability(endpointer, pause_duration):
+        calls.append((endpointer.energy, pause_duration))
+        return pause_duration / 0.4
+
+    endpointer = started_endpointer(trailing_silence_probability=trailing_silence_probability, end_probability=0.8)
+    endpointer.is_speech(silence())
+    assert not endpointer.is_end_of_phrase(0.3)
+    assert endpointer.is_end_of_phrase(0.34)
+    assert calls == [(0, 0.3), (0, 0.34)]
+    assert not endpointer.is_end_of_phrase(0)  # not asked without a pause
+    assert len(calls) == 2
+
+
+def phrase_with_short_pause():
+    """A quiet word and a loud word 0.384 s apart, then a long pause and another word"""
+    return silence(0.256) + tone(5000, 0.512) + silence(0.384) + tone(9000, 0.512) + silence(2.048) + tone(5000, 0.512)
+
+
+def test_listen_without_endpointer():
+    recognizer = make_recognizer()
+    audio = recognizer.listen(FakeMicrophone(phrase_with_short_pause()))
+    assert max(array.array("h", audio.frame_data)) > 8000  # the short pause didn't end the phrase
+
+
+def test_listen_with_endpointer():
+    recognizer = make_recognizer()
+    endpointer = recognizer.endpointer = endpointing.AdaptiveEndpointer(max_pause=0.3)
+    source = FakeMicrophone(phrase_with_short_pause())
+    audio = recognizer.listen(source)
+    assert endpointer.recognizer is recognizer and endpointer.sample_rate == SAMPLE_RATE  # reset when the phrase started
+    samples = array.array("h", audio.frame_data)
+    assert 4000 < max(samples) < 8000  # the phrase ended at the short pause
+    assert max(array.array("h", recognizer.listen(source).frame_data)) > 8000  # the loud word is the next phrase
+
+
+def test_listen_uses_the_endpointers_decisions():
+    class Endpointer(object):
+        def reset(self, recognizer, source):
+            self.buffers = 0
+
+        def is_speech(self, buffer):
+            self.buffers += 1
+            return True
+
+        def is_end_of_phrase(self, pause_duration):
+            return self.buffers == 10  # ends the phrase in the middle of speech
+
+    recognizer = make_recognizer()
+    recognizer.endpointer = Endpointer()
+    audio = recognizer.listen(FakeMicrophone(tone(5000, 5)))
+    assert len(audio.frame_data) == 11 * CHUNK * 2  # the buffer that started the phrase, and 10 more
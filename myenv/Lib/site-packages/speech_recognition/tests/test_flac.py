@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""Round-trip tests for the in-process FLAC encoder"""
+import hashlib
+import math
+import random
+import struct
+import subprocess
+
+import pytest
+
+from speech_recognition import AudioData, flac
+from speech_recognition.audio import get_flac_converter
+
+BACKENDS = ["numpy", "python"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(flac, "np", None)
+    return request.param
+
+
+class BitReader(object):
+    def __init__(self, data):
+        self.data = data
+        self.position = 0  # in bits
+
+    def read(self, width):
+        value = 0
+        for _ in range(width):
+            byte = self.data[self.position >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.position & 7))) & 1)
+            self.position += 1
+        return value
+
+    def read_signed(self, width):
+        value = self.read(width)
+        return value - (1 << width) if value >> (width - 1) else value
+
+    def read_unary(self):
+        count = 0
+        while not self.read(1):
+            count += 1
+        return count
+
+    def align(self):
+        self.position += -self.position % 8
+
+
+def decode_flac(data):
+    """
+    A minimal FLAC decoder for the subset of the format written by the
+    encoder: mono, fixed block size, CONSTANT, VERBATIM and FIXED subframes
+    with a single Rice partition. Checks the CRCs and the MD5 signature, and
+    returns (sample_rate, bits_per_sample, samples).
+    """
+    assert data[:4] == b"fLaC"
+    assert data[4] == 0x80  # last metadata block, STREAMINFO
+    assert int.from_bytes(data[5:8], "big") == 34
+    info = data[8:42]
+    min_block_size, max_block_size = struct.unpack(">HH", info[:4])
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits_per_sample = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & ((1 << 36) - 1)
+    assert channels == 1
+
+    samples = []
+    position = 42
+    frame_number = 0
+    while position < len(data):
+        reader = BitReader(data[position:])
+        assert reader.read(16) == 0xFFF8
+        assert reader.read(4) == 0b0111  # 16-bit block size after the frame number
+        assert reader.read(4) == 0b0000  # sample rate from STREAMINFO
+        assert reader.read(4) == 0b0000  # mono
+        reader.read(3)  # sample size code
+        assert reader.read(1) == 0
+        first = reader.read(8)
+        size = 8 - (first ^ 0xFF).bit_length() if first >= 0xC0 else 1
+        number = first & (0xFF >> (size + 1)) if size > 1 else first
+        for _ in range(size - 1):
+            number = (number << 6) | (reader.read(8) & 0x3F)
+        assert number == frame_number
+        block_size = reader.read(16) + 1
+        assert reader.read(8) == flac._crc8(data[position:position + reader.position // 8 - 1])
+
+        assert reader.read(1) == 0
+        subframe_type = reader.read(6)
+        width = bits_per_sample
+        wasted_bits = 0
+        if reader.read(1):
+            wasted_bits = reader.read_unary() + 1
+            width -= wasted_bits
+        if subframe_type == 0:  # CONSTANT
+            block = [reader.read_signed(width)] * block_size
+        elif subframe_type == 1:  # VERBATIM
+            block = [reader.read_signed(width) for _ in range(block_size)]
+        else:
+            assert subframe_type & 0b111000 == 0b001000  # FIXED
+            order = subframe_type & 0b111
+            block = [reader.read_signed(width) for _ in range(order)]
+            assert reader.read(2) == 0  # Rice coding with 4-bit parameters
+            assert reader.read(4) == 0  # a single partition
+            parameter = reader.read(4)
+            coefficients = {0: [], 1: [1], 2: [2, -1], 3: [3, -3, 1], 4: [4, -6, 4, -1]}[order]
+            for _ in range(block_size - order):
+                folded = (reader.read_unary() << parameter) | reader.read(parameter)
+                residual = (folded >> 1) ^ -(folded & 1)
+                prediction = sum(c * block[-1 - i] for i, c in enumerate(coefficients))
+                block.append(prediction + residual)
+        samples.extend(sample << wasted_bits for sample in block)
+
+        reader.align()
+        end = position + reader.position // 8
+        assert struct.unpack(">H", data[end:end + 2])[0] == flac._crc16(data[position:end])
+        assert min_block_size <= block_size <= max_block_size or end + 2 == len(data)
+        position = end + 2
+        frame_number += 1
+
+    assert len(samples) == total_samples
+    sample_width = bits_per_sample // 8
+    signed_data = b"".join((sample & ((1 << bits_per_sample) - 1)).to_bytes(sample_width, "little") for sample in samples)
+    assert hashlib.md5(signed_data).digest() == info[18:34]
+    return sample_rate, bits_per_sample, samples
+
+
+def pack(samples, sample_width):
+    """Packs signed samples as little-endian PCM (8-bit samples are unsigned)"""
+    if sample_width == 1:
+        return bytes(sample + 128 for sample in samples)
+    return b"".join(sample.to_bytes(sample_width, "little", signed=True) for sample in samples)
+
+
+def signals(sample_width):
+    rng = random.Random(sample_width)
+    maxval = (1 << (8 * sample_width - 1)) - 1
+    sine = [int(maxval * 0.8 * math.sin(i / 7.0)) for i in range(flac.BLOCK_SIZE + 1000)]
+    return {
+        "empty": [],
+        "single sample": [-maxval - 1],
+        "silence": [0] * 5000,
+        "sine": sine,
+        "noise": [rng.randint(-maxval - 1, maxval) for _ in range(3000)],
+        "extremes": [-maxval - 1, maxval] * 600,
+        "wasted bits": [(sample >> 4) << 4 for sample in sine],
+        "one block": sine[:flac.BLOCK_SIZE],
+        "one block and a sample": sine[:flac.BLOCK_SIZE + 1],
+        "constant then sine": [7] * flac.BLOCK_SIZE + sine[:100],
+    }
+
+
+@pytest.mark.parametrize("sample_width", [1, 2, 3])
+def test_round_trip(backend, sample_width):
+    for name, samples in signals(sample_width).items():
+        data = flac.encode_flac(pack(samples, sample_width), 16000, sample_width)
+        assert decode_flac(data) == (16000, 8 * sample_width, samples), name
+
+
+def test_trailing_partial_sample_is_dropped(backend):
+    data = flac.encode_flac(pack([1, -2, 3], 2) + b"\x01", 8000, 2)
+    assert decode_flac(data)[2] == [1, -2, 3]
+
+
+def test_compresses_predictable_audio(backend):
+    samples = signals(2)["sine"]
+    assert len(flac.encode_flac(pack(samples, 2), 16000, 2)) < len(samples)  # half the size of the 16-bit samples
+
+
+def test_get_flac_data_builtin(backend):
+    samples = signals(2)["sine"]
+    audio = AudioData(pack(samples, 2), 16000, 2)
+    assert decode_flac(audio.get_flac_data(encoder="builtin")) == (16000, 16, samples)
+    # converting the audio first gives the same samples as converting the raw data
+    converted = audio.get_raw_data(convert_rate=8000, convert_width=1)
+    assert decode_flac(audio.get_flac_data(convert_rate=8000, convert_width=1, encoder="builtin"))[2] == \
+        [sample - 128 for sample in converted]
+
+
+def _flac_binary():
+    try:
+        converter = get_flac_converter()
+        subprocess.check_output([converter, "--version"])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return converter
+
+
+@pytest.mark.skipif(_flac_binary() is None, reason="the FLAC command line tool can't be run")
+@pytest.mark.parametrize("sample_width", [1, 2, 3])
+def test_decoded_by_flac_binary(backend, sample_width, tmp_path):
+    converter = _flac_binary()
+    for name, samples in signals(sample_width).items():
+        if not samples:
+            continue
+        path = tmp_path / "audio.flac"
+        path.write_bytes(flac.encode_flac(pack(samples, sample_width), 16000, sample_width))
+        subprocess.check_call([converter, "--silent", "--test", str(path)])  # checks the CRCs and MD5 signature
+        decoded = subprocess.check_output([
+            converter, "--silent", "--decode", "--stdout", "--force-raw-format",
+            "--endian=little", "--sign=unsigned" if sample_width == 1 else "--sign=signed", str(path),
+        ])
+        assert decoded == pack(samples, sample_width), name
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Tests for recording from memory-mapped audio files"""
+import array
+import copy
+import pickle
+import wave
+
+import speech_recognition as sr
+
+
+def write_wav(path, frames=16000):
+    samples = array.array("h", ((i * 37) % 20000 - 10000 for i in range(frames)))
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(samples.tobytes())
+    return samples.tobytes()
+
+
+def test_memory_mapped_recordings_can_be_pickled(tmp_path):
+    expected = write_wav(tmp_path / "speech.wav")
+    with sr.AudioFile(str(tmp_path / "speech.wav"), memory_map=True) as source:
+        audio = sr.Recognizer().record(source)
+        assert isinstance(audio.frame_data, memoryview)
+        assert audio.frame_data == expected
+
+        restored = pickle.loads(pickle.dumps(audio))
+        duplicate = copy.deepcopy(audio)
+    for other in (restored, duplicate):
+        assert type(other.frame_data) is bytes and other.frame_data == expected
+        assert (other.sample_rate, other.sample_width) == (16000, 2)
+        assert other.get_raw_data(convert_rate=8000) == audio.get_raw_data(convert_rate=8000)
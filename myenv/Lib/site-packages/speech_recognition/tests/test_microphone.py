@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Tests for the callback mode of Microphone, with a fake PyAudio module"""
+import sys
+import threading
+import types
+
+import pytest
+
+import speech_recognition as sr
+
+PA_CONTINUE, PA_INPUT_OVERFLOW = 0, 2
+
+
+class FakePyAudioStream(object):
+    def __init__(self, stream_callback=None, **kwargs):
+        self.callback = stream_callback
+        self.options = kwargs
+        self.stopped = self.closed = False
+
+    def deliver(self, data, status=0):
+        """Calls the stream callback like PortAudio's thread does"""
+        assert self.callback(data, len(data) // 2, {}, status) == (None, PA_CONTINUE)
+
+    def is_stopped(self):
+        return self.stopped
+
+    def stop_stream(self):
+        self.stopped = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakePyAudio(object):
+    streams = []
+
+    def get_device_count(self):
+        return 1
+
+    def get_default_input_device_info(self):
+        return {"defaultSampleRate": 1000.0}
+
+    def open(self, **kwargs):
+        stream = FakePyAudioStream(**kwargs)
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        pass
+
+
+@pytest.fixture
+def microphone(monkeypatch):
+    """A callback mode microphone at 1000 Hz with room for 10 frames"""
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.__version__ = "0.2.14"
+    pyaudio.paInt16 = 8
+    pyaudio.paContinue, pyaudio.paInputOverflow = PA_CONTINUE, PA_INPUT_OVERFLOW
+    pyaudio.get_sample_size = lambda format: 2
+    pyaudio.PyAudio = FakePyAudio
+    monkeypatch.setitem(sys.modules, "pyaudio", pyaudio)
+    FakePyAudio.streams = []
+    return sr.Microphone(callback_mode=True, callback_chunk_size=4, buffer_duration=0.01)
+
+
+def frames(*values):
+    return b"".join(value.to_bytes(2, "little") for value in values)
+
+
+def test_callbacks_fill_the_ring_buffer(microphone):
+    with microphone as source:
+        pyaudio_stream = FakePyAudio.streams[0]
+        assert pyaudio_stream.options["frames_per_buffer"] == 4 and pyaudio_stream.options["rate"] == 1000
+        pyaudio_stream.deliver(frames(1, 2, 3, 4))
+        pyaudio_stream.deliver(frames(5, 6, 7, 8))
+        assert source.stream.read(3) == frames(1, 2, 3)
+        pyaudio_stream.deliver(frames(9, 10, 11, 12))  # wraps around the end of the ring buffer
+        assert source.stream.write_position % source.stream.capacity < source.stream.read_position % source.stream.capacity
+        assert source.stream.read(9) == frames(4, 5, 6, 7, 8, 9, 10, 11, 12)
+        pyaudio_stream.deliver(frames(13, 14, 15, 16))
+        assert source.stream.read(4) == frames(13, 14, 15, 16)
+
+
+def test_reads_wait_for_enough_audio(microphone):
+    with microphone as source:
+        pyaudio_stream = FakePyAudio.streams[0]
+        results = []
+        reader = threading.Thread(target=lambda: results.append(source.stream.read(6)))
+        reader.start()
+        pyaudio_stream.deliver(frames(1, 2, 3, 4))
+        reader.join(0.1)
+        assert reader.is_alive()  # still waiting for two more frames
+        pyaudio_stream.deliver(frames(5, 6, 7, 8))
+        reader.join(5)
+        assert results == [frames(1, 2, 3, 4, 5, 6)]
+
+        pyaudio_stream.deliver(frames(9, 10, 11, 12))
+        pyaudio_stream.deliver(frames(13, 14, 15, 16))
+        assert source.stream.read(20) == frames(*range(7, 17))  # no more than the ring buffer holds
+
+
+def test_full_ring_buffer_drops_audio(microphone):
+    with microphone as source:
+        pyaudio_stream = FakePyAudio.streams[0]
+        for start in (1, 5):
+            pyaudio_stream.deliver(frames(start, start + 1, start + 2, start + 3))
+        pyaudio_stream.deliver(frames(9, 10, 11, 12))  # only 2 of the 10 frames are free
+        pyaudio_stream.deliver(frames(13, 14), status=PA_INPUT_OVERFLOW)
+        assert (source.stream.overflow_count, source.stream.input_overflow_count) == (1, 1)
+        assert microphone.overflow_count == 1
+        assert source.stream.read(10) == frames(*range(1, 9)) + frames(13, 14)
+
+    with microphone as source:
+        FakePyAudio.streams[1].deliver(frames(*range(11)))  # larger than the ring buffer
+        assert microphone.overflow_count == 2  # dropped buffers of earlier streams still count
+
+
+def test_closing_wakes_up_readers(microphone):
+    results = []
+    with microphone as source:
+        pyaudio_stream = FakePyAudio.streams[0]
+        reader = threading.Thread(target=lambda: results.append(source.stream.read(8)))
+        reader.start()
+        pyaudio_stream.deliver(frames(1, 2, 3, 4))
+        stream = source.stream
+    reader.join(5)
+    assert results == [frames(1, 2, 3, 4)]  # the audio that was left, though less than asked for
+    assert stream.read(8) == b""
+    assert pyaudio_stream.stopped and pyaudio_stream.closed
+    assert microphone.stream is None
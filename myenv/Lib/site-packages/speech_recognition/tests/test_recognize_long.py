@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Tests for splitting long audio at pauses and recognizing the pieces"""
+import array
+import threading
+
+import pytest
+
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+
+
+def make_audio(*pieces):
+    """Audio made of ``(amplitude, seconds)`` pieces of a square wave, where amplitude 0 is silence"""
+    samples = array.array("h")
+    for amplitude, seconds in pieces:
+        samples.extend([amplitude, -amplitude] * int(seconds * SAMPLE_RATE / 2))
+    return sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2)
+
+
+def times(segments):
+    return [(pytest.approx(start), pytest.approx(end), forced_cut) for start, end, forced_cut, _ in segments]
+
+
+def test_segments_end_at_pauses():
+    audio = make_audio(
+        (8000, 1), (0, 1),  # a phrase
+        (8000, 0.5), (0, 0.5), (8000, 1), (0, 1),  # a pause shorter than pause_threshold doesn't end a segment
+        (8000, 0.1), (0, 0.9),  # too short to be a phrase
+    )
+    segments = sr.Recognizer().split_on_silence(audio, overlap=0)
+    assert times(segments) == [(0, 1, False), (2, 4, False)]
+    assert segments[1][3].frame_data == audio.frame_data[2 * 2 * SAMPLE_RATE:4 * 2 * SAMPLE_RATE]
+
+    segments = sr.Recognizer().split_on_silence(audio, overlap=0.25)
+    assert times(segments) == [(0, 1.25, False), (1.75, 4.25, False)]
+    assert sr.Recognizer().split_on_silence(make_audio((8000, 2)), overlap=0.25)[0][1] == pytest.approx(2)
+
+
+def test_long_speech_is_cut_at_its_quietest_points():
+    audio = make_audio((8000, 3), (400, 0.05), (8000, 3.45), (400, 0.05), (8000, 3.45))
+    segments = sr.Recognizer().split_on_silence(audio, max_segment_duration=4, overlap=0)
+    assert times(segments) == [(0, 3.05, True), (3.05, 6.55, True), (6.55, 10, False)]
+    assert b"".join(segment.frame_data for _, _, _, segment in segments) == audio.frame_data
+
+    segments = sr.Recognizer().split_on_silence(audio, max_segment_duration=4, overlap=0.25)
+    assert times(segments) == [(0, 3.3, True), (2.8, 6.8, True), (6.3, 10, False)]
+
+
+def test_silence_has_no_segments():
+    assert sr.Recognizer().split_on_silence(make_audio((0, 3))) == []
+    with pytest.raises(sr.UnknownValueError):
+        sr.Recognizer().recognize_long(make_audio((0, 3)), engine=lambda audio: "hello")
+
+
+def transcribing(audio, transcripts, **split_options):
+    """Returns an engine that transcribes the segments of ``audio`` as ``transcripts``, in order"""
+    segments = sr.Recognizer().split_on_silence(audio, **split_options)
+    assert len(segments) == len(transcripts)
+    by_audio = {bytes(segment.frame_data): transcript for (_, _, _, segment), transcript in zip(segments, transcripts)}
+
+    def engine(segment_audio):
+        transcript = by_audio[bytes(segment_audio.frame_data)]
+        if isinstance(transcript, Exception):
+            raise transcript
+        return transcript
+    return engine
+
+
+def test_words_repeated_at_forced_cuts_are_removed():
+    audio = make_audio((8000, 3), (400, 0.05), (8000, 3.45), (400, 0.05), (8000, 3.45))
+    engine = transcribing(audio, ["hello there my", "There my friend how", "how are you"], max_segment_duration=4)
+    assert sr.Recognizer().recognize_long(audio, engine=engine, max_segment_duration=4) == "hello there my friend how are you"
+
+
+def test_words_repeated_at_pauses_are_kept():
+    audio = make_audio((8000, 1), (0, 1), (8000, 1))
+    engine = transcribing(audio, ["yes yes", "yes"])
+    assert sr.Recognizer().recognize_long(audio, engine=engine) == "yes yes yes"
+
+
+def test_segment_timing_and_unintelligible_segments():
+    audio = make_audio((8000, 1), (0, 1), (8000, 1), (0, 1), (8000, 1))
+    engine = transcribing(audio, [("one", 0.9), sr.UnknownValueError(), ("three", 0.8)])
+    transcription, segments = sr.Recognizer().recognize_long(audio, engine=engine, show_segments=True)
+    assert transcription == "one three"
+    assert segments == [
+        {"start": 0, "end": pytest.approx(1.25), "transcript": "one"},
+        {"start": pytest.approx(1.75), "end": pytest.approx(3.25), "transcript": None},
+        {"start": pytest.approx(3.75), "end": pytest.approx(5), "transcript": "three"},
+    ]
+
+    with pytest.raises(sr.UnknownValueError):
+        sr.Recognizer().recognize_long(audio, engine=transcribing(audio, [sr.UnknownValueError()] * 3))
+
+
+def test_engines_are_looked_up_by_name(monkeypatch):
+    recognizer = sr.Recognizer()
+    calls = []
+
+    def recognize_google(audio_data, language="en-US"):
+        calls.append(language)
+        return "hola"
+    monkeypatch.setattr(recognizer, "recognize_google", recognize_google)
+    assert recognizer.recognize_long(make_audio((8000, 1)), language="es-ES") == "hola"
+    assert calls == ["es-ES"]
+
+
+def test_engine_errors_are_raised_and_cancel_the_remaining_segments():
+    audio = make_audio((8000, 1), (0, 1), (8000, 1), (0, 1), (8000, 1), (0, 1), (8000, 1))
+    segments = sr.Recognizer().split_on_silence(audio)
+    started = []
+    first_failed = threading.Event()
+
+    def engine(segment_audio):
+        index = [bytes(segment.frame_data) for _, _, _, segment in segments].index(bytes(segment_audio.frame_data))
+        started.append(index)
+        if index == 0:
+            first_failed.set()
+            raise sr.RequestError("recognition connection failed")
+        first_failed.wait(5)
+        threading.Event().wait(0.2)  # still running while the error is handled
+        return "fine"
+
+    with pytest.raises(sr.RequestError, match="connection failed"):
+        sr.Recognizer().recognize_long(audio, engine=engine, max_workers=2)
+    assert 0 in started and len(started) < len(segments)
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""Tests for the keep-alive HTTP transports, over fake sockets"""
+import asyncio
+import io
+import json
+import re
+import socket
+import urllib.request
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+import speech_recognition as sr
+from speech_recognition import transport
+
+
+def http_response(status=200, body=b"ok", headers=()):
+    reason = {200: "OK", 302: "Found", 303: "See Other", 307: "Temporary Redirect", 404: "Not Found"}[status]
+    lines = ["HTTP/1.1 {} {}".format(status, reason), "Content-Length: {}".format(len(body))] + list(headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1") + body
+
+
+class FakeSocket(object):
+    """Answers each request with the next of the server's scripted responses"""
+    def __init__(self, server, address):
+        self.server = server
+        self.address = address
+        self.sent = b""
+        self.stale = False  # closed by the server while idle, noticed when reading the response
+        self.dropped = False  # closed by the server while idle, noticed before reusing it
+        self.send_fails = False  # closed by the server while idle, noticed when sending the request
+        self.closed = False
+
+    def sendall(self, data):
+        assert not self.closed
+        if self.send_fails:
+            raise BrokenPipeError("broken pipe")
+        self.sent += bytes(data)
+
+    def makefile(self, mode):
+        if self.stale:
+            return io.BytesIO(b"")
+        return io.BytesIO(self.server.responses.pop(0))
+
+    def setsockopt(self, *args):
+        pass
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def requests(self):
+        return re.findall(rb"[A-Z]+ \S+ HTTP/1\.1", self.sent)
+
+
+class FakeServer(object):
+    def __init__(self, monkeypatch):
+        self.responses = []
+        self.sockets = []
+        self.stale_connections = False  # whether new connections are closed by the server before answering
+        monkeypatch.setattr(socket, "create_connection", self.connect)
+        monkeypatch.setattr(transport, "_connection_dropped", lambda sock: sock.dropped)
+        for name in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "no_proxy", "NO_PROXY"):
+            monkeypatch.delenv(name, raising=False)
+
+    def connect(self, address, timeout=None, source_address=None):
+        sock = FakeSocket(self, address)
+        sock.stale = self.stale_connections
+        self.sockets.append(sock)
+        return sock
+
+
+@pytest.fixture
+def server(monkeypatch):
+    return FakeServer(monkeypatch)
+
+
+def test_reuses_connections(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(body=b"first"), http_response(body=b"second")]
+    assert pool.urlopen("http://example.com/a").read() == b"first"
+    response = pool.urlopen(urllib.request.Request("http://example.com/b", data=b"audio", headers={"Content-Type": "audio/x-flac"}))
+    assert response.read() == b"second"
+    assert (response.getcode(), response.geturl()) == (200, "http://example.com/b")
+
+    assert len(server.sockets) == 1
+    assert server.sockets[0].address == ("example.com", 80)
+    assert server.sockets[0].requests() == [b"GET /a HTTP/1.1", b"POST /b HTTP/1.1"]
+    assert server.sockets[0].sent.endswith(b"audio")
+
+
+def test_pools_per_host(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response() for _ in range(3)]
+    for url in ["http://example.com/", "http://example.org/", "http://example.com:8080/"]:
+        pool.urlopen(url)
+    assert [sock.address for sock in server.sockets] == [("example.com", 80), ("example.org", 80), ("example.com", 8080)]
+
+
+def test_closed_connections_are_not_reused(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(headers=["Connection: close"]), http_response()]
+    pool.urlopen("http://example.com/")
+    pool.urlopen("http://example.com/")
+    assert len(server.sockets) == 2
+    assert server.sockets[0].closed
+
+
+def test_idle_connections_are_limited(server):
+    pool = transport.PooledHTTPTransport(max_idle_per_host=0)
+    server.responses = [http_response(), http_response()]
+    pool.urlopen("http://example.com/")
+    pool.urlopen("http://example.com/")
+    assert len(server.sockets) == 2
+    assert server.sockets[0].closed
+
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response()]
+    pool.urlopen("http://example.com/")
+    pool.close()
+    assert server.sockets[-1].closed
+
+
+def test_retries_stale_connections(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(body=b"first"), http_response(body=b"second")]
+    pool.urlopen("http://example.com/")
+    server.sockets[0].stale = True
+    assert pool.urlopen("http://example.com/").read() == b"second"
+    assert len(server.sockets) == 2
+    assert server.sockets[0].closed
+
+
+def test_post_requests_are_only_retried_if_sending_failed(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(body=b"first"), http_response(body=b"second")]
+    pool.urlopen("http://example.com/")
+    server.sockets[0].send_fails = True
+    data = io.BytesIO(b"audio")
+    assert pool.urlopen(urllib.request.Request("http://example.com/", data=data, headers={"Content-Length": "5"})).read() == b"second"
+    assert server.sockets[1].sent.endswith(b"audio")  # the request body was sent again from the start
+
+    # the server may have acted on a request that was sent, so it isn't sent again
+    server.responses = [http_response()]
+    server.sockets[1].stale = True
+    with pytest.raises(URLError):
+        pool.urlopen(urllib.request.Request("http://example.com/", data=b"audio"))
+    assert len(server.sockets) == 2
+
+
+def test_dropped_idle_connections_are_discarded(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(), http_response(body=b"second")]
+    pool.urlopen("http://example.com/")
+    server.sockets[0].dropped = True
+    assert pool.urlopen(urllib.request.Request("http://example.com/", data=b"audio")).read() == b"second"
+    assert server.sockets[0].closed and server.sockets[0].requests() == [b"GET / HTTP/1.1"]
+    assert len(server.sockets) == 2
+
+
+def test_stale_connections_are_retried_once(server):
+    pool = transport.PooledHTTPTransport()
+    key = ("http", "example.com", 80)
+    connections = [pool._acquire(key, None)[0] for _ in range(3)]
+    for connection in connections:
+        connection.connect()
+        connection.sock.stale = True
+        pool._release(key, connection)
+    server.stale_connections = True
+    with pytest.raises(URLError):
+        pool.urlopen("http://example.com/")
+    assert len(server.sockets) == 4  # one pooled connection, then one new connection
+    assert len(pool._idle[key]) == 2
+
+
+def test_fresh_connection_failures_are_not_retried(server):
+    pool = transport.PooledHTTPTransport()
+    server.stale_connections = True
+    with pytest.raises(URLError):
+        pool.urlopen("http://example.com/")
+    assert len(server.sockets) == 1
+
+
+def test_follows_redirects(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [
+        http_response(303, b"", ["Location: /result"]),
+        http_response(302, b"", ["Location: http://example.org/final"]),
+        http_response(body=b"done"),
+    ]
+    response = pool.urlopen(urllib.request.Request("http://example.com/upload", data=b"audio"))
+    assert (response.read(), response.geturl()) == (b"done", "http://example.org/final")
+    assert server.sockets[0].requests() == [b"POST /upload HTTP/1.1", b"GET /result HTTP/1.1"]
+    assert server.sockets[1].requests() == [b"GET /final HTTP/1.1"]
+    assert server.sockets[0].sent.count(b"audio") == 1  # the body is not sent again after a 303
+
+
+def test_redirect_errors(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(307, b"", ["Location: /elsewhere"])]
+    with pytest.raises(HTTPError) as e:  # urllib doesn't follow 307 redirects for POST requests either
+        pool.urlopen(urllib.request.Request("http://example.com/", data=b"audio"))
+    assert e.value.code == 307
+
+    server.responses = [http_response(302, b"", ["Location: /loop"]) for _ in range(pool.max_redirects + 1)]
+    with pytest.raises(HTTPError, match="too many redirects"):
+        pool.urlopen("http://example.com/loop")
+
+
+def test_http_errors(server):
+    pool = transport.PooledHTTPTransport()
+    server.responses = [http_response(404, b"missing"), http_response()]
+    with pytest.raises(HTTPError) as e:
+        pool.urlopen("http://example.com/")
+    assert (e.value.code, e.value.read()) == (404, b"missing")
+    pool.urlopen("http://example.com/")  # the connection is still reused after an error status
+    assert len(server.sockets) == 1
+
+    with pytest.raises(URLError):
+        pool.urlopen("ftp://example.com/")
+
+
+def test_proxied_requests_use_urllib(server, monkeypatch):
+    monkeypatch.setenv("http_proxy", "http://proxy.example.com:3128")
+    requests = []
+    monkeypatch.setattr(urllib.request, "urlopen", lambda request, timeout=None: requests.append((request, timeout)) or io.BytesIO(b"proxied"))
+    pool = transport.PooledHTTPTransport()
+    assert pool.urlopen("http://example.com/", timeout=5).read() == b"proxied"
+    assert requests[0][0].full_url == "http://example.com/" and requests[0][1] == 5
+    assert not server.sockets
+
+    monkeypatch.setenv("no_proxy", "example.com")
+    server.responses = [http_response(body=b"direct")]
+    assert pool.urlopen("http://example.com/").read() == b"direct"
+    assert len(server.sockets) == 1
+
+
+class FakeStreamWriter(object):
+    """Like ``asyncio.StreamWriter`` over a socket, feeding the server's scripted responses to its reader"""
+    def __init__(self, server, reader):
+        self.server = server
+        self.reader = reader
+        self.loop = asyncio.get_running_loop()
+        self.closed = self.shut_down = False
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        self.reader.feed_data(self.server.responses.pop(0))
+
+    async def drain(self):
+        await asyncio.sleep(0)  # let concurrent requests open their own connections
+
+    def close(self):
+        if self.loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+        self.closed = True
+
+    def get_extra_info(self, name):
+        assert name == "socket"
+        return self
+
+    def shutdown(self, how):
+        self.shut_down = True
+
+
+def test_async_pool_drops_connections_of_closed_loops(server, monkeypatch):
+    writers = []
+
+    async def open_connection(host, port, ssl=None):
+        reader = asyncio.StreamReader()
+        writers.append(FakeStreamWriter(server, reader))
+        return reader, writers[-1]
+
+    monkeypatch.setattr(asyncio, "open_connection", open_connection)
+    pool = transport.AsyncHTTPTransport()
+
+    async def fetch_twice():
+        responses = await asyncio.gather(pool.urlopen("http://example.com/a"), pool.urlopen("http://example.com/b"))
+        return [response.read() for response in responses] + [(await pool.urlopen("http://example.com/c")).read()]
+
+    for _ in range(3):
+        server.responses = [http_response(body=body) for body in (b"a", b"b", b"c")]
+        assert asyncio.run(fetch_twice()) == [b"a", b"b", b"c"]
+        assert len(pool._idle) == 1  # only the connections of the loop that just ran
+        assert sum(len(idle) for idle in pool._idle.values()) == 2
+    assert len(writers) == 6  # the third request of each loop reused a connection
+    assert all(writer.shut_down and not writer.closed for writer in writers[:4])
+
+    async def close():
+        await pool.close()
+    asyncio.run(close())
+    assert not pool._idle
+    assert all(writer.shut_down for writer in writers)
+
+
+class FakeTransport(object):
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def urlopen(self, request, timeout=None):
+        self.requests.append((request, timeout))
+        return io.BytesIO(self.response)
+
+
+def test_recognizers_use_the_injected_transport():
+    result = {"result": [{"alternative": [{"transcript": "hello world", "confidence": 0.9}], "final": True}], "result_index": 0}
+    fake = FakeTransport(b'{"result":[]}\n' + json.dumps(result).encode("utf-8"))
+    recognizer = sr.Recognizer()
+    recognizer.transport = fake
+    recognizer.operation_timeout = 7
+    audio = sr.AudioData(b"\x00\x01" * 16000, 16000, 2)
+    assert recognizer.recognize_google(audio) == "hello world"
+
+    request, timeout = fake.requests[0]
+    assert request.full_url.startswith("http://www.google.com/speech-api/v2/recognize?")
+    assert request.data[:4] == b"fLaC" and timeout == 7
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Checks that the package works without the audioop and aifc modules, which were removed in Python 3.13"""
+import os
+import subprocess
+import sys
+import textwrap
+
+SCRIPT = textwrap.dedent("""
+    import array, io, sys, wave
+    sys.modules["audioop"] = sys.modules["aifc"] = None  # makes importing them fail
+    import speech_recognition as sr
+    from pydub import pyaudioop
+    assert sr.audioop is pyaudioop and sr.aifc is None
+
+    samples = array.array("h", ((i * 37) % 20000 - 10000 for i in range(16000))).tobytes()
+    audio = sr.AudioData(samples, 16000, 2)
+    assert audio.get_raw_data(convert_rate=8000, convert_width=1)
+    try:
+        audio.get_aiff_data()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("AIFF data was written without aifc")
+
+    flac_path = sys.argv[1]
+    with open(flac_path, "wb") as f:
+        f.write(audio.get_flac_data())
+    for path in (flac_path, io.BytesIO(audio.get_wav_data())):
+        with sr.AudioFile(path) as source:
+            assert sr.Recognizer().record(source).get_raw_data() == samples
+""")
+
+
+def test_import_without_audioop_and_aifc(tmp_path):
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([package_dir, os.environ.get("PYTHONPATH", "")]))
+    result = subprocess.run([sys.executable, "-c", SCRIPT, str(tmp_path / "speech.flac")],
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,403 @@
+"""
+HTTP transports used by the ``Recognizer.recognize_*`` methods that call web APIs.
+
+A transport is any object with an ``urlopen(request, timeout=None)`` method that behaves like ``urllib.request.urlopen``: it takes a ``urllib.request.Request`` (or a URL string), returns a file-like response with a ``read()`` method, and raises ``urllib.error.HTTPError`` or ``urllib.error.URLError`` on failure. Assign one to ``recognizer_instance.transport`` to change how requests are sent, for example to point a ``Recognizer`` at a local fake server in tests.
+
+Async transports work the same way, except that ``urlopen`` is a coroutine function. They are used by the ``Recognizer.recognize_*_async`` methods, through ``recognizer_instance.async_transport``.
+"""
+
+import asyncio
+import collections
+import http.client
+import io
+import select
+import socket
+import sys
+import threading
+import urllib.request
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+
+def _pool_key(url):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return scheme, parts.hostname, port
+
+
+# methods that can be sent again if it is unclear whether the server received them
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"])
+
+
+def _connection_dropped(sock):
+    """Returns whether the server closed the idle connection on ``sock``: an idle connection has nothing to read unless it was closed."""
+    if hasattr(select, "poll"):
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+        return bool(poller.poll(0))
+    return bool(select.select([sock], [], [], 0)[0])
+
+
+def _uses_proxy(scheme, host):
+    """Returns whether requests to ``host`` should go through a proxy, according to the environment."""
+    return scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(host)
+
+
+def _request_target(request):
+    """Returns the request path and the headers to send for ``request``, filled in like ``urllib`` does."""
+    parts = urlsplit(request.full_url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    headers = dict(request.header_items())
+    headers.setdefault("Host", parts.netloc)
+    headers.setdefault("User-agent", "Python-urllib/{}.{}".format(*sys.version_info[:2]))
+    if request.data is not None and "Content-type" not in headers and "Content-Type" not in headers:
+        headers["Content-type"] = "application/x-www-form-urlencoded"
+    return path, headers
+
+
+def _redirected_request(request, status, headers):
+    """Returns the request to send next if the response to ``request`` is a redirect that ``urllib`` would follow, turning POST requests into GET requests, or ``None`` otherwise."""
+    method = request.get_method()
+    if "location" not in headers or not (status in (301, 302, 303) or (status in (307, 308) and method in ("GET", "HEAD"))):
+        return None
+    return urllib.request.Request(
+        urljoin(request.full_url, headers["location"]),
+        headers={key: value for key, value in request.header_items() if key.lower() not in ("content-length", "content-type", "transfer-encoding")},
+        method="HEAD" if method == "HEAD" else "GET",
+    )
+
+
+class UrllibTransport(object):
+    """Sends every request with ``urllib.request.urlopen``, which opens a new connection each time."""
+    def urlopen(self, request, timeout=None):
+        if timeout is None:
+            return urllib.request.urlopen(request)
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    def close(self):
+        pass
+
+
+class PooledHTTPTransport(object):
+    """
+    Sends requests over keep-alive connections, reusing them across calls instead of opening a new TCP (and TLS) connection for every request.
+
+    Idle connections are kept in a pool per ``(scheme, host, port)``, holding at most ``max_idle_per_host`` connections each. The pool can be shared by any number of threads: each request takes a connection out of the pool for its duration, and returns it afterwards if the server allows the connection to be reused.
+
+    Requests that should go through a proxy according to the environment (see ``urllib.request.getproxies``) are delegated to ``urllib.request.urlopen``, like they were before.
+    """
+    max_redirects = 5
+
+    def __init__(self, max_idle_per_host=4, ssl_context=None):
+        assert max_idle_per_host >= 0, "``max_idle_per_host`` must be a non-negative integer"
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl_context
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(collections.deque)  # maps ``(scheme, host, port)`` to idle connections, most recently used last
+        self._fallback = UrllibTransport()
+
+    def urlopen(self, request, timeout=None):
+        if not isinstance(request, urllib.request.Request):
+            request = urllib.request.Request(request)
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+
+        for _ in range(self.max_redirects + 1):
+            scheme, host, port = _pool_key(request.full_url)
+            if scheme not in ("http", "https"):
+                raise URLError("unknown url type: {}".format(scheme))
+            if _uses_proxy(scheme, host):
+                return self._fallback.urlopen(request, timeout)
+
+            status, reason, headers, body = self._send(request, (scheme, host, port), timeout)
+            redirected_request = _redirected_request(request, status, headers)
+            if redirected_request is not None:
+                request = redirected_request
+                continue
+            if status >= 300:
+                raise HTTPError(request.full_url, status, reason, headers, io.BytesIO(body))
+            return _Response(body, request.full_url, status, reason, headers)
+        raise HTTPError(request.full_url, status, "too many redirects", headers, io.BytesIO(body))
+
+    def close(self):
+        """Closes all idle connections. The transport can still be used afterwards."""
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _acquire(self, key, timeout, fresh=False):
+        """Returns ``(connection, reused)``: an idle connection from the pool that the server hasn't closed, or a new one if there is none or ``fresh`` is true."""
+        while not fresh:
+            with self._lock:
+                idle = self._idle.get(key)
+                connection = idle.pop() if idle else None
+            if connection is None:
+                break
+            if connection.sock is None or _connection_dropped(connection.sock):
+                connection.close()
+                continue
+            connection.timeout = timeout
+            connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _send(self, request, key, timeout):
+        """
+        Returns ``(status, reason, headers, body)`` for ``request``.
+
+        If a pooled connection turns out to have been closed by the server, the request is sent once more on a new connection, unless the server may already have acted on it: requests with methods that aren't idempotent (such as POST) are only sent again if sending them failed.
+        """
+        path, headers = _request_target(request)
+        data = request.data
+        method = request.get_method()
+        encode_chunked = any(key.lower() == "transfer-encoding" and value.lower() == "chunked" for key, value in headers.items())
+        rewindable = not hasattr(data, "read") or (hasattr(data, "seekable") and data.seekable())
+
+        retried = False
+        while True:
+            connection, reused = self._acquire(key, timeout, fresh=retried)
+            sent = False
+            try:
+                connection.request(method, path, body=data, headers=headers, encode_chunked=encode_chunked)
+                sent = True
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                connection.close()
+                if reused and not retried and rewindable and (not sent or method in IDEMPOTENT_METHODS):
+                    retried = True
+                    if hasattr(data, "read"):
+                        data.seek(0)
+                    continue
+                raise URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise URLError(e)
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return response.status, response.reason, response.headers, body
+
+
+def _close_connection(connection):
+    """Closes the ``(reader, writer)`` pair ``connection``, even if the event loop it was opened on has been closed."""
+    writer = connection[1]
+    try:
+        writer.close()
+    except RuntimeError:  # the event loop is closed, so the transport can't close the socket any more; end the connection and leave the socket to the garbage collector
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:  # already disconnected
+                pass
+
+
+class AsyncHTTPTransport(object):
+    """
+    Async counterpart of ``PooledHTTPTransport``: sends requests with non-blocking I/O on the running event loop, over keep-alive connections that are reused across calls.
+
+    Idle connections are pooled per event loop and ``(scheme, host, port)``, holding at most ``max_idle_per_host`` connections each, so any number of concurrent requests can share one transport. Connections pooled by event loops that have since been closed (e.g., by each call to ``asyncio.run``) are dropped the next time the transport is used.
+
+    Requests that should go through a proxy according to the environment (see ``urllib.request.getproxies``) are delegated to ``urllib.request.urlopen`` in the event loop's default executor.
+    """
+    max_redirects = 5
+
+    def __init__(self, max_idle_per_host=4, ssl_context=None):
+        assert max_idle_per_host >= 0, "``max_idle_per_host`` must be a non-negative integer"
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl_context
+        self._lock = threading.Lock()  # the transport may be shared by event loops in different threads
+        self._idle = collections.defaultdict(collections.deque)  # maps ``(event_loop, scheme, host, port)`` to idle ``(reader, writer)`` pairs, most recently used last
+        self._fallback = UrllibTransport()
+
+    async def urlopen(self, request, timeout=None):
+        if not isinstance(request, urllib.request.Request):
+            request = urllib.request.Request(request)
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+        try:
+            return await asyncio.wait_for(self._urlopen(request, timeout), timeout)
+        except asyncio.TimeoutError:
+            raise URLError(socket.timeout("timed out"))
+
+    async def close(self):
+        """Closes all idle connections of the running event loop. The transport can still be used afterwards."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            connections = self._evict(lambda key: key[0] is loop or key[0].is_closed())
+        for connection in connections:
+            _close_connection(connection)
+
+    async def _urlopen(self, request, timeout):
+        loop = asyncio.get_running_loop()
+        for _ in range(self.max_redirects + 1):
+            scheme, host, port = _pool_key(request.full_url)
+            if scheme not in ("http", "https"):
+                raise URLError("unknown url type: {}".format(scheme))
+            if _uses_proxy(scheme, host):
+                return await loop.run_in_executor(None, self._fallback.urlopen, request, timeout)
+
+            status, reason, headers, body = await self._send(request, (loop, scheme, host, port))
+            redirected_request = _redirected_request(request, status, headers)
+            if redirected_request is not None:
+                request = redirected_request
+                continue
+            if status >= 300:
+                raise HTTPError(request.full_url, status, reason, headers, io.BytesIO(body))
+            return _Response(body, request.full_url, status, reason, headers)
+        raise HTTPError(request.full_url, status, "too many redirects", headers, io.BytesIO(body))
+
+    def _evict(self, predicate):
+        """Removes the idle connections of every key for which ``predicate`` is true from the pool and returns them. Must be called with ``self._lock`` held."""
+        keys = [key for key in self._idle if predicate(key)]
+        return [connection for key in keys for connection in self._idle.pop(key)]
+
+    async def _acquire(self, key, fresh=False):
+        """Returns ``(connection, reused)``: an idle connection from the pool that the server hasn't closed, or a new one if there is none or ``fresh`` is true."""
+        with self._lock:
+            stale = self._evict(lambda key: key[0].is_closed())
+            idle = self._idle.get(key)
+            connection = None
+            while idle and not fresh:
+                reader, writer = idle.pop()
+                if reader.at_eof() or writer.is_closing():  # closed by the server while idle
+                    stale.append((reader, writer))
+                else:
+                    connection = (reader, writer)
+                    break
+        for stale_connection in stale:
+            _close_connection(stale_connection)
+        if connection is not None:
+            return connection, True
+        _, scheme, host, port = key
+        if scheme == "https":
+            ssl_context = self.ssl_context if self.ssl_context is not None else True
+            return await asyncio.open_connection(host, port, ssl=ssl_context), False
+        return await asyncio.open_connection(host, port), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            stale = self._evict(lambda key: key[0].is_closed())
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+            else:
+                stale.append(connection)
+        for stale_connection in stale:
+            _close_connection(stale_connection)
+
+    async def _send(self, request, key):
+        """Returns ``(status, reason, headers, body)`` for ``request``, sending it once more on a new connection if a pooled connection turns out to have been closed by the server, like ``PooledHTTPTransport._send`` does."""
+        path, headers = _request_target(request)
+        data = request.data
+        method = request.get_method()
+        if hasattr(data, "read"):  # file-like request bodies are sent in one piece
+            data = data.read()
+        headers = {key: value for key, value in headers.items() if key.lower() not in ("content-length", "transfer-encoding", "connection")}
+        if data is not None:
+            headers["Content-Length"] = str(len(data))
+        message = "{} {} HTTP/1.1\r\n".format(method, path)
+        message += "".join("{}: {}\r\n".format(key, value) for key, value in headers.items())
+        message = message.encode("iso-8859-1") + b"\r\n" + (data or b"")
+
+        retried = False
+        while True:
+            (reader, writer), reused = await self._acquire(key, fresh=retried)
+            sent = False
+            try:
+                writer.write(message)
+                await writer.drain()
+                sent = True
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed before a response was received")
+                status, reason, headers, body, will_close = await self._read_response(reader, status_line, method)
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused and not retried and (not sent or method in IDEMPOTENT_METHODS):
+                    retried = True
+                    continue
+                raise URLError(e)
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                writer.close()
+                raise URLError(e)
+            except BaseException:  # e.g., cancelled by a timeout: the connection is in an unknown state
+                writer.close()
+                raise
+            if will_close:
+                writer.close()
+            else:
+                self._release(key, (reader, writer))
+            return status, reason, headers, body
+
+    @staticmethod
+    async def _read_response(reader, status_line, method):
+        version, status, reason = (status_line.decode("iso-8859-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        if not version.startswith("HTTP/"):
+            raise http.client.BadStatusLine(status_line)
+        status = int(status)
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line)
+        headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines) + b"\r\n"))
+        will_close = headers.get("connection", "").lower() == "close" or (version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive")
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):  # skip trailers
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()  # line break after the chunk
+            body = b"".join(chunks)
+        elif headers.get("content-length") is not None:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:  # the body ends when the server closes the connection
+            body = await reader.read()
+            will_close = True
+        return status, reason, headers, body, will_close
+
+
+class _Response(io.BytesIO):
+    """A fully-read HTTP response, with the parts of the ``urllib.request.urlopen`` response interface the recognizers use."""
+    def __init__(self, body, url, status, reason, headers):
+        super(_Response, self).__init__(body)
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
@@ -0,0 +1,19 @@
+import re
+
+# Split text into sentences after ., ! or ?
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def stream_sentences(chunks):
+    """Yield each sentence of streamed text as soon as it is complete.
+
+    Fragments with nothing to speak are dropped.
+    """
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        *sentences, pending = SENTENCE_END.split(pending)
+        for sentence in sentences:
+            if re.search(r'\w', sentence):
+                yield sentence.strip()
+    if re.search(r'\w', pending):
+        yield pending.strip()
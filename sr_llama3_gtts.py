@@ -4,12 +4,114 @@ import gtts
 import os
 from pydub import AudioSegment
 from pydub.playback import play
+from pydub.utils import make_chunks
 from dotenv import load_dotenv
+from io import BytesIO
+import json
+import queue
+import re
+import statistics
+import sys
+import threading
+import time
 import wave
+from sentences import stream_sentences
+
+try:
+    import audioop
+except ImportError:  # removed from the standard library in Python 3.13
+    from pydub import pyaudioop as audioop
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Where the microphone's energy threshold is kept between runs
+CALIBRATION_FILE = os.getenv('CALIBRATION_FILE', 'calibration.json')
+
+# Maximum number of items waiting between two stages of the pipelined runner
+PIPELINE_QUEUE_SIZE = 4
+
+# Speech interrupts the assistant once it has been this many times louder than
+# the energy threshold for BARGE_IN_SECONDS; without echo cancellation the
+# microphone also hears the assistant, which must stay below this level
+BARGE_IN_ENERGY_RATIO = float(os.getenv('BARGE_IN_ENERGY_RATIO', 3))
+BARGE_IN_SECONDS = float(os.getenv('BARGE_IN_SECONDS', 0.3))
+
+
+def put_latest(q, item):
+    """Put ``item`` on ``q``, dropping the oldest item if the queue is full."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def drain(q):
+    """Discard everything currently waiting on ``q``."""
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def play_interruptible(segment, cancelled):
+    """Play ``segment``, stopping early once ``cancelled()`` returns True."""
+    try:
+        import simpleaudio
+    except ImportError:
+        # Without simpleaudio, play half-second chunks so we can stop between them
+        for chunk in make_chunks(segment, 500):
+            if cancelled():
+                return
+            play(chunk)
+        return
+
+    playback = simpleaudio.play_buffer(segment.raw_data, num_channels=segment.channels,
+                                       bytes_per_sample=segment.sample_width, sample_rate=segment.frame_rate)
+    while playback.is_playing():
+        if cancelled():
+            playback.stop()
+            return
+        time.sleep(0.05)
+
+class SpeechOnsetEndpointer:
+    """Endpointer (see speech_recognition.endpointing) that ends phrases like
+    Recognizer.listen does by default, and calls ``on_onset()`` as soon as a
+    phrase has had ``min_speech`` seconds of audio louder than ``energy_ratio``
+    times the energy threshold, while the phrase is still being captured.
+    """
+
+    def __init__(self, on_onset, energy_ratio=BARGE_IN_ENERGY_RATIO, min_speech=BARGE_IN_SECONDS):
+        self.on_onset = on_onset
+        self.energy_ratio = energy_ratio
+        self.min_speech = min_speech
+
+    def reset(self, recognizer, source):
+        self.recognizer = recognizer
+        self.sample_width = source.SAMPLE_WIDTH
+        self.seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+        self.loud_seconds = 0.0
+        self.onset = False
+
+    def is_speech(self, buffer):
+        energy = audioop.rms(buffer, self.sample_width)
+        if not self.onset and energy > self.energy_ratio * self.recognizer.energy_threshold:
+            self.loud_seconds += self.seconds_per_buffer
+            if self.loud_seconds >= self.min_speech:
+                self.onset = True
+                self.on_onset()
+        return energy > self.recognizer.energy_threshold
+
+    def is_end_of_phrase(self, pause_duration):
+        return pause_duration > self.recognizer.pause_threshold
+
+
 class AIAssistant:
     def __init__(self):
         # Configure Gemini AI
@@ -19,22 +121,48 @@ class AIAssistant:
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-1.5-pro')
 
-    def live_audio_transcription(self):
-        recognizer = sr.Recognizer()
-        mic = sr.Microphone()
+        # One recognizer and microphone for the whole session; listen() keeps
+        # adapting the energy threshold to the room while waiting for speech.
+        # In callback mode PyAudio keeps capturing into a ring buffer while
+        # Python is busy, so no audio is lost between reads
+        self.recognizer = sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True
+        self.microphone = sr.Microphone(callback_mode=True)
+
+    def load_calibration(self):
+        try:
+            with open(CALIBRATION_FILE) as f:
+                return float(json.load(f)["energy_threshold"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save_calibration(self):
+        try:
+            with open(CALIBRATION_FILE, "w") as f:
+                json.dump({"energy_threshold": self.recognizer.energy_threshold}, f)
+        except OSError as e:
+            print(f"Could not save calibration: {e}")
+
+    def calibrate(self, source):
+        energy_threshold = self.load_calibration()
+        if energy_threshold is not None:
+            self.recognizer.energy_threshold = energy_threshold
+            print(f"Using saved energy threshold: {energy_threshold:.0f}")
+            return
 
         print("Adjusting for ambient noise...")
+        self.recognizer.adjust_for_ambient_noise(source)
+        self.save_calibration()
 
-        with mic as source:
-            recognizer.adjust_for_ambient_noise(source)
-            print("Listening...")
+    def live_audio_transcription(self, source):
+        print("Listening...")
 
-            # Set phrase_time_limit to 10 seconds
-            audio = recognizer.listen(source, phrase_time_limit=10)
-            print("Audio captured, processing...")
+        # Set phrase_time_limit to 10 seconds
+        audio = self.recognizer.listen(source, phrase_time_limit=10)
+        print("Audio captured, processing...")
 
         try:
-            transcript = recognizer.recognize_google(audio)
+            transcript = self.recognizer.recognize_google(audio)
             print("Transcription: " + transcript)
             return transcript
         except sr.UnknownValueError:
@@ -64,49 +192,248 @@ class AIAssistant:
             print(f"Error generating response: {e}")
             return ""
 
-    def text_to_speech(self, text, speed_factor=1):
-        # Save as MP3
-        tts = gtts.gTTS(text)
-        audio_file = "response.mp3"
-        tts.save(audio_file)
+    def synthesize_speech(self, text, speed_factor=1):
+        # Synthesize MP3 in memory
+        mp3_data = BytesIO()
+        gtts.gTTS(text).write_to_fp(mp3_data)
+        mp3_data.seek(0)
 
-        # Load the audio file and adjust speed
-        audio = AudioSegment.from_mp3(audio_file)
+        # Decode the audio and adjust speed
+        audio = AudioSegment.from_file(mp3_data, format="mp3")
         new_sample_rate = int(audio.frame_rate * speed_factor)
         adjusted_audio = audio._spawn(audio.raw_data, overrides={'frame_rate': new_sample_rate})
-        adjusted_audio = adjusted_audio.set_frame_rate(audio.frame_rate)
-
-        # Save the adjusted audio to a new file
-        adjusted_file = "response_adjusted.mp3"
-        adjusted_audio.export(adjusted_file, format="mp3")
+        return adjusted_audio.set_frame_rate(audio.frame_rate)
 
-        # Play the adjusted audio file
-        adjusted_audio = AudioSegment.from_mp3(adjusted_file)
-        play(adjusted_audio)
-        
-        # Clean up the audio files
-        os.remove(audio_file)
-        os.remove(adjusted_file)
+    def text_to_speech(self, text, speed_factor=1):
+        play(self.synthesize_speech(text, speed_factor))
 
     def run(self):
-        while True:
-            # Get live transcription
-            transcribed_text = self.live_audio_transcription()
+        # Keep the microphone open across turns, so each turn starts listening right away
+        with self.microphone as source:
+            self.calibrate(source)
+            try:
+                while True:
+                    # Get live transcription
+                    transcribed_text = self.live_audio_transcription(source)
 
-            # Check if the user wants to exit
-            if transcribed_text and "exit" in transcribed_text.lower():
+                    # Check if the user wants to exit
+                    if transcribed_text and "exit" in transcribed_text.lower():
+                        print("Exiting...")
+                        break
+
+                    # Generate AI response
+                    response_text = self.generate_ai_response(transcribed_text)
+
+                    # Convert response to speech and play it
+                    if response_text:
+                        self.text_to_speech(response_text, speed_factor=1.2)
+            finally:
+                # Remember the threshold listen() adapted to, for the next run
+                self.save_calibration()
+                
+
+class PipelinedRunner:
+    """Runs the assistant as a pipeline: capture -> STT -> LLM -> TTS -> playback.
+
+    Each stage runs on its own thread, with bounded queues in between, so the
+    microphone keeps listening while the assistant thinks and speaks. Speech
+    that starts while a response is pending or playing interrupts it right
+    away (barge-in), before the phrase has been captured and recognized.
+    """
+
+    def __init__(self, assistant, speed_factor=1.2):
+        self.assistant = assistant
+        self.speed_factor = speed_factor
+        self.stt_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+        self.llm_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+        self.tts_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+        self.playback_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+        self.stopped = threading.Event()
+
+        # Every new utterance starts a new turn; items from older turns are dropped
+        self.lock = threading.Lock()
+        self.turn = 0
+        self.spoken_text = ''  # what the assistant has said this turn, to ignore our own echo
+        self.busy_turn = None  # turn whose response is being generated or played
+        self.endpointer = SpeechOnsetEndpointer(self.on_speech_start)
+
+        # Session statistics
+        self.started_at = None
+        self.captured_at = {}  # turn -> time the user stopped speaking, until its response starts playing
+        self.latencies = []  # seconds from end of speech to start of playback
+        self.completed_turns = 0
+        self.interrupted_turns = 0
+
+    def is_current(self, turn):
+        return turn == self.turn and not self.stopped.is_set()
+
+    def interrupt(self):
+        """Drop the pending response, if any. Must be called with the lock held."""
+        if self.busy_turn is None:
+            return
+        print("Interrupted.")
+        self.interrupted_turns += 1
+        self.turn += 1  # the response's turn is no longer current, so every stage drops it
+        self.busy_turn = None
+        self.captured_at.clear()
+        drain(self.llm_queue)
+        drain(self.tts_queue)
+        drain(self.playback_queue)
+
+    def on_speech_start(self):
+        # Runs on the background listener thread, as soon as the user starts speaking
+        with self.lock:
+            self.interrupt()
+
+    def on_phrase(self, recognizer, audio):
+        # Runs on the background listener thread: hand off and keep listening
+        put_latest(self.stt_queue, (time.perf_counter(), audio))
+
+    def is_echo(self, transcript):
+        # Without echo cancellation the microphone hears the assistant too
+        words = re.findall(r'\w+', transcript.lower())
+        with self.lock:
+            spoken = set(re.findall(r'\w+', self.spoken_text.lower()))
+        return bool(words) and sum(word in spoken for word in words) >= 0.8 * len(words)
+
+    def stt_worker(self):
+        while not self.stopped.is_set():
+            captured_at, audio = self.stt_queue.get()
+            if audio is None:
+                break
+            try:
+                transcript = self.assistant.recognizer.recognize_google(audio)
+            except sr.UnknownValueError:
+                continue
+            except sr.RequestError as e:
+                print(f"Could not request results from Google Speech Recognition service; {e}")
+                continue
+            if self.is_echo(transcript):
+                continue
+            print("Transcription: " + transcript)
+
+            if "exit" in transcript.lower():
                 print("Exiting...")
+                self.stopped.set()
                 break
 
-            # Generate AI response
-            response_text = self.generate_ai_response(transcribed_text)
+            with self.lock:
+                self.interrupt()  # in case a response started while this phrase was recognized
+                self.turn += 1
+                self.busy_turn = self.turn
+                self.spoken_text = ''
+                self.captured_at.clear()  # turns that were dropped before playing are over
+                self.captured_at[self.turn] = captured_at
+                put_latest(self.llm_queue, (self.turn, transcript))
 
-            # Convert response to speech and play it
-            if response_text:
-                self.text_to_speech(response_text, speed_factor=1.2)
-                
-# Create an instance of AIAssistant
-assistant = AIAssistant()
+    def reply_chunks(self, turn, transcript):
+        """Stream the model's sanitized reply, until a newer turn starts."""
+        for chunk in self.assistant.model.generate_content(transcript, stream=True):
+            if not self.is_current(turn):
+                return
+            yield chunk.text.replace('"', '').replace('*', '')
+
+    def llm_worker(self):
+        while not self.stopped.is_set():
+            turn, transcript = self.llm_queue.get()
+            if transcript is None:
+                break
+            print("Generating AI response...")
+            try:
+                for sentence in stream_sentences(self.reply_chunks(turn, transcript)):
+                    if not self.is_current(turn):
+                        break
+                    self.tts_queue.put((turn, sentence))
+            except Exception as e:
+                print(f"Error generating response: {e}")
+            self.tts_queue.put((turn, None))  # end of this turn's response
+
+    def tts_worker(self):
+        while not self.stopped.is_set():
+            turn, sentence = self.tts_queue.get()
+            if turn is None:
+                break
+            if not self.is_current(turn):
+                continue
+            if sentence is None:
+                self.playback_queue.put((turn, None, None))
+                continue
+            try:
+                segment = self.assistant.synthesize_speech(sentence, self.speed_factor)
+            except Exception as e:
+                print(f"Error synthesizing speech: {e}")
+                continue
+            self.playback_queue.put((turn, sentence, segment))
+
+    def playback_worker(self):
+        while not self.stopped.is_set():
+            turn, sentence, segment = self.playback_queue.get()
+            if turn is None:
+                break
+            with self.lock:
+                if not self.is_current(turn):
+                    continue
+                captured_at = self.captured_at.pop(turn, None)
+                if segment is None:  # response finished playing
+                    if self.busy_turn == turn:
+                        self.busy_turn = None
+                        self.completed_turns += 1
+                    continue
+                self.spoken_text += ' ' + sentence
+            if captured_at is not None:  # first sentence of the response
+                self.latencies.append(time.perf_counter() - captured_at)
+            print("AI Response: " + sentence)
+            play_interruptible(segment, lambda: not self.is_current(turn))
+
+    def report(self):
+        duration = time.perf_counter() - self.started_at
+        print(f"Session: {duration:.1f} s, {self.completed_turns} completed turns, "
+              f"{self.interrupted_turns} interrupted, {60 * self.completed_turns / duration:.1f} turns/min")
+        if self.assistant.microphone.overflow_count:
+            print(f"Microphone audio dropped: {self.assistant.microphone.overflow_count} buffers")
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            print(f"Response latency (end of speech to first audio): "
+                  f"mean {statistics.mean(latencies):.2f} s, median {statistics.median(latencies):.2f} s, p95 {p95:.2f} s")
+
+    def run(self):
+        with self.assistant.microphone as source:
+            self.assistant.calibrate(source)
+
+        self.assistant.recognizer.endpointer = self.endpointer
+        self.started_at = time.perf_counter()
+        workers = [threading.Thread(target=target, daemon=True)
+                   for target in (self.stt_worker, self.llm_worker, self.tts_worker, self.playback_worker)]
+        for worker in workers:
+            worker.start()
+        stop_listening = self.assistant.recognizer.listen_in_background(
+            self.assistant.microphone, self.on_phrase, phrase_time_limit=10)
+        print("Listening...")
+        try:
+            while not self.stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            self.stopped.set()
+        finally:
+            stop_listening(wait_for_stop=False)
+            # Wake up every worker so it can see that the session is over
+            put_latest(self.stt_queue, (None, None))
+            put_latest(self.llm_queue, (None, None))
+            put_latest(self.tts_queue, (None, None))
+            put_latest(self.playback_queue, (None, None, None))
+            for worker in workers:
+                worker.join(timeout=5)
+            self.assistant.save_calibration()
+            self.report()
+
+
+if __name__ == "__main__":
+    # Create an instance of AIAssistant
+    assistant = AIAssistant()
 
-# Run the assistant
-assistant.run()
+    # Run the assistant; --pipelined keeps listening while it thinks and speaks
+    if "--pipelined" in sys.argv:
+        PipelinedRunner(assistant).run()
+    else:
+        assistant.run()
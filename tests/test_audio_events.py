@@ -0,0 +1,201 @@
+import base64
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+for module in ['flask', 'flask_cors', 'google.generativeai', 'dotenv', 'gtts', 'speech_recognition', 'pydub']:
+    pytest.importorskip(module)
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test')
+import api  # noqa: E402
+
+
+@pytest.mark.parametrize('header,length', [
+    (b'\xff\xfb\x90\x00', 417),  # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz
+    (b'\xff\xfb\x92\x00', 418),  # the same, padded
+    (b'\xff\xf3\x80\x00', 208),  # MPEG-2 Layer III, 64 kbit/s, 22.05 kHz
+    (b'\xff\xfd\x90\x00', 522),  # MPEG-1 Layer II, 160 kbit/s, 44.1 kHz
+    (b'\xff\xff\x10\x00', 32),  # MPEG-1 Layer I, 32 kbit/s, 44.1 kHz
+])
+def test_mp3_frame_length(header, length):
+    assert api.mp3_frame_length(header) == length
+
+
+@pytest.mark.parametrize('header', [
+    b'\xff\xfb\x90',  # too short
+    b'ID3\x04',  # not a frame sync
+    b'\xff\xeb\x90\x00',  # reserved MPEG version
+    b'\xff\xf9\x90\x00',  # reserved layer
+    b'\xff\xfb\x00\x00',  # free format bitrate
+    b'\xff\xfb\xf0\x00',  # bad bitrate
+    b'\xff\xfb\x9c\x00',  # reserved sample rate
+])
+def test_invalid_mp3_headers(header):
+    assert api.mp3_frame_length(header) is None
+
+
+def test_mp3_frames_drops_tags_junk_and_truncated_frames():
+    frame = b'\xff\xfb\x90\x00' + b'\x01' * 413
+    id3 = b'ID3\x04\x00\x00\x00\x00\x00\x05' + b'\x00' * 5
+    data = id3 + frame + b'junk' + frame + frame[:100]
+    assert api.mp3_frames(data) == frame + frame
+
+
+@pytest.fixture
+def synthesized(monkeypatch):
+    """Replaces TTS by a function that logs the sentences and returns b'MP3:' + sentence"""
+    calls = []
+
+    def synthesize_sentence(sentence):
+        calls.append(sentence)
+        return b'MP3:' + sentence.encode()
+    monkeypatch.setattr(api, 'synthesize_sentence', synthesize_sentence)
+    return calls
+
+
+def test_synthesized_sentences_keep_their_order(monkeypatch):
+    first_done = threading.Event()
+
+    def synthesize_sentence(sentence):
+        if sentence == 'First.':
+            first_done.wait(5)
+        else:
+            first_done.set()  # the second sentence finishes first
+        return sentence.encode()
+    monkeypatch.setattr(api, 'synthesize_sentence', synthesize_sentence)
+    assert list(api.synthesize_sentences(['First.', 'Second.'])) == [('First.', b'First.'), ('Second.', b'Second.')]
+
+
+def test_sentences_are_synthesized_while_the_next_is_generated(monkeypatch):
+    first_started = threading.Event()
+    started_early = []
+
+    def synthesize_sentence(sentence):
+        first_started.set()
+        return sentence.encode()
+    monkeypatch.setattr(api, 'synthesize_sentence', synthesize_sentence)
+
+    def sentences():
+        yield 'First.'
+        started_early.append(first_started.wait(5))
+        yield 'Second.'
+
+    assert [sentence for sentence, _ in api.synthesize_sentences(sentences())] == ['First.', 'Second.']
+    assert started_early == [True]
+
+
+def test_closing_cancels_pending_synthesis(monkeypatch):
+    calls = []
+    all_queued = threading.Event()
+    release = threading.Event()
+
+    def synthesize_sentence(sentence):
+        calls.append(sentence)
+        (all_queued if sentence == 'First.' else release).wait(5)
+        return sentence.encode()
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(api, 'tts_executor', executor)
+    monkeypatch.setattr(api, 'synthesize_sentence', synthesize_sentence)
+
+    def sentences():
+        yield from ['First.', 'Second.', 'Third.']
+        all_queued.set()
+
+    events = api.synthesize_sentences(sentences())
+    assert next(events) == ('First.', b'First.')
+    events.close()
+    release.set()
+    executor.shutdown(wait=True)
+    assert 'Third.' not in calls  # cancelled while waiting behind the second sentence
+
+
+class FakeRecognizer:
+    def __init__(self, transcript=None, error=None):
+        self.transcript, self.error = transcript, error
+
+    def record(self, source):
+        return source
+
+    def recognize_google(self, audio):
+        if self.error is not None:
+            raise self.error
+        return self.transcript
+
+
+class FakeAudioFile:
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+@pytest.fixture
+def pipeline(monkeypatch, synthesized):
+    """Stands in for ffmpeg, speech recognition and the model; returns the ffmpeg commands that were run"""
+    commands = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        with open(command[-1], 'wb') as f:
+            f.write(b'RIFF')
+        return subprocess.CompletedProcess(command, 0, '', '')
+    monkeypatch.setattr(subprocess, 'run', run)
+    monkeypatch.setattr(api.sr, 'AudioFile', FakeAudioFile)
+    monkeypatch.setattr(api, 'recognizer', FakeRecognizer('tell me a joke'))
+    monkeypatch.setattr(api, 'generate_reply', lambda prompt: iter(['Why did the *chicken* cross', ' the road? To get away.']))
+    monkeypatch.setattr(api, 'response_cache', api.ResponseCache(max_size=10, ttl=60, variety=1))
+    return commands
+
+
+AUDIO = base64.b64encode(b'recording').decode()
+
+
+def test_audio_events(pipeline):
+    events = list(api.process_audio_events(AUDIO, 'audio/webm'))
+    assert events[0] == {'transcript': 'tell me a joke'}
+    assert [event['text'] for event in events[1:-1]] == ['Why did the *chicken* cross the road?', 'To get away.']
+    assert base64.b64decode(events[1]['audio']) == b'MP3:Why did the *chicken* cross the road?'
+    assert events[-1] == {'response': 'Why did the *chicken* cross the road? To get away.'}
+    assert pipeline[0][pipeline[0].index('-i') + 1].endswith('input.webm')
+    assert not os.path.exists(os.path.dirname(pipeline[0][-1]))  # the temporary files are removed
+
+
+def test_cached_replies_are_reused(pipeline, monkeypatch):
+    list(api.process_audio_events(AUDIO))
+    monkeypatch.setattr(api, 'generate_reply', lambda prompt: pytest.fail('the reply should be cached'))
+    events = list(api.process_audio_events(AUDIO))
+    assert events[-1] == {'response': 'Why did the *chicken* cross the road? To get away.'}
+
+
+@pytest.mark.parametrize('error,message', [
+    (api.sr.UnknownValueError(), 'Could not understand audio'),
+    (api.sr.RequestError('quota exceeded'), 'Could not request results: quota exceeded'),
+])
+def test_recognition_errors(pipeline, monkeypatch, error, message):
+    monkeypatch.setattr(api, 'recognizer', FakeRecognizer(error=error))
+    assert list(api.process_audio_events(AUDIO)) == [{'error': message}]
+
+
+def test_failed_conversion(pipeline, monkeypatch):
+    commands = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 1, '', 'Invalid data found')
+    monkeypatch.setattr(subprocess, 'run', run)
+    events = list(api.process_audio_events(AUDIO, 'audio/mp4'))
+    assert events == [{'error': 'Unexpected error during conversion: Audio conversion failed with both approaches'}]
+    assert commands[1][commands[1].index('-f') + 1] == 'mp4'  # the second attempt forces the input format
+
+
+def test_empty_reply(pipeline, monkeypatch):
+    monkeypatch.setattr(api, 'generate_reply', lambda prompt: iter(['  ', '...']))
+    events = list(api.process_audio_events(AUDIO))
+    assert events == [{'transcript': 'tell me a joke'}, {'error': 'Error processing audio: No text to speak'}]
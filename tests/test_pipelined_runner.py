@@ -0,0 +1,142 @@
+import array
+import queue
+import types
+
+import pytest
+
+for module in ['google.generativeai', 'dotenv', 'gtts', 'speech_recognition', 'pydub']:
+    pytest.importorskip(module)
+
+import sr_llama3_gtts  # noqa: E402
+from sr_llama3_gtts import PipelinedRunner, SpeechOnsetEndpointer, put_latest  # noqa: E402
+
+
+class FakeRecognizer:
+    energy_threshold = 100
+    pause_threshold = 0.8
+
+    def recognize_google(self, audio):
+        return audio  # the tests pass transcripts in place of audio
+
+
+def make_runner():
+    assistant = types.SimpleNamespace(recognizer=FakeRecognizer())
+    return PipelinedRunner(assistant)
+
+
+def recognize(runner, *transcripts):
+    """Run the STT stage on ``transcripts`` until it has handled all of them."""
+    for transcript in transcripts:
+        runner.stt_queue.put((1.0, transcript))
+    runner.stt_queue.put((None, None))
+    runner.stt_worker()
+
+
+def queued(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def test_put_latest_drops_the_oldest_items():
+    q = queue.Queue(2)
+    for item in range(4):
+        put_latest(q, item)
+    assert queued(q) == [2, 3]
+
+
+def test_phrases_start_new_turns():
+    runner = make_runner()
+    recognize(runner, 'hello there', 'what time is it')
+    assert runner.interrupted_turns == 1  # the second phrase replaced the first turn's response
+    assert runner.busy_turn == runner.turn
+    assert queued(runner.llm_queue) == [(runner.turn, 'what time is it')]
+    assert runner.captured_at == {runner.turn: 1.0}  # the dropped turn isn't kept
+
+
+def test_speech_onset_interrupts_the_pending_response():
+    runner = make_runner()
+    recognize(runner, 'tell me a joke')
+    runner.tts_queue.put((1, 'Why did the chicken cross the road?'))
+    runner.playback_queue.put((1, 'Knock knock.', object()))
+    runner.on_speech_start()
+    assert not runner.is_current(1)
+    assert runner.busy_turn is None and runner.interrupted_turns == 1
+    assert runner.captured_at == {}
+    assert queued(runner.llm_queue) == queued(runner.tts_queue) == queued(runner.playback_queue) == []
+
+    runner.on_speech_start()  # nothing is pending anymore
+    assert runner.interrupted_turns == 1
+
+
+def test_playback_stops_when_the_turn_is_interrupted(monkeypatch):
+    runner = make_runner()
+    recognize(runner, 'tell me a joke')
+    played = []
+
+    def fake_play(segment, cancelled):
+        played.append(segment)
+        runner.on_speech_start()  # the user starts talking during the first sentence
+        assert cancelled()
+        # a sentence the TTS stage was still working on arrives afterwards
+        runner.playback_queue.put((1, 'Second.', 'second'))
+        runner.playback_queue.put((None, None, None))
+
+    monkeypatch.setattr(sr_llama3_gtts, 'play_interruptible', fake_play)
+    for item in [(1, 'First.', 'first'), (1, 'Second.', 'second'), (1, None, None)]:
+        runner.playback_queue.put(item)
+    runner.playback_worker()
+    assert played == ['first']
+    assert len(runner.latencies) == 1
+    assert runner.completed_turns == 0 and runner.interrupted_turns == 1
+
+
+def test_finished_responses_complete_the_turn(monkeypatch):
+    runner = make_runner()
+    recognize(runner, 'tell me a joke')
+    monkeypatch.setattr(sr_llama3_gtts, 'play_interruptible', lambda segment, cancelled: None)
+    for item in [(1, 'First.', 'first'), (1, 'Second.', 'second'), (1, None, None), (None, None, None)]:
+        runner.playback_queue.put(item)
+    runner.playback_worker()
+    assert len(runner.latencies) == 1  # measured to the first sentence only
+    assert runner.busy_turn is None and runner.completed_turns == 1
+    assert runner.spoken_text == ' First. Second.'
+
+
+def test_echo_of_the_response_is_ignored():
+    runner = make_runner()
+    recognize(runner, 'tell me a joke')
+    runner.spoken_text = ' Why did the chicken cross the road?'
+    recognize(runner, 'the chicken cross the road')
+    assert runner.turn == 1 and runner.busy_turn == 1
+    recognize(runner, 'no more chicken jokes please')
+    assert runner.turn > 1 and runner.spoken_text == ''
+
+
+def samples(amplitude, count=1024):
+    return array.array('h', [amplitude, -amplitude] * (count // 2)).tobytes()
+
+
+def test_onset_endpointer_fires_once_on_loud_speech():
+    onsets = []
+    endpointer = SpeechOnsetEndpointer(lambda: onsets.append(True), energy_ratio=3, min_speech=0.3)
+    source = types.SimpleNamespace(SAMPLE_WIDTH=2, CHUNK=1024, SAMPLE_RATE=16000)  # 64 ms buffers
+    endpointer.reset(FakeRecognizer(), source)
+    assert endpointer.is_speech(samples(200))  # speech, but not loud enough to interrupt
+    assert not endpointer.is_speech(samples(50))
+    for _ in range(4):
+        assert endpointer.is_speech(samples(1000))
+    assert onsets == []
+    assert endpointer.is_speech(samples(1000))  # 5 buffers are 0.32 s
+    for _ in range(10):
+        endpointer.is_speech(samples(1000))
+    assert onsets == [True]
+    assert not endpointer.is_end_of_phrase(0.8) and endpointer.is_end_of_phrase(0.9)
+
+    endpointer.reset(FakeRecognizer(), source)  # the next phrase
+    for _ in range(5):
+        endpointer.is_speech(samples(1000))
+    assert onsets == [True, True]
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+for module in ['flask', 'flask_cors', 'google.generativeai', 'dotenv', 'gtts', 'speech_recognition', 'pydub']:
+    pytest.importorskip(module)
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test')
+import api  # noqa: E402
+
+
+def fill(cache, transcript, replies):
+    for reply in replies:
+        assert cache.get(transcript) is None
+        cache.put(transcript, reply)
+
+
+def test_repeated_identical_replies_fill_the_pool():
+    cache = api.ResponseCache(max_size=10, ttl=60, variety=3)
+    fill(cache, 'Hello', ['Hi there!'] * 3)
+    assert [cache.get('hello') for _ in range(3)] == ['Hi there!'] * 3
+    assert cache.stats()['hits'] == 3
+
+
+def test_pool_cycles_through_different_replies():
+    cache = api.ResponseCache(max_size=10, ttl=60, variety=3)
+    fill(cache, 'Tell me a joke', ['A', 'B', 'A'])
+    assert [cache.get('tell me a joke!') for _ in range(4)] == ['A', 'B', 'A', 'B']
+
+
+def test_pool_is_not_extended_once_full():
+    cache = api.ResponseCache(max_size=10, ttl=60, variety=2)
+    fill(cache, 'Hi', ['A', 'B'])
+    cache.put('Hi', 'C')
+    assert [cache.get('Hi') for _ in range(3)] == ['A', 'B', 'A']
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, 'monotonic', lambda: now[0])
+    cache = api.ResponseCache(max_size=10, ttl=60, variety=1)
+    cache.put('Hi', 'A')
+    assert cache.get('Hi') == 'A'
+    now[0] += 61
+    assert cache.get('Hi') is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = api.ResponseCache(max_size=2, ttl=60, variety=1)
+    cache.put('one', 'A')
+    cache.put('two', 'B')
+    assert cache.get('one') == 'A'
+    cache.put('three', 'C')
+    assert cache.get('two') is None
+    assert cache.get('one') == 'A'
+    assert cache.get('three') == 'C'
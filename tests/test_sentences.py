@@ -0,0 +1,14 @@
+from sentences import stream_sentences
+
+
+def test_sentences_are_yielded_as_soon_as_they_end():
+    chunks = iter(['Hello there! How', ' are you? I am', ' fine.  ', '...', ' Bye'])
+    sentences = stream_sentences(chunks)
+    assert next(sentences) == 'Hello there!'
+    assert next(sentences) == 'How are you?'
+    assert list(sentences) == ['I am fine.', 'Bye']
+
+
+def test_fragments_without_words_are_dropped():
+    assert list(stream_sentences(['Wait... ', '! ?', ''])) == ['Wait...']
+    assert list(stream_sentences([])) == []